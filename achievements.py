@@ -0,0 +1,382 @@
+# -*- coding: utf-8 -*-
+# Достижения игроков "Крестики-нолики"
+# Правила задаются данными (список словарей): на какие события партии правило
+# реагирует, какие события сбрасывают его прогресс (серии), фильтр по уровню
+# и длине партии и цель. Правила проиндексированы по типам событий, поэтому
+# на каждое событие проверяются только зависящие от него правила.
+#
+# Прогресс каждого игрока хранится в tic_tac_toe_achievements.json и
+# записывается со слиянием, как профили. Достижения по всей истории можно
+# пересчитать за один потоковый проход:
+#     python achievements.py --backfill
+
+# Импортируем необходимые модули
+from typing import Any, Dict, Iterable, List, Optional, Tuple  # Для указания типов данных
+import argparse  # Для разбора аргументов командной строки
+import json  # Для файла правил
+import os  # Для работы с файловой системой (проверка файлов)
+import time  # Для меток времени и замера пересчета
+
+import events  # Шина событий (ошибки чтения и записи данных)
+from archive import iter_all_history  # Потоковое чтение архива и истории
+from history_store import parse_timestamp  # Разбор дат записей
+from profiles import AI_PREFIX  # Префикс профилей ИИ
+from storage import locked_update  # Запись под межпроцессной блокировкой
+
+# Файл прогресса достижений по умолчанию
+ACHIEVEMENTS_FILE: str = "tic_tac_toe_achievements.json"
+
+# Пороги побед (бывшие "рекорды" главного окна)
+WIN_RECORDS: Tuple[int, ...] = (3, 5, 10, 15, 20, 25, 30)
+
+# Правила по умолчанию:
+#   on — события, увеличивающие прогресс ("win", "loss", "draw", "game");
+#   reset — события, обнуляющие прогресс (правило-серия);
+#   where — фильтр партии: difficulty (уровень), max_moves (своих ходов не больше);
+#   target — прогресс, при котором достижение получено.
+DEFAULT_RULES: List[Dict[str, Any]] = [
+    *({"id": f"wins_{n}", "title": f"{n} побед", "on": ["win"], "target": n} for n in WIN_RECORDS),
+    {"id": "streak_3", "title": "Серия из 3 побед", "on": ["win"], "reset": ["loss", "draw"], "target": 3},
+    {"id": "streak_5", "title": "Серия из 5 побед", "on": ["win"], "reset": ["loss", "draw"], "target": 5},
+    {"id": "beat_hard", "title": "Победа над ИИ Hard", "on": ["win"], "where": {"difficulty": "hard"}, "target": 1},
+    {"id": "hard_draws_10", "title": "10 ничьих с ИИ Hard", "on": ["draw"],
+     "where": {"difficulty": "hard"}, "target": 10},
+    {"id": "fast_win", "title": "Победа за 3 хода", "on": ["win"], "where": {"max_moves": 3}, "target": 1},
+    {"id": "draw_run_3", "title": "3 ничьи подряд", "on": ["draw"], "reset": ["win", "loss"], "target": 3},
+    {"id": "games_50", "title": "50 партий", "on": ["game"], "target": 50},
+]
+
+# Допустимые события партии для игрока
+EVENT_TYPES: Tuple[str, ...] = ("win", "loss", "draw", "game")
+
+
+class Rule:
+    """Правило достижения."""
+
+    __slots__ = ("id", "title", "on", "reset", "where", "target")
+
+    def __init__(self, data: Dict[str, Any]) -> None:
+        """Создает правило из словаря (ValueError при ошибке в данных)."""
+        self.id: str = str(data["id"])
+        self.title: str = str(data.get("title", self.id))
+        self.on: Tuple[str, ...] = tuple(data.get("on", ()))
+        self.reset: Tuple[str, ...] = tuple(data.get("reset", ()))
+        self.where: Dict[str, Any] = dict(data.get("where", {}))
+        self.target: int = int(data.get("target", 1))
+        unknown = set(self.on + self.reset) - set(EVENT_TYPES)
+        if not self.on or unknown or self.target < 1:
+            raise ValueError(f"Неверное правило {self.id}")
+
+    @property
+    def is_streak(self) -> bool:
+        """Серия (прогресс сбрасывается) или накопительный счетчик."""
+        return bool(self.reset)
+
+    def matches(self, context: Dict[str, Any]) -> bool:
+        """Подходит ли партия под фильтр правила."""
+        where = self.where
+        if "difficulty" in where and context["difficulty"] != where["difficulty"]:
+            return False
+        if "max_moves" in where and context["moves"] > int(where["max_moves"]):
+            return False
+        return True
+
+
+class AchievementEngine:
+    """Набор правил с индексом: тип события -> зависящие от него правила."""
+
+    def __init__(self, rules: Optional[List[Dict[str, Any]]] = None) -> None:
+        """Создает движок.
+
+        Args:
+            rules: Правила-словари (по умолчанию DEFAULT_RULES)
+        """
+        self.rules: Dict[str, Rule] = {}
+        for data in DEFAULT_RULES if rules is None else rules:
+            rule = Rule(data)
+            self.rules[rule.id] = rule
+        # Индекс: событие -> правила, которые оно увеличивает или сбрасывает
+        self.index: Dict[str, List[Tuple[Rule, bool]]] = {event: [] for event in EVENT_TYPES}
+        for rule in self.rules.values():
+            for event in rule.on:
+                self.index[event].append((rule, True))
+            for event in rule.reset:
+                self.index[event].append((rule, False))
+
+    def apply(self, progress: "PlayerProgress", event_types: Iterable[str],
+              context: Dict[str, Any], ts: int) -> List[Rule]:
+        """Учитывает события одной партии в прогрессе игрока.
+
+        Args:
+            progress: Прогресс игрока
+            event_types: События партии для игрока (например, "win" и "game")
+            context: Параметры партии (difficulty, moves)
+            ts: Время партии (секунды эпохи)
+
+        Returns:
+            Правила, достижения которых получены этой партией
+        """
+        unlocked = []
+        for event in event_types:
+            for rule, increments in self.index[event]:
+                table = progress.streaks if rule.is_streak else progress.counts
+                if not increments:
+                    table.pop(rule.id, None)
+                    continue
+                if not rule.matches(context):
+                    continue
+                value = table[rule.id] = table.get(rule.id, 0) + 1
+                if value >= rule.target and rule.id not in progress.unlocked:
+                    progress.unlocked[rule.id] = ts
+                    unlocked.append(rule)
+        return unlocked
+
+
+class PlayerProgress:
+    """Прогресс одного игрока: счетчики, текущие серии и полученные достижения."""
+
+    __slots__ = ("counts", "streaks", "unlocked")
+
+    def __init__(self) -> None:
+        """Создает пустой прогресс."""
+        self.counts: Dict[str, int] = {}  # Накопительные правила (при слиянии складываются)
+        self.streaks: Dict[str, int] = {}  # Текущие серии
+        self.unlocked: Dict[str, int] = {}  # Достижение -> время получения
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Словарь для JSON (копии таблиц)."""
+        return {"counts": dict(self.counts), "streaks": dict(self.streaks), "unlocked": dict(self.unlocked)}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "PlayerProgress":
+        """Прогресс из словаря JSON."""
+        progress = cls()
+        progress.counts = {str(k): int(v) for k, v in data.get("counts", {}).items()}
+        progress.streaks = {str(k): int(v) for k, v in data.get("streaks", {}).items()}
+        progress.unlocked = {str(k): int(v) for k, v in data.get("unlocked", {}).items()}
+        return progress
+
+
+def game_events(winner: Optional[str], symbol: str) -> Tuple[str, str]:
+    """События партии для игрока, игравшего символом symbol."""
+    if not winner:
+        return "draw", "game"
+    return ("win" if winner == symbol else "loss"), "game"
+
+
+class AchievementStore:
+    """Прогресс достижений всех игроков (кроме профилей ИИ)."""
+
+    def __init__(self, engine: Optional[AchievementEngine] = None) -> None:
+        """Создает пустое хранилище."""
+        self.engine: AchievementEngine = engine or AchievementEngine()
+        self.players: Dict[str, PlayerProgress] = {}
+        # Снимок последней записи (база слияния; None — перезаписать файл)
+        self.saved: Optional[Dict[str, Any]] = None
+
+    def record_game(self, x_id: str, o_id: str, winner: Optional[str], difficulty: str,
+                    length: int, ts: Optional[int] = None) -> List[Tuple[str, Rule]]:
+        """Учитывает партию в прогрессе обоих игроков.
+
+        Args:
+            x_id: Идентификатор игрока X
+            o_id: Идентификатор игрока O
+            winner: 'X', 'O' или None для ничьей
+            difficulty: Уровень сложности ИИ или "pvp"
+            length: Количество ходов в партии
+            ts: Время партии (по умолчанию — сейчас)
+
+        Returns:
+            Пары (идентификатор игрока, правило) для полученных достижений
+        """
+        ts = int(time.time()) if ts is None else ts
+        unlocked = []
+        for player_id, symbol in ((x_id, "X"), (o_id, "O")):
+            if player_id.startswith(AI_PREFIX):
+                continue
+            progress = self.players.setdefault(player_id, PlayerProgress())
+            # Своих ходов: X ходит первым
+            moves = (length + 1) // 2 if symbol == "X" else length // 2
+            context = {"difficulty": difficulty, "moves": moves}
+            for rule in self.engine.apply(progress, game_events(winner, symbol), context, ts):
+                unlocked.append((player_id, rule))
+        return unlocked
+
+    def unlocked(self, player_id: str) -> List[Tuple[Rule, int]]:
+        """Полученные достижения игрока (правило, время) в порядке получения."""
+        progress = self.players.get(player_id)
+        if progress is None:
+            return []
+        items = [(self.engine.rules[rule_id], ts) for rule_id, ts in progress.unlocked.items()
+                 if rule_id in self.engine.rules]
+        return sorted(items, key=lambda item: item[1])
+
+    def progress_of(self, player_id: str, rule: Rule) -> int:
+        """Текущий прогресс игрока по правилу."""
+        progress = self.players.get(player_id)
+        if progress is None:
+            return 0
+        return (progress.streaks if rule.is_streak else progress.counts).get(rule.id, 0)
+
+    @classmethod
+    def backfill(cls, records: Iterable[Dict[str, Any]],
+                 engine: Optional[AchievementEngine] = None) -> Tuple["AchievementStore", int]:
+        """Пересчитывает достижения по истории за один потоковый проход.
+
+        Args:
+            records: Записи истории в порядке партий (например, archive.iter_all_history)
+            engine: Движок правил
+
+        Returns:
+            Кортеж (хранилище, количество учтенных партий)
+        """
+        store = cls(engine)
+        games = 0
+        for record in records:
+            players = record.get("players")
+            if not isinstance(players, dict) or "X" not in players or "O" not in players:
+                continue  # Старые записи без профилей
+            store.record_game(
+                str(players["X"]), str(players["O"]), record.get("winner") or None,
+                str(record.get("difficulty", "")), int(record.get("length", 0)),
+                int(parse_timestamp(record.get("date", 0))),
+            )
+            games += 1
+        return store, games
+
+    @classmethod
+    def load(cls, path: str = ACHIEVEMENTS_FILE, engine: Optional[AchievementEngine] = None) -> "AchievementStore":
+        """Загружает прогресс из файла (пустое хранилище, если файла нет)."""
+        store = cls(engine)
+        store.saved = {"players": {}}
+        if not os.path.exists(path):
+            return store
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            for player_id, item in data.get("players", {}).items():
+                store.players[player_id] = PlayerProgress.from_dict(item)
+            store.saved = store.snapshot()
+        except (json.JSONDecodeError, OSError, ValueError, AttributeError, TypeError) as exc:
+            events.report_error("загрузки достижений", exc)
+        return store
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Снимок прогресса для записи (можно записать в другом потоке)."""
+        return {"players": {pid: progress.to_dict() for pid, progress in self.players.items()}}
+
+    def take_snapshot(self) -> Tuple[Dict[str, Any], Optional[Dict[str, Any]]]:
+        """Снимок для записи в другом потоке и база слияния; снимок становится новой базой.
+
+        Если запись не удастся, писатель повторит ее от прежней базы
+        (см. PersistenceWriter), поэтому изменения не теряются.
+
+        Returns:
+            Кортеж (снимок, снимок предыдущей записи или None)
+        """
+        data, base = self.snapshot(), self.saved
+        self.saved = data
+        return data, base
+
+    def save(self, path: str = ACHIEVEMENTS_FILE) -> None:
+        """Сохраняет прогресс, не теряя изменений других процессов."""
+        data = self.snapshot()
+        # База сдвигается только после успешной записи, иначе изменения потерялись бы
+        if self.write_snapshot(path, data, self.saved):
+            self.saved = data
+
+    @staticmethod
+    def write_snapshot(path: str, data: Dict[str, Any], base: Optional[Dict[str, Any]] = None) -> bool:
+        """Записывает снимок под блокировкой файла (со слиянием относительно base); True при успехе."""
+        def _merge(disk: Any) -> Dict[str, Any]:
+            return data if base is None else merge_snapshots(disk, data, base)
+
+        try:
+            locked_update(path, _merge, {"players": {}})
+        except OSError as exc:
+            events.report_error("сохранения достижений", exc)
+            return False
+        return True
+
+
+def merge_snapshots(disk: Any, mine: Dict[str, Any], base: Dict[str, Any]) -> Dict[str, Any]:
+    """Оптимистичное слияние прогресса.
+
+    Накопительные счетчики складываются (диск + свои изменения с base),
+    серии берутся свои, если у игрока были свои партии, полученные
+    достижения объединяются с самым ранним временем.
+
+    Args:
+        disk: Данные файла, прочитанные под блокировкой
+        mine: Свой текущий снимок
+        base: Свой снимок на момент предыдущей записи
+
+    Returns:
+        Объединенные данные для записи
+    """
+    players = dict(disk.get("players", {})) if isinstance(disk, dict) else {}
+    previous = base.get("players", {})
+    for player_id, item in mine.get("players", {}).items():
+        old = previous.get(player_id, {})
+        if item == old:
+            continue  # С прошлой записи игрок не играл
+        current = players.get(player_id)
+        if not isinstance(current, dict):
+            players[player_id] = item
+            continue
+        counts = dict(current.get("counts", {}))
+        for rule_id, value in item["counts"].items():
+            counts[rule_id] = int(counts.get(rule_id, 0)) + value - int(old.get("counts", {}).get(rule_id, 0))
+        unlocked = dict(current.get("unlocked", {}))
+        for rule_id, ts in item["unlocked"].items():
+            unlocked[rule_id] = min(int(unlocked.get(rule_id, ts)), ts)
+        players[player_id] = {"counts": counts, "streaks": item["streaks"], "unlocked": unlocked}
+    return {"players": players}
+
+
+def load_rules(path: Optional[str]) -> Optional[List[Dict[str, Any]]]:
+    """Читает правила из JSON-файла (список словарей); None — правила по умолчанию."""
+    if not path:
+        return None
+    with open(path, "r", encoding="utf-8") as f:
+        rules = json.load(f)
+    if not isinstance(rules, list):
+        raise ValueError("файл правил должен содержать список")
+    return rules
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Пересчитывает достижения по истории или выводит их."""
+    import settings  # Импорт здесь: настройки нужны только командной строке
+
+    parser = argparse.ArgumentParser(description="Достижения игроков")
+    parser.add_argument("--backfill", action="store_true", help="Пересчитать по всей истории и записать")
+    parser.add_argument("--rules", default=None, help="JSON-файл правил (по умолчанию встроенные)")
+    args = parser.parse_args(argv)
+
+    config = settings.load([])
+    try:
+        engine = AchievementEngine(load_rules(args.rules))
+    except (OSError, ValueError, KeyError, TypeError) as exc:
+        parser.error(f"ошибка правил: {exc}")
+
+    if args.backfill:
+        started = time.perf_counter()
+        records = iter_all_history(config.history_file, config.archive_dir)
+        store, games = AchievementStore.backfill(records, engine)
+        # Пересчет заменяет файл целиком
+        AchievementStore.write_snapshot(config.achievements_file, store.snapshot())
+        print(f"Учтено партий: {games}, игроков: {len(store.players)} ({time.perf_counter() - started:.2f} с)")
+    else:
+        store = AchievementStore.load(config.achievements_file, engine)
+
+    from profiles import ProfileStore  # Имена игроков для отчета
+    profiles = ProfileStore.load(config.profiles_file)
+    for player_id in store.players:
+        profile = profiles.get(player_id)
+        titles = ", ".join(rule.title for rule, _ts in store.unlocked(player_id)) or "—"
+        print(f"{profile.name if profile else player_id}: {titles}")
+
+
+if __name__ == "__main__":
+    main()
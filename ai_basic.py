@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+# Простые стратегии ИИ: случайный ход и уровни на основе индекса угроз
+# (выиграть/заблокировать, создать вилку, заблокировать вилку соперника)
+
+# Импортируем необходимые модули
+from typing import Optional  # Для указания типов данных
+import random  # Для генератора случайных чисел стратегий
+
+import engine  # Правила игры (поле, выигрышные линии)
+from ai_registry import AIStrategy  # Базовый класс стратегии
+from threats import ThreatIndex  # Инкрементальный индекс угроз
+
+
+class RandomStrategy(AIStrategy):
+    """Легкий уровень: всегда случайный ход."""
+
+    def select(self, board: str, player: str, rng: random.Random,
+               threats: Optional[ThreatIndex] = None) -> Optional[int]:
+        """Выбирает случайную свободную клетку."""
+        cells = engine.empty_cells(board)
+        self.nodes = len(cells)
+        return rng.choice(cells) if cells else None
+
+
+class WinBlockStrategy(AIStrategy):
+    """Средний уровень: выиграть, иначе заблокировать, иначе случайный ход."""
+
+    def tactical_move(self, threats: ThreatIndex, player: str) -> Optional[int]:
+        """Ход по индексу угроз; наследники добавляют свои правила."""
+        # Выигрышный ход ИИ
+        cells = threats.winning_cells(player)
+        self.nodes += 1
+        if not cells:
+            # Блокировка выигрышного хода соперника
+            cells = threats.winning_cells(engine.other(player))
+            self.nodes += 1
+        # Из равных ходов берем клетку с наименьшим индексом (как при обходе поля)
+        return min(cells) if cells else None
+
+    def select(self, board: str, player: str, rng: random.Random,
+               threats: Optional[ThreatIndex] = None) -> Optional[int]:
+        """Выбирает ход по правилам уровня или случайную клетку."""
+        if threats is None:
+            threats = ThreatIndex.from_board(board)
+        move = self.tactical_move(threats, player)
+        if move is None:
+            # Если подходящих ходов нет - случайный ход
+            cells = engine.empty_cells(board)
+            move = rng.choice(cells) if cells else None
+        return move
+
+
+class ForkStrategy(WinBlockStrategy):
+    """Уровень Tricky: дополнительно создает вилки (две угрозы сразу)."""
+
+    def tactical_move(self, threats: ThreatIndex, player: str) -> Optional[int]:
+        """Выигрыш, блокировка, затем создание вилки."""
+        move = super().tactical_move(threats, player)
+        if move is None:
+            forks = threats.fork_cells(player)
+            self.nodes += 1
+            move = min(forks) if forks else None
+        return move
+
+
+class ForkBlockStrategy(ForkStrategy):
+    """Уровень Strong: дополнительно не дает сопернику создать вилку."""
+
+    def tactical_move(self, threats: ThreatIndex, player: str) -> Optional[int]:
+        """Выигрыш, блокировка, своя вилка, защита от вилки, центр."""
+        move = super().tactical_move(threats, player)
+        if move is not None:
+            return move
+
+        opponent_forks = threats.fork_cells(engine.other(player))
+        self.nodes += 1
+        if len(opponent_forks) == 1:
+            # Единственную вилку соперника просто занимаем
+            return next(iter(opponent_forks))
+        if opponent_forks:
+            # Создаем угрозу, защита от которой не дает сопернику вилку
+            for cell, defence in sorted(threats.forcing_moves(player).items()):
+                self.nodes += 1
+                if defence not in opponent_forks:
+                    return cell
+            return min(opponent_forks)
+
+        # Центр — самая сильная клетка
+        return 4 if not threats.board[4] else None
@@ -0,0 +1,431 @@
+# -*- coding: utf-8 -*-
+# Обучаемая стратегия ИИ: небольшая модель ценности и политики на NumPy
+# Один скрытый слой (tanh) и две головы: ценность позиции для ходящего (-1..1)
+# и логиты ходов. Ход выбирается за один векторный прямой проход по текущей
+# позиции и всем позициям после допустимых ходов, поэтому стоимость хода
+# фиксирована и не растет экспоненциально, как у перебора.
+#
+# Веса обучаются самоигрой пакетами партий против стратегий из ai_registry
+# и хранятся в компактном файле .npz, который загружается при первом ходе:
+#     python ai_policy.py --iterations 100 --opponents easy normal strong hard self
+#
+# NumPy не обязателен: без него (или без файла весов) стратегия играет как Normal.
+
+# Импортируем необходимые модули
+from typing import Any, Dict, List, Optional, Tuple  # Для указания типов данных
+import argparse  # Для разбора аргументов командной строки
+import importlib  # Для необязательной загрузки numpy
+import os  # Для атомарной замены файла весов
+import random  # Для генераторов случайных чисел стратегий
+import tempfile  # Для временного файла весов
+import threading  # Блокировка ленивой загрузки весов
+import time  # Для замера времени обучения
+
+import ai_registry  # Стратегии-соперники при обучении
+from ai_basic import WinBlockStrategy  # Запасной уровень без модели
+import engine  # Правила игры
+import events  # Шина событий (ошибки загрузки весов)
+import settings  # Путь к файлу весов
+from threats import ThreatIndex  # Индекс угроз для запасного уровня
+
+# Пытаемся загрузить numpy (модель без него недоступна)
+try:
+    NUMPY: Any = importlib.import_module("numpy")
+except ImportError as _numpy_exc:
+    events.report_error("загрузки numpy (стратегия Policy играет как Normal)", _numpy_exc)
+    NUMPY = None
+
+# Коды символов поля (поле — ASCII-строка, см. engine)
+_X, _O, _EMPTY = ord("X"), ord("O"), ord(engine.EMPTY)
+
+# Вес логарифма вероятности политики в оценке хода
+POLICY_WEIGHT: float = 0.1
+
+# Имена массивов модели в файле весов
+_PARAMS: Tuple[str, ...] = ("w1", "b1", "wv", "bv", "wp", "bp")
+
+
+class PolicyModel:
+    """Сеть ценности и политики: 3 канала клеток -> скрытый слой -> (ценность, логиты)."""
+
+    def __init__(self, params: Dict[str, Any], cells: int = 9) -> None:
+        """Создает модель из массивов весов.
+
+        Args:
+            params: Массивы w1, b1, wv, bv, wp, bp (float32)
+            cells: Количество клеток поля
+        """
+        self.cells: int = cells
+        self.params: Dict[str, Any] = params
+
+    @classmethod
+    def create(cls, hidden: int, seed: int, cells: int = 9) -> "PolicyModel":
+        """Новая модель со случайными весами (масштаб 1/sqrt(входов))."""
+        np = NUMPY
+        gen = np.random.default_rng(seed)
+        inputs = 3 * cells
+        params = {
+            "w1": gen.normal(0.0, inputs ** -0.5, (inputs, hidden)),
+            "b1": np.zeros(hidden),
+            "wv": gen.normal(0.0, hidden ** -0.5, hidden),
+            "bv": np.zeros(1),
+            "wp": gen.normal(0.0, hidden ** -0.5, (hidden, cells)),
+            "bp": np.zeros(cells),
+        }
+        return cls({k: v.astype(np.float32) for k, v in params.items()}, cells)
+
+    @classmethod
+    def load(cls, path: str) -> "PolicyModel":
+        """Загружает модель из файла .npz."""
+        with NUMPY.load(path) as data:
+            params = {name: data[name] for name in _PARAMS}
+            return cls(params, int(data["cells"]))
+
+    def save(self, path: str) -> None:
+        """Атомарно записывает веса в сжатый файл .npz."""
+        directory = os.path.dirname(os.path.abspath(path))
+        fd, tmp_path = tempfile.mkstemp(prefix=os.path.basename(path) + ".", suffix=".tmp", dir=directory)
+        try:
+            with os.fdopen(fd, "wb") as f:
+                NUMPY.savez_compressed(f, cells=self.cells, **self.params)
+            os.replace(tmp_path, path)
+        except BaseException:
+            # Не оставляем временный файл при ошибке
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    @property
+    def nbytes(self) -> int:
+        """Память, занятая весами, в байтах."""
+        return sum(int(array.nbytes) for array in self.params.values())
+
+    def features(self, boards: List[str], players: List[str]) -> Any:
+        """Входы сети для пакета позиций: свои знаки, чужие знаки, пустые клетки.
+
+        Args:
+            boards: Строки полей
+            players: Символ ходящего для каждого поля
+
+        Returns:
+            Массив (пакет, 3 * клеток) float32
+        """
+        np = NUMPY
+        codes = np.frombuffer("".join(boards).encode("ascii"), dtype=np.uint8).reshape(len(boards), self.cells)
+        own = np.array([_X if p == "X" else _O for p in players], dtype=np.uint8)[:, None]
+        opp = np.where(own == _X, _O, _X).astype(np.uint8)
+        return np.concatenate([codes == own, codes == opp, codes == _EMPTY], axis=1).astype(np.float32)
+
+    def forward(self, x: Any) -> Tuple[Any, Any, Any]:
+        """Прямой проход: (скрытый слой, ценность (пакет,), логиты (пакет, клеток))."""
+        np = NUMPY
+        p = self.params
+        hidden = np.tanh(x @ p["w1"] + p["b1"])
+        value = np.tanh(hidden @ p["wv"] + p["bv"][0])
+        logits = hidden @ p["wp"] + p["bp"]
+        return hidden, value, logits
+
+    def move_scores(self, positions: List[Tuple[str, str]]) -> List[Dict[int, float]]:
+        """Оценки всех допустимых ходов для пакета позиций одним прямым проходом.
+
+        Оценка хода = -ценность позиции после хода (для соперника)
+        + POLICY_WEIGHT * log вероятности хода по политике.
+
+        Args:
+            positions: Пары (поле, символ ходящего) незаконченных партий
+
+        Returns:
+            Для каждой позиции словарь: клетка -> оценка
+        """
+        np = NUMPY
+        boards: List[str] = []
+        players: List[str] = []
+        layout: List[Tuple[int, Tuple[int, ...]]] = []
+        for board, player in positions:
+            cells = engine.empty_cells(board)
+            layout.append((len(boards), cells))
+            boards.append(board)
+            players.append(player)
+            opponent = engine.other(player)
+            for cell in cells:
+                boards.append(engine.play(board, cell, player))
+                players.append(opponent)
+        _hidden, value, logits = self.forward(self.features(boards, players))
+
+        result = []
+        for (row, cells), (board, player) in zip(layout, positions):
+            legal = logits[row, list(cells)]
+            log_probs = legal - legal.max()
+            log_probs = log_probs - np.log(np.exp(log_probs).sum())
+            scores: Dict[int, float] = {}
+            for i, cell in enumerate(cells):
+                child = boards[row + 1 + i]
+                # Конец партии известен точно — модель не нужна
+                if engine.winner(child) == player:
+                    child_value = 1.0
+                elif engine.EMPTY not in child:
+                    child_value = 0.0
+                else:
+                    child_value = -float(value[row + 1 + i])
+                scores[cell] = child_value + POLICY_WEIGHT * float(log_probs[i])
+            result.append(scores)
+        return result
+
+
+class PolicyStrategy(WinBlockStrategy):
+    """Уровень Policy: ход по обученной модели; без numpy или весов — как Normal."""
+
+    def __init__(self) -> None:
+        """Создает стратегию; веса загружаются при первом ходе."""
+        super().__init__()
+        self.model: Optional[PolicyModel] = None
+        self.load_tried: bool = False
+        # Доски общего пула ИИ могут запросить модель одновременно
+        self.load_lock = threading.Lock()
+
+    def get_model(self) -> Optional[PolicyModel]:
+        """Лениво загружает модель из файла весов (один раз)."""
+        with self.load_lock:
+            if not self.load_tried:
+                path = settings.get().policy_file
+                if NUMPY is None:
+                    pass  # Предупреждение уже выведено при импорте
+                elif not os.path.exists(path):
+                    events.report_error(f"загрузки весов {path}", "нет файла, обучите модель: python ai_policy.py")
+                else:
+                    try:
+                        self.model = PolicyModel.load(path)
+                    except (OSError, KeyError, ValueError) as exc:
+                        events.report_error(f"загрузки весов {path}", exc)
+                # Флаг ставится после загрузки: другой поток не получит None вместо модели
+                self.load_tried = True
+        return self.model
+
+    def select(self, board: str, player: str, rng: random.Random,
+               threats: Optional[ThreatIndex] = None) -> Optional[int]:
+        """Выбирает ход с наибольшей оценкой модели."""
+        model = self.get_model()
+        if model is None or len(board) != model.cells:
+            return super().select(board, player, rng, threats)
+        cells = engine.empty_cells(board)
+        if not cells:
+            return None
+        # Один прямой проход: позиция и все позиции после ходов
+        self.nodes = len(cells) + 1
+        scores = model.move_scores([(board, player)])[0]
+        return max(cells, key=lambda cell: scores[cell])
+
+    def memory_bytes(self) -> int:
+        """Память, занятая весами модели."""
+        return self.model.nbytes if self.model is not None else 0
+
+
+def self_play(model: PolicyModel, opponents: List[str], games: int, temperature: float,
+              gen: Any, rng: random.Random) -> Tuple[List[Tuple[str, str, int]], List[int], Dict[str, List[int]]]:
+    """Играет пакет партий; ходы модели во всех партиях считаются одним проходом.
+
+    Args:
+        model: Обучаемая модель
+        opponents: Уровни ai_registry или "self" (модель за обе стороны)
+        games: Количество партий
+        temperature: Температура выбора хода модели (0 — всегда лучший)
+        gen: Генератор numpy для выбора ходов модели
+        rng: Генератор стратегий-соперников
+
+    Returns:
+        Кортеж (ходы (поле, ходящий, клетка), исход для ходящего, итоги модели по соперникам)
+    """
+    np = NUMPY
+    # Партия: [поле, сторона модели (None — обе), соперник, ходы]
+    states: List[List[Any]] = []
+    for n in range(games):
+        opponent = opponents[n % len(opponents)]
+        side = None if opponent == "self" else ("X" if (n // len(opponents)) % 2 == 0 else "O")
+        states.append([engine.EMPTY_BOARD, side, opponent, []])
+    samples: List[Tuple[str, str, int]] = []
+    outcomes: List[int] = []
+    # Итоги модели: соперник -> [победы, поражения, ничьи]
+    results: Dict[str, List[int]] = {name: [0, 0, 0] for name in opponents}
+    active = list(range(games))
+    while active:
+        model_turn, other_turn = [], []
+        for n in active:
+            board, side, _opponent, moves = states[n]
+            player = "X" if len(moves) % 2 == 0 else "O"
+            (model_turn if side is None or side == player else other_turn).append((n, player))
+        if model_turn:
+            all_scores = model.move_scores([(states[n][0], player) for n, player in model_turn])
+            for (n, player), scores in zip(model_turn, all_scores):
+                cells = list(scores)
+                values = np.array([scores[c] for c in cells])
+                if temperature > 0:
+                    weights = np.exp((values - values.max()) / temperature)
+                    cell = cells[int(gen.choice(len(cells), p=weights / weights.sum()))]
+                else:
+                    cell = cells[int(values.argmax())]
+                states[n][3].append((states[n][0], player, cell))
+        for n, player in other_turn:
+            board = states[n][0]
+            cell = ai_registry.get_strategy(states[n][2]).choose_move(board, player, rng)
+            states[n][3].append((board, player, cell))
+
+        still_active = []
+        for n in active:
+            board, side, opponent, moves = states[n]
+            _before, player, cell = moves[-1]
+            board = states[n][0] = engine.play(board, cell, player)
+            won = engine.winner(board)
+            if won is None and engine.EMPTY in board:
+                still_active.append(n)
+                continue
+            # Партия закончена: исход каждого хода для того, кто его сделал
+            for position, mover, move in moves:
+                samples.append((position, mover, move))
+                outcomes.append(0 if won is None else 1 if won == mover else -1)
+            if won is None:
+                results[opponent][2] += 1
+            elif side is None:
+                # Модель за обе стороны: победы X и победы O
+                results[opponent][0 if won == "X" else 1] += 1
+            else:
+                results[opponent][0 if won == side else 1] += 1
+        active = still_active
+    return samples, outcomes, results
+
+
+class Trainer:
+    """Обучение модели по партиям самоигры (Adam, полный обратный проход вручную)."""
+
+    def __init__(self, model: PolicyModel, lr: float) -> None:
+        """Создает оптимизатор для модели."""
+        np = NUMPY
+        self.model: PolicyModel = model
+        self.lr: float = lr
+        self.step: int = 0
+        # Моменты Adam для каждого массива весов
+        self.m: Dict[str, Any] = {k: np.zeros_like(v) for k, v in model.params.items()}
+        self.v: Dict[str, Any] = {k: np.zeros_like(v) for k, v in model.params.items()}
+
+    def train_batch(self, x: Any, moves: Any, values: Any, policy_weights: Any) -> Tuple[float, float]:
+        """Один шаг обучения.
+
+        Args:
+            x: Входы (пакет, 3 * клеток)
+            moves: Сделанные ходы (пакет,)
+            values: Исход партии для ходящего (пакет,)
+            policy_weights: Вес примера для политики (ходы проигравшего не учим)
+
+        Returns:
+            Кортеж (ошибка ценности, ошибка политики)
+        """
+        np = NUMPY
+        model, p = self.model, self.model.params
+        size, cells = len(x), model.cells
+        hidden, value, logits = model.forward(x)
+
+        # Ценность: среднеквадратичная ошибка
+        diff = value - values
+        value_loss = float((diff ** 2).mean())
+        d_value = 2.0 * diff / size * (1.0 - value ** 2)
+
+        # Политика: перекрестная энтропия по допустимым (пустым) клеткам
+        logits = np.where(x[:, 2 * cells:] > 0, logits, -1e9)
+        logits = logits - logits.max(axis=1, keepdims=True)
+        probs = np.exp(logits)
+        probs /= probs.sum(axis=1, keepdims=True)
+        total_weight = max(float(policy_weights.sum()), 1.0)
+        rows = np.arange(size)
+        policy_loss = float(-(policy_weights * np.log(probs[rows, moves] + 1e-9)).sum() / total_weight)
+        d_logits = probs
+        d_logits[rows, moves] -= 1.0
+        d_logits *= (policy_weights / total_weight)[:, None]
+
+        # Обратный проход
+        d_hidden = np.outer(d_value, p["wv"]) + d_logits @ p["wp"].T
+        d_hidden *= 1.0 - hidden ** 2
+        grads = {
+            "w1": x.T @ d_hidden,
+            "b1": d_hidden.sum(axis=0),
+            "wv": hidden.T @ d_value,
+            "bv": np.array([d_value.sum()]),
+            "wp": hidden.T @ d_logits,
+            "bp": d_logits.sum(axis=0),
+        }
+        # Шаг Adam
+        self.step += 1
+        beta1, beta2 = 0.9, 0.999
+        for name, grad in grads.items():
+            self.m[name] = beta1 * self.m[name] + (1 - beta1) * grad
+            self.v[name] = beta2 * self.v[name] + (1 - beta2) * grad ** 2
+            m_hat = self.m[name] / (1 - beta1 ** self.step)
+            v_hat = self.v[name] / (1 - beta2 ** self.step)
+            p[name] = (p[name] - self.lr * m_hat / (np.sqrt(v_hat) + 1e-8)).astype(np.float32)
+        return value_loss, policy_loss
+
+    def fit(self, samples: List[Tuple[str, str, int]], outcomes: List[int],
+            epochs: int, batch: int, gen: Any) -> Tuple[float, float]:
+        """Несколько эпох обучения по собранным ходам; средние ошибки последней эпохи."""
+        np = NUMPY
+        x = self.model.features([s[0] for s in samples], [s[1] for s in samples])
+        moves = np.array([s[2] for s in samples])
+        values = np.array(outcomes, dtype=np.float32)
+        # Политику учим на ходах победителя и ходах ничьих партий
+        policy_weights = (values >= 0).astype(np.float32)
+        losses = (0.0, 0.0)
+        for _epoch in range(epochs):
+            order = gen.permutation(len(samples))
+            totals, batches = [0.0, 0.0], 0
+            for start in range(0, len(order), batch):
+                part = order[start:start + batch]
+                value_loss, policy_loss = self.train_batch(x[part], moves[part], values[part], policy_weights[part])
+                totals[0] += value_loss
+                totals[1] += policy_loss
+                batches += 1
+            losses = (totals[0] / max(batches, 1), totals[1] / max(batches, 1))
+        return losses
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Обучает модель самоигрой и записывает веса."""
+    parser = argparse.ArgumentParser(description="Обучение стратегии Policy самоигрой")
+    parser.add_argument("--iterations", type=int, default=50, help="Итераций (пакет партий + обучение)")
+    parser.add_argument("--games", type=int, default=256, help="Партий в пакете самоигры")
+    parser.add_argument("--opponents", nargs="+", default=["easy", "normal", "strong", "hard", "self"],
+                        help="Соперники: уровни ai_registry или self")
+    parser.add_argument("--hidden", type=int, default=64, help="Размер скрытого слоя")
+    parser.add_argument("--lr", type=float, default=0.003, help="Скорость обучения (Adam)")
+    parser.add_argument("--epochs", type=int, default=2, help="Эпох обучения на пакет")
+    parser.add_argument("--batch", type=int, default=256, help="Размер мини-пакета")
+    parser.add_argument("--temperature", type=float, default=0.3, help="Температура выбора ходов при самоигре")
+    parser.add_argument("--seed", type=int, default=0, help="Зерно генераторов")
+    parser.add_argument("--out", default=None, help="Файл весов (по умолчанию policy_file из настроек)")
+    parser.add_argument("--resume", action="store_true", help="Продолжить обучение с существующих весов")
+    args = parser.parse_args(argv)
+
+    if NUMPY is None:
+        parser.error("для обучения нужен numpy")
+    for name in args.opponents:
+        if name != "self" and name not in ai_registry.available():
+            parser.error(f"неизвестный соперник: {name}")
+    out = args.out or settings.load([]).policy_file
+
+    if args.resume and os.path.exists(out):
+        model = PolicyModel.load(out)
+    else:
+        model = PolicyModel.create(args.hidden, args.seed)
+    trainer = Trainer(model, args.lr)
+    gen = NUMPY.random.default_rng(args.seed)
+    rng = random.Random(args.seed)
+    started = time.perf_counter()
+    for iteration in range(1, args.iterations + 1):
+        samples, outcomes, results = self_play(model, args.opponents, args.games, args.temperature, gen, rng)
+        value_loss, policy_loss = trainer.fit(samples, outcomes, args.epochs, args.batch, gen)
+        summary = " ".join(f"{name} {w}/{l}/{d}" for name, (w, l, d) in results.items())
+        print(f"[{iteration}/{args.iterations}] ценность {value_loss:.4f} политика {policy_loss:.4f} "
+              f"| {summary} | {time.perf_counter() - started:.1f} с")
+    model.save(out)
+    print(f"Веса записаны в {out} ({model.nbytes} байт)")
+
+
+if __name__ == "__main__":
+    main()
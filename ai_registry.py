@@ -0,0 +1,167 @@
+# -*- coding: utf-8 -*-
+# Реестр стратегий ИИ для игры "Крестики-нолики"
+# Каждая стратегия — класс с общим интерфейсом. Модули стратегий импортируются
+# только при первом обращении, поэтому тяжелые стратегии не замедляют запуск.
+# Каждая стратегия учитывает свою стоимость: узлы поиска, время и память.
+
+# Импортируем необходимые модули
+from typing import Any, Dict, List, Optional, Tuple  # Для указания типов данных
+import importlib  # Для ленивой загрузки модулей стратегий
+import random  # Для генератора случайных чисел стратегий
+import threading  # Один экземпляр стратегии ходит сразу в нескольких потоках
+import time  # Для замера времени хода
+
+
+class StrategyStats:
+    """Накопленная стоимость работы стратегии."""
+
+    __slots__ = ("calls", "nodes", "wall_time", "last_nodes", "last_time")
+
+    def __init__(self) -> None:
+        """Создает пустую статистику."""
+        self.calls: int = 0  # Количество сделанных ходов
+        self.nodes: int = 0  # Всего просмотрено узлов (позиций)
+        self.wall_time: float = 0.0  # Суммарное время в секундах
+        self.last_nodes: int = 0  # Узлы последнего хода
+        self.last_time: float = 0.0  # Время последнего хода в секундах
+
+    def add(self, nodes: int, elapsed: float) -> None:
+        """Учитывает стоимость одного хода."""
+        self.calls += 1
+        self.nodes += nodes
+        self.wall_time += elapsed
+        self.last_nodes = nodes
+        self.last_time = elapsed
+
+    @property
+    def avg_time_ms(self) -> float:
+        """Среднее время хода в миллисекундах."""
+        return self.wall_time * 1000 / self.calls if self.calls else 0.0
+
+
+class AIStrategy:
+    """Базовый класс стратегии ИИ.
+
+    Наследники реализуют select() и, при необходимости, memory_bytes().
+    Вызывающий код использует только choose_move(). Один экземпляр может
+    одновременно выбирать ходы в нескольких потоках (доски общего пула ИИ):
+    счетчик узлов хода у каждого потока свой, а статистика обновляется
+    под блокировкой.
+    """
+
+    # Ключ стратегии в реестре и название для меню
+    name: str = ""
+    title: str = ""
+
+    def __init__(self) -> None:
+        """Создает стратегию с пустой статистикой."""
+        self.stats: StrategyStats = StrategyStats()
+        self._stats_lock = threading.Lock()
+        # Состояние текущего хода отдельно для каждого потока
+        self._local = threading.local()
+
+    @property
+    def nodes(self) -> int:
+        """Узлы, просмотренные во время текущего хода этого потока (заполняет select)."""
+        return getattr(self._local, "nodes", 0)
+
+    @nodes.setter
+    def nodes(self, value: int) -> None:
+        """Задает счетчик узлов текущего хода этого потока."""
+        self._local.nodes = value
+
+    def choose_move(self, board: str, player: str, rng: random.Random,
+                    threats: Optional[Any] = None) -> Optional[int]:
+        """Выбирает ход и учитывает его стоимость.
+
+        Args:
+            board: Строка поля (см. engine)
+            player: Символ игрока, за которого ходит ИИ
+            rng: Генератор случайных чисел партии
+            threats: Инкрементальный индекс угроз (threats.ThreatIndex) для этого поля;
+                стратегии только читают его и строят сами, если он не передан
+
+        Returns:
+            Индекс клетки (0-8) или None, если ходов нет
+        """
+        self.nodes = 0
+        started = time.perf_counter()
+        move = self.select(board, player, rng, threats)
+        elapsed = time.perf_counter() - started
+        with self._stats_lock:
+            self.stats.add(self.nodes, elapsed)
+        return move
+
+    def select(self, board: str, player: str, rng: random.Random,
+               threats: Optional[Any] = None) -> Optional[int]:
+        """Выбирает ход (реализуется в наследниках)."""
+        raise NotImplementedError
+
+    def memory_bytes(self) -> int:
+        """Память, занятая структурами стратегии (кэши, таблицы), в байтах."""
+        return 0
+
+
+# Реестр: ключ -> ("модуль:Класс", название). Модули не импортируются заранее.
+_REGISTRY: Dict[str, Tuple[str, str]] = {
+    "easy": ("ai_basic:RandomStrategy", "Easy"),
+    "normal": ("ai_basic:WinBlockStrategy", "Normal"),
+    "tricky": ("ai_basic:ForkStrategy", "Tricky"),
+    "strong": ("ai_basic:ForkBlockStrategy", "Strong"),
+    "hard": ("ai_solver:SolverStrategy", "Hard"),
+    "policy": ("ai_policy:PolicyStrategy", "Policy"),
+}
+
+# Уже созданные стратегии (один экземпляр на ключ)
+_INSTANCES: Dict[str, AIStrategy] = {}
+# Блокировка создания экземпляров (стратегии запрашиваются из потоков пула ИИ)
+_INSTANCES_LOCK = threading.Lock()
+
+
+def register_strategy(name: str, target: str, title: str) -> None:
+    """Регистрирует стратегию без ее импорта.
+
+    Args:
+        name: Ключ стратегии (например, "mcts")
+        target: Путь к классу в виде "модуль:Класс"
+        title: Название для меню выбора сложности
+    """
+    _REGISTRY[name] = (target, title)
+    _INSTANCES.pop(name, None)
+
+
+def available() -> List[str]:
+    """Ключи зарегистрированных стратегий в порядке регистрации."""
+    return list(_REGISTRY)
+
+
+def title_of(name: str) -> str:
+    """Название стратегии для интерфейса (без загрузки модуля)."""
+    entry = _REGISTRY.get(name)
+    return entry[1] if entry else name.capitalize()
+
+
+def get_strategy(name: str) -> AIStrategy:
+    """Возвращает экземпляр стратегии, загружая ее модуль при первом обращении.
+
+    Raises:
+        KeyError: Если стратегия не зарегистрирована
+    """
+    strategy = _INSTANCES.get(name)
+    if strategy is None:
+        with _INSTANCES_LOCK:
+            strategy = _INSTANCES.get(name)
+            if strategy is None:
+                target, title = _REGISTRY[name]
+                module_name, class_name = target.split(":")
+                # Ленивая загрузка модуля стратегии
+                strategy_class = getattr(importlib.import_module(module_name), class_name)
+                strategy = strategy_class()
+                strategy.name, strategy.title = name, title
+                _INSTANCES[name] = strategy
+    return strategy
+
+
+def loaded() -> Dict[str, AIStrategy]:
+    """Стратегии, которые уже были загружены (для отчета о стоимости)."""
+    return dict(_INSTANCES)
@@ -0,0 +1,25 @@
+# -*- coding: utf-8 -*-
+# Сложный уровень ИИ: точный решатель движка с общим кэшем позиций
+
+# Импортируем необходимые модули
+from typing import Any, Optional  # Для указания типов данных
+import random  # Для генератора случайных чисел стратегий
+
+import engine  # Точный решатель с кэшем
+from ai_registry import AIStrategy  # Базовый класс стратегии
+
+
+class SolverStrategy(AIStrategy):
+    """Сложный уровень: идеальная игра по точному решению позиции."""
+
+    def select(self, board: str, player: str, rng: random.Random,
+               threats: Optional[Any] = None) -> Optional[int]:
+        """Выбирает лучший ход; узлы считаем по счетчику решателя."""
+        before = engine.nodes_searched()
+        move = engine.best_move(board, player)
+        self.nodes = engine.nodes_searched() - before
+        return move
+
+    def memory_bytes(self) -> int:
+        """Память кэша решателя (общего с подсказками)."""
+        return engine.cache_bytes()
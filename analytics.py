@@ -0,0 +1,247 @@
+# -*- coding: utf-8 -*-
+# Аналитика истории игр "Крестики-нолики"
+# Потоковая агрегация истории в дневные сводки (rollups) с кэшированием:
+# повторные отчеты обрабатывают только новые записи.
+
+# Импортируем необходимые модули
+from typing import Any, Dict, Iterable, List, Tuple  # Для указания типов данных
+import csv  # Для экспорта отчетов в CSV
+import json  # Для работы с JSON-файлами (чтение/запись)
+import os  # Для работы с файловой системой (проверка файлов)
+import time  # Для определения дня и часа по метке времени
+
+import events  # Шина событий (ошибки чтения и записи данных)
+from history_store import parse_timestamp  # Разбор дат (секунды эпохи или старые строки)
+from storage import atomic_write_json  # Атомарная запись (окна в других процессах читают тот же кэш)
+
+# Файл кэша дневных сводок
+ROLLUPS_FILE: str = "tic_tac_toe_rollups.json"
+
+# Ключ для старых записей без уровня сложности
+LEGACY_KEY: str = "legacy"
+
+# Индексы в тройках результатов [победы X, победы O, ничьи]
+X_WIN, O_WIN, DRAW = 0, 1, 2
+
+
+def _record_outcome(record: Dict[str, Any]) -> int:
+    """Определяет исход партии по записи истории (X_WIN, O_WIN или DRAW)."""
+    winner = record.get("winner")
+    if winner == "X":
+        return X_WIN
+    if winner == "O":
+        return O_WIN
+    if winner == "" or record.get("result") == "Ничья":
+        return DRAW
+    # В старых записях известно только имя победителя — считаем победой X
+    return X_WIN
+
+
+class DayRollup:
+    """Сводка за один день: партии по часам, ничьи и результаты по сложности."""
+
+    __slots__ = ("games", "draws", "hours", "by_difficulty")
+
+    def __init__(self) -> None:
+        """Создает пустую сводку."""
+        self.games: int = 0  # Количество партий за день
+        self.draws: int = 0  # Количество ничьих за день
+        self.hours: List[int] = [0] * 24  # Партии по часам суток
+        # Результаты по уровню сложности: уровень -> [победы X, победы O, ничьи]
+        self.by_difficulty: Dict[str, List[int]] = {}
+
+    def add(self, hour: int, difficulty: str, outcome: int) -> None:
+        """Добавляет одну партию в сводку."""
+        self.games += 1
+        self.hours[hour] += 1
+        if outcome == DRAW:
+            self.draws += 1
+        self.by_difficulty.setdefault(difficulty, [0, 0, 0])[outcome] += 1
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Преобразует сводку в словарь для сохранения в JSON."""
+        return {
+            "games": self.games,
+            "draws": self.draws,
+            "hours": self.hours,
+            "by_difficulty": self.by_difficulty,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "DayRollup":
+        """Восстанавливает сводку из словаря."""
+        rollup = cls()
+        rollup.games = int(data.get("games", 0))
+        rollup.draws = int(data.get("draws", 0))
+        rollup.hours = [int(x) for x in data.get("hours", [0] * 24)][:24]
+        rollup.by_difficulty = {
+            str(k): [int(x) for x in v] for k, v in data.get("by_difficulty", {}).items()
+        }
+        return rollup
+
+
+class HistoryAnalytics:
+    """Отчеты по истории игр на основе кэшированных дневных сводок."""
+
+    def __init__(self) -> None:
+        """Создает пустую аналитику."""
+        # Сводки по дням: "ГГГГ-ММ-ДД" -> DayRollup
+        self.days: Dict[str, DayRollup] = {}
+        # Водяной знак: метка времени последней учтенной записи
+        self.watermark: int = 0
+        # Сколько записей с датой, равной водяному знаку, уже учтено
+        self.watermark_count: int = 0
+
+    def refresh(self, records: Iterable[Dict[str, Any]]) -> int:
+        """Учитывает только новые записи из потока истории.
+
+        Записи идут в хронологическом порядке, поэтому все, что не новее
+        водяного знака, уже есть в сводках и пропускается без агрегации.
+
+        Args:
+            records: Поток записей истории
+
+        Returns:
+            Количество новых учтенных записей
+        """
+        added = 0
+        seen_at_watermark = 0
+        for record in records:
+            date = parse_timestamp(record.get("date", 0))
+            if not date:
+                continue  # Некорректная дата
+            if date < self.watermark:
+                continue  # Уже учтено
+            if date == self.watermark:
+                # Записи с той же секундой: пропускаем уже учтенные
+                seen_at_watermark += 1
+                if seen_at_watermark <= self.watermark_count:
+                    continue
+                self.watermark_count += 1
+            else:
+                self.watermark = date
+                self.watermark_count = 1
+                seen_at_watermark = 1
+
+            # День и час по локальному времени (без strptime/strftime)
+            local = time.localtime(date)
+            day, hour = f"{local.tm_year:04d}-{local.tm_mon:02d}-{local.tm_mday:02d}", local.tm_hour
+            rollup = self.days.get(day)
+            if rollup is None:
+                rollup = self.days[day] = DayRollup()
+            rollup.add(hour, str(record.get("difficulty", LEGACY_KEY)), _record_outcome(record))
+            added += 1
+        return added
+
+    def games_per_hour(self) -> List[int]:
+        """Количество партий по часам суток за все время."""
+        totals = [0] * 24
+        for rollup in self.days.values():
+            for hour, count in enumerate(rollup.hours):
+                totals[hour] += count
+        return totals
+
+    def draw_rate_by_day(self) -> List[Tuple[str, int, int, float]]:
+        """Доля ничьих по дням: список (день, партии, ничьи, доля)."""
+        return [
+            (day, r.games, r.draws, r.draws / r.games if r.games else 0.0)
+            for day, r in sorted(self.days.items())
+        ]
+
+    def difficulty_totals(self) -> Dict[str, List[int]]:
+        """Суммарные результаты по сложности: уровень -> [победы X, победы O, ничьи]."""
+        totals: Dict[str, List[int]] = {}
+        for rollup in self.days.values():
+            for difficulty, counts in rollup.by_difficulty.items():
+                acc = totals.setdefault(difficulty, [0, 0, 0])
+                for i in range(3):
+                    acc[i] += counts[i]
+        return totals
+
+    def win_rate_by_difficulty(self) -> Dict[str, Tuple[int, float, float, float]]:
+        """Результаты по сложности: уровень -> (партии, доля X, доля O, доля ничьих)."""
+        report = {}
+        for difficulty, (x_wins, o_wins, draws) in sorted(self.difficulty_totals().items()):
+            games = x_wins + o_wins + draws
+            report[difficulty] = (games, x_wins / games, o_wins / games, draws / games)
+        return report
+
+    def busiest_days(self, limit: int = 5) -> List[Tuple[str, int]]:
+        """Самые активные дни: список (день, партии)."""
+        ranked = sorted(self.days.items(), key=lambda kv: (-kv[1].games, kv[0]))
+        return [(day, r.games) for day, r in ranked[:limit]]
+
+    def format_report(self) -> str:
+        """Формирует текстовый отчет для окна статистики."""
+        lines = ["Партии по часам:"]
+        per_hour = self.games_per_hour()
+        peak = max(per_hour) or 1
+        for hour, count in enumerate(per_hour):
+            if count:
+                lines.append(f"  {hour:02d}:00  {'█' * max(1, count * 20 // peak)} {count}")
+
+        lines.append("")
+        lines.append("Результаты по сложности (X / O / ничьи):")
+        for difficulty, (games, x_rate, o_rate, d_rate) in self.win_rate_by_difficulty().items():
+            lines.append(
+                f"  {difficulty:<8} {games:>5} игр: {x_rate:5.0%} / {o_rate:5.0%} / {d_rate:5.0%}"
+            )
+
+        lines.append("")
+        lines.append("Доля ничьих по дням:")
+        for day, games, draws, rate in self.draw_rate_by_day()[-14:]:
+            lines.append(f"  {day}  {draws:>4}/{games:<4} {rate:5.0%}")
+
+        lines.append("")
+        lines.append("Самые активные дни:")
+        for day, games in self.busiest_days():
+            lines.append(f"  {day}  {games} игр")
+        return "\n".join(lines)
+
+    def export_csv(self, path: str) -> None:
+        """Экспортирует все отчеты в один CSV-файл (раздел, ключ, значения)."""
+        with open(path, "w", encoding="utf-8", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(["section", "key", "games", "x_wins", "o_wins", "draws"])
+            for day, rollup in sorted(self.days.items()):
+                wins = [0, 0, 0]
+                for counts in rollup.by_difficulty.values():
+                    for i in range(3):
+                        wins[i] += counts[i]
+                writer.writerow(["day", day, rollup.games, wins[0], wins[1], wins[2]])
+            for hour, count in enumerate(self.games_per_hour()):
+                writer.writerow(["hour", f"{hour:02d}", count, "", "", ""])
+            for difficulty, (x_wins, o_wins, draws) in sorted(self.difficulty_totals().items()):
+                writer.writerow(["difficulty", difficulty, x_wins + o_wins + draws, x_wins, o_wins, draws])
+
+    @classmethod
+    def load(cls, path: str = ROLLUPS_FILE) -> "HistoryAnalytics":
+        """Загружает кэш сводок (пустой, если файла нет)."""
+        analytics = cls()
+        if not os.path.exists(path):
+            return analytics
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            analytics.watermark = parse_timestamp(data.get("watermark", 0))
+            analytics.watermark_count = int(data.get("watermark_count", 0))
+            analytics.days = {
+                str(day): DayRollup.from_dict(item) for day, item in data.get("days", {}).items()
+            }
+        except (json.JSONDecodeError, OSError, ValueError, TypeError) as exc:
+            events.report_error("загрузки сводок", exc)
+            return cls()
+        return analytics
+
+    def save(self, path: str = ROLLUPS_FILE) -> None:
+        """Сохраняет кэш сводок в файл."""
+        data = {
+            "watermark": self.watermark,
+            "watermark_count": self.watermark_count,
+            "days": {day: rollup.to_dict() for day, rollup in self.days.items()},
+        }
+        try:
+            # Кэш восстанавливается по истории, поэтому слияние не нужно — только атомарность
+            atomic_write_json(path, data, indent=None)
+        except OSError as exc:
+            events.report_error("сохранения сводок", exc)
@@ -0,0 +1,313 @@
+# -*- coding: utf-8 -*-
+# Архив истории игр "Крестики-нолики"
+# Быстрое хранилище (tic_tac_toe_history.json) держит только последние партии
+# по max_days и max_games; вытесненные записи не удаляются, а дописываются в
+# сжатые помесячные разделы архива (zstd, если установлен zstandard, иначе
+# gzip). Оглавление index.json хранит для каждого раздела файл, число записей
+# и диапазон дат, поэтому запросы по датам распаковывают только нужные
+# разделы, и то потоково — запись за записью.
+#
+# Пример:
+#     python archive.py                        # разделы архива
+#     python archive.py --from 2026-01-01      # партии начиная с даты
+
+# Импортируем необходимые модули
+from typing import Any, Dict, Iterable, Iterator, List, Optional  # Для указания типов данных
+from datetime import datetime  # Для разбора дат командной строки
+import argparse  # Для разбора аргументов командной строки
+import calendar  # Начало раздела по UTC
+import gzip  # Сжатие разделов по умолчанию
+import importlib  # Для необязательного модуля zstandard
+import io  # Для построчного чтения распакованного потока
+import json  # Для записей и оглавления
+import os  # Для работы с файловой системой
+import time  # Для раздела по дате записи
+
+import events  # Шина событий (ошибки чтения и записи данных)
+from history_store import HISTORY_FILE, append_history, iter_history, parse_timestamp  # Быстрое хранилище
+from storage import FileLock, atomic_write_json, read_json  # Блокировка и атомарная запись оглавления
+
+# Каталог архива по умолчанию
+ARCHIVE_DIR: str = "tic_tac_toe_archive"
+
+# Оглавление архива
+INDEX_FILE: str = "index.json"
+
+# Формат ключа раздела (месяц по UTC — одинаков на всех машинах)
+PARTITION_FORMAT: str = "%Y-%m"
+
+
+def _optional_module(name: str) -> Any:
+    """Импортирует модуль, если он установлен (иначе None)."""
+    try:
+        return importlib.import_module(name)
+    except ImportError:
+        return None
+
+
+# zstandard сжимает лучше и быстрее gzip, но необязателен
+ZSTD: Any = _optional_module("zstandard")
+
+
+def partition_key(timestamp: int) -> str:
+    """Ключ раздела для метки времени записи."""
+    return time.strftime(PARTITION_FORMAT, time.gmtime(timestamp))
+
+
+def partition_start(key: str) -> int:
+    """Метка времени начала раздела key."""
+    return calendar.timegm(time.strptime(key, PARTITION_FORMAT))
+
+
+def _new_partition_file(key: str) -> str:
+    """Имя файла нового раздела (сжатие выбирается по доступным модулям)."""
+    return f"history-{key}.jsonl" + (".zst" if ZSTD is not None else ".gz")
+
+
+def _append_lines(path: str, lines: List[str]) -> None:
+    """Дописывает строки в сжатый раздел.
+
+    И gzip, и zstd допускают несколько сжатых блоков подряд, поэтому
+    дописывание не перепаковывает уже записанные данные.
+    """
+    data = "".join(lines).encode("utf-8")
+    if path.endswith(".zst"):
+        with open(path, "ab") as f:
+            f.write(ZSTD.ZstdCompressor().compress(data))
+    else:
+        with gzip.open(path, "ab") as f:
+            f.write(data)
+
+
+def _open_lines(path: str) -> Any:
+    """Открывает раздел для построчного чтения распакованного текста."""
+    if path.endswith(".zst"):
+        if ZSTD is None:
+            raise OSError("для чтения раздела нужен модуль zstandard")
+        raw = ZSTD.ZstdDecompressor().stream_reader(open(path, "rb"), read_across_frames=True)
+        return io.TextIOWrapper(io.BufferedReader(raw), encoding="utf-8")
+    return gzip.open(path, "rt", encoding="utf-8")
+
+
+def index_path(archive_dir: str) -> str:
+    """Путь к оглавлению архива (его блокировка защищает весь архив)."""
+    return os.path.join(archive_dir, INDEX_FILE)
+
+
+def load_index(archive_dir: str = ARCHIVE_DIR) -> Dict[str, Dict[str, Any]]:
+    """Оглавление архива: ключ раздела -> {"file", "count", "first", "last"}."""
+    data = read_json(index_path(archive_dir), {})
+    partitions = data.get("partitions", {}) if isinstance(data, dict) else {}
+    return {key: item for key, item in partitions.items() if isinstance(item, dict) and "file" in item}
+
+
+def archive_records(records: Iterable[Dict[str, Any]], archive_dir: str = ARCHIVE_DIR) -> int:
+    """Дописывает записи в разделы архива и обновляет оглавление.
+
+    Разделы и оглавление меняются под одной межпроцессной блокировкой
+    оглавления, поэтому несколько процессов могут архивировать одновременно.
+
+    Args:
+        records: Вытесненные записи истории (в хронологическом порядке)
+        archive_dir: Каталог архива
+
+    Returns:
+        Количество заархивированных записей
+    """
+    # Группируем записи по разделам
+    groups: Dict[str, List[str]] = {}
+    dates: Dict[str, List[int]] = {}
+    for record in records:
+        date = parse_timestamp(record.get("date", 0))
+        key = partition_key(date)
+        groups.setdefault(key, []).append(json.dumps(record, ensure_ascii=False) + "\n")
+        dates.setdefault(key, []).append(date)
+    if not groups:
+        return 0
+
+    os.makedirs(archive_dir, exist_ok=True)
+    with FileLock(index_path(archive_dir)):
+        index = load_index(archive_dir)
+        for key, lines in groups.items():
+            info = index.get(key) or {"file": _new_partition_file(key), "count": 0,
+                                      "first": min(dates[key]), "last": max(dates[key])}
+            _append_lines(os.path.join(archive_dir, info["file"]), lines)
+            info["count"] = int(info["count"]) + len(lines)
+            info["first"] = min(int(info["first"]), min(dates[key]))
+            info["last"] = max(int(info["last"]), max(dates[key]))
+            index[key] = info
+        atomic_write_json(index_path(archive_dir), {"partitions": dict(sorted(index.items()))})
+    return sum(len(lines) for lines in groups.values())
+
+
+def store_history(records: Iterable[Dict[str, Any]], history_path: str, archive_dir: str,
+                  max_days: int, max_games: int) -> None:
+    """Добавляет записи в быстрое хранилище; вытесненные записи уходят в архив.
+
+    Все, кто пишет историю (окно игры, турниры), добавляют записи только
+    через эту функцию, поэтому ограничения хранения не удаляют партии,
+    а переносят их в архив.
+
+    Args:
+        records: Новые записи (в хронологическом порядке)
+        history_path: Файл быстрого хранилища
+        archive_dir: Каталог архива ("" — архив отключен, вытесненные записи отбрасываются)
+        max_days: Срок хранения записей в быстром хранилище (дней)
+        max_games: Максимум записей в быстром хранилище
+    """
+    evict = (lambda evicted: archive_records(evicted, archive_dir)) if archive_dir else None
+    append_history(records, history_path, max_days, max_games, evict)
+
+
+def _open_writer(path: str) -> Any:
+    """Открывает новый сжатый раздел для потоковой записи текста."""
+    if path.endswith(".zst"):
+        raw = ZSTD.ZstdCompressor().stream_writer(open(path, "wb"))
+        return io.TextIOWrapper(raw, encoding="utf-8")
+    return gzip.open(path, "wt", encoding="utf-8")
+
+
+def write_partitions(archive_dir: str, from_key: str, records: Iterable[Dict[str, Any]]) -> int:
+    """Переписывает разделы начиная с from_key потоком записей.
+
+    Новые разделы пишутся во временные файлы и заменяют старые только после
+    того, как поток исчерпан, поэтому поток может читать старые разделы.
+    Вызывается под блокировкой оглавления (FileLock(index_path(archive_dir))).
+
+    Args:
+        archive_dir: Каталог архива
+        from_key: Первый переписываемый раздел; более ранние не меняются
+        records: Записи в хронологическом порядке, все не раньше from_key
+
+    Returns:
+        Количество записанных записей
+    """
+    os.makedirs(archive_dir, exist_ok=True)
+    written: Dict[str, Dict[str, Any]] = {}
+    key, writer, total = "", None, 0
+    try:
+        for record in records:
+            date = parse_timestamp(record.get("date", 0))
+            record_key = partition_key(date)
+            if record_key != key:
+                if record_key < key or record_key < from_key:
+                    raise ValueError(f"записи архива не по порядку: {record_key} после {key or from_key}")
+                if writer is not None:
+                    writer.close()
+                key = record_key
+                written[key] = {"file": _new_partition_file(key), "count": 0, "first": date, "last": date}
+                writer = _open_writer(os.path.join(archive_dir, written[key]["file"] + ".tmp"))
+            writer.write(json.dumps(record, ensure_ascii=False) + "\n")
+            info = written[key]
+            info["count"] += 1
+            info["last"] = date
+            total += 1
+    except BaseException:
+        # Не оставляем недописанные временные разделы; старые остаются нетронутыми
+        if writer is not None:
+            writer.close()
+            writer = None
+        for info in written.values():
+            tmp_path = os.path.join(archive_dir, info["file"] + ".tmp")
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        raise
+    finally:
+        if writer is not None:
+            writer.close()
+
+    index = load_index(archive_dir)
+    for old_key in [k for k in index if k >= from_key]:
+        old_file = index.pop(old_key)["file"]
+        # Старый раздел без замены (или с другим сжатием) больше не нужен
+        if old_file != written.get(old_key, {}).get("file") and os.path.exists(os.path.join(archive_dir, old_file)):
+            os.remove(os.path.join(archive_dir, old_file))
+    for new_key, info in written.items():
+        path = os.path.join(archive_dir, info["file"])
+        os.replace(path + ".tmp", path)
+        index[new_key] = info
+    atomic_write_json(index_path(archive_dir), {"partitions": dict(sorted(index.items()))})
+    return total
+
+
+def iter_archive(archive_dir: str = ARCHIVE_DIR, start: int = 0,
+                 end: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+    """Потоково перебирает заархивированные записи за период.
+
+    Разделы, диапазон дат которых не пересекается с периодом, не открываются.
+
+    Args:
+        archive_dir: Каталог архива
+        start: Начало периода (включительно, секунды эпохи)
+        end: Конец периода (не включительно; None — без ограничения)
+
+    Yields:
+        Записи истории в хронологическом порядке
+    """
+    for key, info in sorted(load_index(archive_dir).items()):
+        if int(info.get("last", 0)) < start or (end is not None and int(info.get("first", 0)) >= end):
+            continue  # Раздел целиком вне периода
+        path = os.path.join(archive_dir, info["file"])
+        try:
+            with _open_lines(path) as f:
+                for line in f:
+                    if not line.strip():
+                        continue
+                    record = json.loads(line)
+                    date = parse_timestamp(record.get("date", 0))
+                    if date >= start and (end is None or date < end):
+                        yield record
+        except (OSError, EOFError, ValueError) as exc:
+            # Поврежденный или недописанный раздел не мешает читать остальные
+            events.report_error(f"чтения архива {key}", exc)
+
+
+def iter_all_history(history_path: str = HISTORY_FILE, archive_dir: str = ARCHIVE_DIR,
+                     start: int = 0, end: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+    """Вся история за период: сначала архив, затем быстрое хранилище.
+
+    Архивируются самые старые записи, поэтому порядок остается хронологическим.
+    """
+    if archive_dir:
+        yield from iter_archive(archive_dir, start, end)
+    for record in iter_history(history_path):
+        date = parse_timestamp(record.get("date", 0))
+        if date >= start and (end is None or date < end):
+            yield record
+
+
+def parse_day(text: str) -> int:
+    """Дата "ГГГГ-ММ-ДД" командной строки в метку времени."""
+    return int(datetime.strptime(text, "%Y-%m-%d").timestamp())
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Показывает разделы архива или считает партии за период."""
+    import settings  # Импорт здесь: настройки нужны только командной строке
+
+    parser = argparse.ArgumentParser(description="Архив истории игр")
+    parser.add_argument("--from", dest="start", type=parse_day, default=None, help="Начало периода (ГГГГ-ММ-ДД)")
+    parser.add_argument("--to", dest="end", type=parse_day, default=None, help="Конец периода (не включительно)")
+    args = parser.parse_args(argv)
+
+    config = settings.load([])
+    if not config.archive_dir:
+        parser.error("архив отключен (archive_dir пуст)")
+    if args.start is None and args.end is None:
+        index = load_index(config.archive_dir)
+        if not index:
+            print("Архив пуст.")
+        for key, info in sorted(index.items()):
+            print(f"{key}: {info['count']} партий, {info['file']}")
+        return
+
+    # Итоги за период: X / O / ничьи
+    totals = {"X": 0, "O": 0, "": 0}
+    for record in iter_all_history(config.history_file, config.archive_dir, args.start or 0, args.end):
+        winner = record.get("winner", "")
+        totals[winner if winner in totals else ""] += 1
+    print(f"Партий: {sum(totals.values())} (X: {totals['X']}, O: {totals['O']}, ничьих: {totals['']})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+# -*- coding: utf-8 -*-
+# Игровой движок "Крестики-нолики" без графического интерфейса
+# Точный решатель с кэшем позиций: используется для подсказок и сложного ИИ.
+#
+# Поле — строка из 9 символов: "X", "O" или EMPTY (".") для пустой клетки,
+# клетки нумеруются построчно от 0 до 8.
+
+# Импортируем необходимые модули
+from typing import Dict, Iterable, Optional, Tuple  # Для указания типов данных
+import sys  # Для оценки памяти, занятой кэшем
+import threading  # Счетчик узлов решателя для каждого потока
+
+# Символ пустой клетки в строке поля
+EMPTY: str = "."
+
+# Пустое поле
+EMPTY_BOARD: str = EMPTY * 9
+
+# Все выигрышные линии поля 3x3 (индексы клеток 0-8)
+WIN_LINES: Tuple[Tuple[int, int, int], ...] = (
+    (0, 1, 2), (3, 4, 5), (6, 7, 8),  # Строки
+    (0, 3, 6), (1, 4, 7), (2, 5, 8),  # Столбцы
+    (0, 4, 8), (2, 4, 6),  # Диагонали
+)
+
+# Исходы с точки зрения игрока, который ходит
+WIN, DRAW, LOSS = 1, 0, -1
+
+# Кэш решенных позиций: поле + символ ходящего -> (исход, ходов до конца)
+_SOLVED: Dict[str, Tuple[int, int]] = {}
+
+# Счетчик посещенных узлов решателя (для учета стоимости стратегий); у каждого
+# потока свой, чтобы ходы на соседних досках не попадали в стоимость друг друга
+_NODES = threading.local()
+
+
+def other(player: str) -> str:
+    """Возвращает символ соперника."""
+    return "O" if player == "X" else "X"
+
+
+def board_from_cells(cells: Iterable[str]) -> str:
+    """Преобразует клетки ("" — пусто) в строку поля движка."""
+    return "".join(cell if cell in ("X", "O") else EMPTY for cell in cells)
+
+
+def winner(board: str) -> Optional[str]:
+    """Возвращает символ победителя или None, если победителя нет."""
+    for a, b, c in WIN_LINES:
+        if board[a] != EMPTY and board[a] == board[b] == board[c]:
+            return board[a]
+    return None
+
+
+def winning_line(board: str) -> Optional[Tuple[int, int, int]]:
+    """Возвращает выигрышную линию или None."""
+    for line in WIN_LINES:
+        a, b, c = line
+        if board[a] != EMPTY and board[a] == board[b] == board[c]:
+            return line
+    return None
+
+
+def empty_cells(board: str) -> Tuple[int, ...]:
+    """Индексы пустых клеток поля."""
+    return tuple(i for i, cell in enumerate(board) if cell == EMPTY)
+
+
+def play(board: str, cell: int, player: str) -> str:
+    """Возвращает новое поле после хода (исходное не меняется)."""
+    return board[:cell] + player + board[cell + 1:]
+
+
+def _preference(value: Tuple[int, int]) -> Tuple[int, int]:
+    """Ключ выбора хода: быстрее выигрывать, дольше проигрывать."""
+    outcome, distance = value
+    return outcome, -distance if outcome == WIN else distance
+
+
+def solve(board: str, player: str) -> Tuple[int, int]:
+    """Точно решает позицию с кэшированием.
+
+    Args:
+        board: Строка поля
+        player: Символ игрока, который ходит
+
+    Returns:
+        Кортеж (исход для ходящего: WIN/DRAW/LOSS, количество ходов до конца партии)
+    """
+    _NODES.count = getattr(_NODES, "count", 0) + 1
+    key = board + player
+    cached = _SOLVED.get(key)
+    if cached is not None:
+        return cached
+
+    won = winner(board)
+    if won is not None:
+        # Предыдущий ход уже выиграл партию
+        result = (WIN if won == player else LOSS, 0)
+    elif EMPTY not in board:
+        result = (DRAW, 0)
+    else:
+        result = max(analyze(board, player).values(), key=_preference)
+
+    _SOLVED[key] = result
+    return result
+
+
+def analyze(board: str, player: str) -> Dict[int, Tuple[int, int]]:
+    """Возвращает точную оценку каждого допустимого хода.
+
+    Args:
+        board: Строка поля
+        player: Символ игрока, который ходит
+
+    Returns:
+        Словарь: клетка -> (исход для ходящего, ходов до результата с учетом этого хода)
+    """
+    if winner(board) is not None:
+        return {}  # Партия уже завершена
+    opponent = other(player)
+    values: Dict[int, Tuple[int, int]] = {}
+    for cell in empty_cells(board):
+        outcome, distance = solve(play(board, cell, player), opponent)
+        # Исход соперника противоположен нашему
+        values[cell] = (-outcome, distance + 1)
+    return values
+
+
+def best_move(board: str, player: str) -> Optional[int]:
+    """Лучший ход по точному решению (первый из равных) или None."""
+    values = analyze(board, player)
+    if not values:
+        return None
+    return max(values, key=lambda cell: _preference(values[cell]))
+
+
+def cache_size() -> int:
+    """Количество позиций в кэше решателя."""
+    return len(_SOLVED)
+
+
+def cache_bytes() -> int:
+    """Приблизительный объем памяти кэша решателя в байтах."""
+    if not _SOLVED:
+        return sys.getsizeof(_SOLVED)
+    # Все ключи и значения одного размера — считаем по первому элементу
+    key, value = next(iter(_SOLVED.items()))
+    return sys.getsizeof(_SOLVED) + len(_SOLVED) * (sys.getsizeof(key) + sys.getsizeof(value))
+
+
+def nodes_searched() -> int:
+    """Количество узлов, посещенных решателем в текущем потоке."""
+    return getattr(_NODES, "count", 0)
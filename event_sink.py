@@ -0,0 +1,137 @@
+# -*- coding: utf-8 -*-
+# Журнал и метрики событий игры "Крестики-нолики"
+# Подписчик шины событий (см. events): копит события и пачками дописывает их
+# в журнал JSON Lines, а сводные метрики (ходы, партии по исходам и уровням,
+# длительность партий, достижения, ошибки) прибавляет к файлу метрик.
+# Работает только в потоке шины, поэтому интерфейс не ждет диска.
+
+# Импортируем необходимые модули
+from typing import Any, Dict, List  # Для указания типов данных
+import json  # Для строк журнала
+import os  # Для размера и ротации журнала
+import time  # Для интервала записи
+
+import events  # Шина и типы событий
+from storage import FileLock, locked_update  # Блокировка и запись под межпроцессной блокировкой
+
+# Файлы журнала и метрик по умолчанию
+EVENTS_FILE: str = "tic_tac_toe_events.jsonl"
+METRICS_FILE: str = "tic_tac_toe_metrics.json"
+
+# Журнал больше этого размера переименовывается в "<файл>.1"
+MAX_LOG_BYTES: int = 1_000_000
+
+
+def empty_metrics() -> Dict[str, Any]:
+    """Пустые сводные метрики."""
+    return {
+        "moves": {},  # Ходы: "human"/"ai" -> количество
+        "games": {},  # Партии: "X"/"O"/"draw" -> количество
+        "by_difficulty": {},  # Партии по уровням
+        "duration_s": 0.0,  # Суммарная длительность партий
+        "records": 0,  # Полученные достижения
+        "errors": {},  # Ошибки записи данных по видам
+    }
+
+
+def merge_metrics(total: Any, delta: Dict[str, Any]) -> Dict[str, Any]:
+    """Прибавляет приращение метрик к метрикам на диске."""
+    merged = empty_metrics()
+    if isinstance(total, dict):
+        for key, value in total.items():
+            if key in merged and isinstance(value, type(merged[key])):
+                merged[key] = value
+    for key, value in delta.items():
+        if isinstance(value, dict):
+            for name, count in value.items():
+                merged[key][name] = merged[key].get(name, 0) + count
+        else:
+            merged[key] = round(merged[key] + value, 3)
+    return merged
+
+
+class EventLogSink:
+    """Пакетная запись событий в журнал и метрик в файл."""
+
+    def __init__(self, log_path: str = EVENTS_FILE, metrics_path: str = METRICS_FILE,
+                 batch_size: int = 200, interval_s: float = 2.0) -> None:
+        """Создает приемник событий.
+
+        Args:
+            log_path: Файл журнала (JSON Lines)
+            metrics_path: Файл метрик
+            batch_size: Столько событий записываются сразу, не дожидаясь интервала
+            interval_s: Максимальная задержка записи накопленных событий (с)
+        """
+        self.log_path: str = log_path
+        self.metrics_path: str = metrics_path
+        self.batch_size: int = batch_size
+        self.interval_s: float = interval_s
+        # Накопленные строки журнала
+        self.buffer: List[str] = []
+        self.last_write: float = time.monotonic()
+        # Метрики с прошлой записи; на диске они прибавляются к общим под блокировкой,
+        # поэтому несколько процессов не теряют счетчики друг друга
+        self.delta: Dict[str, Any] = empty_metrics()
+
+    def attach(self, bus: events.EventBus) -> None:
+        """Подписывает приемник на все события шины."""
+        bus.subscribe_all(self.handle)
+        bus.add_idle(self.tick)
+
+    def detach(self, bus: events.EventBus) -> None:
+        """Отписывает приемник и записывает накопленное."""
+        bus.unsubscribe(self.handle)
+        bus.unsubscribe(self.tick)
+        self.write()
+
+    def handle(self, event: Any) -> None:
+        """Учитывает событие в метриках и добавляет его в пачку журнала."""
+        record = {"kind": events.EVENT_KINDS.get(type(event), type(event).__name__)}
+        record.update(event._asdict())
+        self.buffer.append(json.dumps(record, ensure_ascii=False))
+        self.count(event)
+        if len(self.buffer) >= self.batch_size:
+            self.write()
+
+    def count(self, event: Any) -> None:
+        """Обновляет приращение сводных метрик."""
+        delta = self.delta
+        if isinstance(event, events.MovePlayed):
+            delta["moves"][event.source] = delta["moves"].get(event.source, 0) + 1
+        elif isinstance(event, events.GameEnded):
+            outcome = event.winner or "draw"
+            delta["games"][outcome] = delta["games"].get(outcome, 0) + 1
+            delta["by_difficulty"][event.difficulty] = delta["by_difficulty"].get(event.difficulty, 0) + 1
+            delta["duration_s"] += event.duration_s
+        elif isinstance(event, events.RecordReached):
+            delta["records"] += 1
+        elif isinstance(event, events.PersistenceError):
+            delta["errors"][event.target] = delta["errors"].get(event.target, 0) + 1
+
+    def tick(self, force: bool) -> None:
+        """Записывает пачку по истечении интервала (или сразу при force)."""
+        if force or time.monotonic() - self.last_write >= self.interval_s:
+            self.write()
+
+    def write(self) -> None:
+        """Дописывает накопленные события в журнал и прибавляет метрики."""
+        self.last_write = time.monotonic()
+        if self.buffer:
+            lines, self.buffer = self.buffer, []
+            try:
+                # Журнал могут дописывать несколько процессов
+                with FileLock(self.log_path):
+                    if os.path.exists(self.log_path) and os.path.getsize(self.log_path) > MAX_LOG_BYTES:
+                        os.replace(self.log_path, self.log_path + ".1")
+                    with open(self.log_path, "a", encoding="utf-8") as f:
+                        f.write("\n".join(lines) + "\n")
+            except OSError as exc:
+                # Через шину не сообщаем: ошибка записи журнала снова попала бы в журнал
+                print(f"Ошибка записи журнала событий: {exc}")
+        if self.delta != empty_metrics():
+            delta, self.delta = self.delta, empty_metrics()
+            try:
+                locked_update(self.metrics_path, lambda disk: merge_metrics(disk, delta), {})
+            except OSError as exc:
+                print(f"Ошибка записи метрик: {exc}")
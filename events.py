@@ -0,0 +1,223 @@
+# -*- coding: utf-8 -*-
+# Шина событий игры "Крестики-нолики"
+# Типизированные события (ход, конец партии, достижение, ошибка записи данных)
+# публикуются из любого потока без ожидания: событие кладется в очередь,
+# а подписчики вызываются в отдельном потоке шины. Поэтому журнал, метрики
+# и запись на диск никогда не задерживают поток интерфейса.
+#
+# Пример:
+#     bus = events.get_bus()
+#     bus.subscribe(events.GameEnded, lambda event: print(event.winner))
+#     events.publish(events.GameEnded("id", "X", "hard", 5, 12.5))
+
+# Импортируем необходимые модули
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple, Type  # Для указания типов данных
+import atexit  # Чтобы дописать события при выходе из программы
+import queue  # Очередь событий
+import sys  # Для вывода ошибок подписчиков
+import threading  # Поток шины
+import time  # Для меток времени событий
+
+
+class MovePlayed(NamedTuple):
+    """Сделан ход."""
+
+    game_id: str  # Идентификатор партии
+    player: str  # Символ игрока
+    cell: int  # Клетка хода
+    ply: int  # Номер хода (с единицы)
+    source: str  # Кто ходил: "human" или "ai"
+    variant: str = ""  # Вариант игры ("" — поле 3x3)
+    ts: float = 0.0  # Время события (секунды эпохи; 0 — время публикации)
+
+
+class GameEnded(NamedTuple):
+    """Партия завершена."""
+
+    game_id: str  # Идентификатор партии
+    winner: str  # Символ победителя ("" — ничья)
+    difficulty: str  # Уровень ИИ или "pvp"
+    length: int  # Количество ходов
+    duration_s: float  # Длительность партии (с)
+    variant: str = ""  # Вариант игры ("" — поле 3x3)
+    ts: float = 0.0  # Время события
+
+
+class RecordReached(NamedTuple):
+    """Игрок получил достижение (см. achievements)."""
+
+    player: str  # Идентификатор профиля игрока
+    name: str  # Имя игрока
+    achievement: str  # Идентификатор правила достижения
+    title: str  # Название достижения
+    ts: float = 0.0  # Время события
+
+
+class PersistenceError(NamedTuple):
+    """Ошибка чтения или записи файла данных."""
+
+    target: str  # Что читали или писали (например, "сохранения истории")
+    message: str  # Текст ошибки
+    ts: float = 0.0  # Время события
+
+
+# Виды событий для журнала: класс -> ключ
+EVENT_KINDS: Dict[type, str] = {
+    MovePlayed: "move",
+    GameEnded: "game_end",
+    RecordReached: "record",
+    PersistenceError: "error",
+}
+
+# Обработчик события
+Handler = Callable[[Any], None]
+
+# Интервал, с которым поток шины вызывает обработчики простоя (с)
+IDLE_INTERVAL_S: float = 0.5
+
+
+class EventBus:
+    """Шина событий: очередь и один поток, вызывающий подписчиков."""
+
+    def __init__(self) -> None:
+        """Создает очередь и запускает поток шины."""
+        # Элемент очереди: ("event", событие) или служебное ("flush"/"stop", threading.Event)
+        self.queue: "queue.Queue[Tuple[str, Any]]" = queue.Queue()
+        # Подписчики по типу события и подписчики на все события
+        self.handlers: Dict[type, List[Handler]] = {}
+        self.all_handlers: List[Handler] = []
+        # Обработчики простоя: вызываются без событий (force=True при остановке)
+        self.idle_handlers: List[Callable[[bool], None]] = []
+        self.lock = threading.Lock()
+        # Количество доставленных событий
+        self.delivered: int = 0
+        self.thread = threading.Thread(target=self._run, name="event-bus", daemon=True)
+        self.thread.start()
+
+    def subscribe(self, event_type: Type[Any], handler: Handler) -> None:
+        """Подписывает обработчик на события одного типа."""
+        with self.lock:
+            self.handlers.setdefault(event_type, []).append(handler)
+
+    def subscribe_all(self, handler: Handler) -> None:
+        """Подписывает обработчик на все события."""
+        with self.lock:
+            self.all_handlers.append(handler)
+
+    def add_idle(self, handler: Callable[[bool], None]) -> None:
+        """Добавляет обработчик простоя (например, отложенную запись пачки)."""
+        with self.lock:
+            self.idle_handlers.append(handler)
+
+    def unsubscribe(self, handler: Any) -> None:
+        """Отписывает обработчик от всех событий и простоя."""
+        with self.lock:
+            for handlers in self.handlers.values():
+                if handler in handlers:
+                    handlers.remove(handler)
+            for handlers in (self.all_handlers, self.idle_handlers):
+                if handler in handlers:
+                    handlers.remove(handler)
+
+    def publish(self, event: Any) -> None:
+        """Публикует событие без ожидания подписчиков (из любого потока)."""
+        if not event.ts:
+            event = event._replace(ts=time.time())
+        self.queue.put(("event", event))
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Ждет, пока подписчики обработают все опубликованные события.
+
+        Returns:
+            True, если обработка завершилась за отведенное время
+        """
+        if not self.thread.is_alive():
+            return True
+        done = threading.Event()
+        self.queue.put(("flush", done))
+        return done.wait(timeout)
+
+    def close(self, timeout: Optional[float] = 5.0) -> None:
+        """Обрабатывает оставшиеся события, вызывает обработчики простоя и останавливает поток."""
+        if self.thread.is_alive():
+            self.queue.put(("stop", None))
+            self.thread.join(timeout)
+
+    def _run(self) -> None:
+        """Цикл потока шины."""
+        while True:
+            try:
+                kind, payload = self.queue.get(timeout=IDLE_INTERVAL_S)
+            except queue.Empty:
+                self._idle(False)
+                continue
+            if kind == "event":
+                self._deliver(payload)
+            elif kind == "flush":
+                self._idle(True)
+                payload.set()
+            elif kind == "stop":
+                self._idle(True)
+                return
+            # Очередь опустела — даем подписчикам записать накопленную пачку
+            if self.queue.empty():
+                self._idle(False)
+
+    def _deliver(self, event: Any) -> None:
+        """Вызывает подписчиков события; ошибка одного не мешает остальным."""
+        with self.lock:
+            handlers = self.handlers.get(type(event), []) + self.all_handlers
+        for handler in handlers:
+            try:
+                handler(event)
+            except Exception as exc:
+                # Сообщить через шину нельзя — ошибка могла быть в самой записи журнала
+                print(f"Ошибка обработчика событий: {exc}", file=sys.stderr)
+        self.delivered += 1
+
+    def _idle(self, force: bool) -> None:
+        """Вызывает обработчики простоя."""
+        with self.lock:
+            handlers = list(self.idle_handlers)
+        for handler in handlers:
+            try:
+                handler(force)
+            except Exception as exc:
+                print(f"Ошибка обработчика событий: {exc}", file=sys.stderr)
+
+
+def print_error(event: PersistenceError) -> None:
+    """Выводит ошибку записи данных в консоль (в потоке шины)."""
+    print(f"Ошибка {event.target}: {event.message}")
+
+
+# Шина процесса (создается при первом обращении)
+_BUS: List[EventBus] = []
+_BUS_LOCK = threading.Lock()
+
+
+def get_bus() -> EventBus:
+    """Возвращает шину процесса; ошибки записи данных по умолчанию выводятся в консоль."""
+    with _BUS_LOCK:
+        if not _BUS or not _BUS[0].thread.is_alive():
+            bus = EventBus()
+            bus.subscribe(PersistenceError, print_error)
+            # Поток шины фоновый: при выходе дообрабатываем очередь
+            atexit.register(bus.close)
+            _BUS[:] = [bus]
+        return _BUS[0]
+
+
+def publish(event: Any) -> None:
+    """Публикует событие в шину процесса."""
+    get_bus().publish(event)
+
+
+def report_error(target: str, exc: Any) -> None:
+    """Сообщает об ошибке чтения или записи данных.
+
+    Args:
+        target: Что делали, в родительном падеже (например, "сохранения истории")
+        exc: Исключение или текст ошибки
+    """
+    publish(PersistenceError(target, str(exc)))
@@ -0,0 +1,373 @@
+# -*- coding: utf-8 -*-
+# Точная статистика дерева игры "Крестики-нолики" для вариантов N×N / K в ряд
+# Обход идет по слоям (глубинам) с объединением одинаковых позиций, поэтому
+# в памяти хранятся только два соседних слоя, а количество партий считается
+# через число путей до каждой позиции. Решение — негамакс с кэшем по
+# каноническим позициям (с учетом 8 симметрий квадрата).
+# Правила те же, что в игре: победа — K одинаковых знаков подряд, ничья — поле заполнено.
+#
+# Примеры:
+#     python gametree.py                      # все варианты до 4×4
+#     python gametree.py --variants 3x3/3 4x4/3 --workers 4
+#     python gametree.py --verify             # проверка ИИ "hard" на всех позициях 3×3
+
+# Импортируем необходимые модули
+from typing import Any, Dict, List, Optional, Set, Tuple  # Для указания типов данных
+import argparse  # Для разбора аргументов командной строки
+import multiprocessing  # Для параллельного анализа вариантов
+import operator  # Быстрые перестановки клеток (itemgetter)
+import random  # Генератор для стратегии при проверке
+import time  # Для замера времени
+
+import engine  # Правила и решатель основной игры (для проверки)
+
+# Лимиты на вариант по умолчанию: позиции обхода и узлы решателя
+DEFAULT_LIMIT: int = 500_000
+DEFAULT_NODES: int = 2_000_000
+
+# Варианты по умолчанию: N от 2 до 4, K от 2 до N
+DEFAULT_VARIANTS: Tuple[Tuple[int, int], ...] = tuple(
+    (n, k) for n in range(2, 5) for k in range(2, n + 1)
+)
+
+
+class LimitExceeded(Exception):
+    """Вариант слишком велик для заданного лимита."""
+
+
+def win_lines(n: int, k: int) -> Tuple[Tuple[int, ...], ...]:
+    """Все линии из K клеток подряд на поле N×N.
+
+    Args:
+        n: Размер поля
+        k: Длина выигрышной линии
+
+    Returns:
+        Кортеж линий (индексы клеток построчно)
+    """
+    lines = []
+    directions = ((0, 1), (1, 0), (1, 1), (1, -1))  # Строка, столбец, диагонали
+    for row in range(n):
+        for col in range(n):
+            for d_row, d_col in directions:
+                end_row, end_col = row + d_row * (k - 1), col + d_col * (k - 1)
+                if 0 <= end_row < n and 0 <= end_col < n:
+                    lines.append(tuple((row + d_row * i) * n + col + d_col * i for i in range(k)))
+    return tuple(lines)
+
+
+def symmetries(n: int) -> Tuple[Tuple[int, ...], ...]:
+    """8 симметрий квадрата как перестановки клеток."""
+    def index(row: int, col: int) -> int:
+        return row * n + col
+
+    last = n - 1
+    transforms = (
+        lambda r, c: (r, c), lambda r, c: (c, last - r),
+        lambda r, c: (last - r, last - c), lambda r, c: (last - c, r),
+        lambda r, c: (r, last - c), lambda r, c: (last - r, c),
+        lambda r, c: (c, r), lambda r, c: (last - c, last - r),
+    )
+    return tuple(
+        tuple(index(*transform(cell // n, cell % n)) for cell in range(n * n))
+        for transform in transforms
+    )
+
+
+class Variant:
+    """Правила варианта: линии через каждую клетку и симметрии поля."""
+
+    def __init__(self, n: int, k: int) -> None:
+        """Готовит таблицы варианта N×N / K."""
+        if not 1 <= k <= n:
+            raise ValueError(f"Недопустимый вариант {n}x{n}/{k}")
+        self.n: int = n
+        self.k: int = k
+        self.cells: int = n * n
+        self.lines: Tuple[Tuple[int, ...], ...] = win_lines(n, k)
+        # Линии, проходящие через клетку: после хода проверяются только они
+        self.lines_of_cell: Tuple[Tuple[Tuple[int, ...], ...], ...] = tuple(
+            tuple(line for line in self.lines if cell in line) for cell in range(self.cells)
+        )
+        # Перестановки клеток для симметрий (itemgetter быстрее генератора)
+        self.perms: Tuple[Any, ...] = tuple(operator.itemgetter(*perm) for perm in symmetries(n))
+
+    @property
+    def name(self) -> str:
+        """Название варианта."""
+        return f"{self.n}x{self.n}/{self.k}"
+
+    def wins_after(self, board: str, cell: int, player: str) -> bool:
+        """Выиграл ли игрок ходом в клетку (проверяются только линии этой клетки)."""
+        return any(all(board[i] == player for i in line) for line in self.lines_of_cell[cell])
+
+    def canonical(self, board: str) -> str:
+        """Каноническая форма позиции — минимальная среди 8 симметрий."""
+        return min("".join(perm(board)) for perm in self.perms)
+
+
+def tree_stats(variant: Variant, limit: int = DEFAULT_LIMIT) -> Dict[str, Any]:
+    """Обходит дерево игры по слоям и собирает статистику.
+
+    Args:
+        variant: Вариант игры
+        limit: Максимум позиций (иначе LimitExceeded)
+
+    Returns:
+        Позиции по глубинам, канонические позиции, исходы и число партий
+    """
+    empty = engine.EMPTY * variant.cells
+    # Текущий слой: позиция -> количество путей (партий), ведущих к ней
+    layer: Dict[str, int] = {empty: 1}
+    per_depth: List[int] = [1]
+    canonical_per_depth: List[int] = [1]
+    # Уникальные терминальные позиции и партии по исходам
+    terminal = {"X": 0, "O": 0, "draw": 0}
+    games = {"X": 0, "O": 0, "draw": 0}
+    total = 1
+    depth = 0
+    while layer:
+        player = "X" if depth % 2 == 0 else "O"
+        next_layer: Dict[str, int] = {}
+        ended: Dict[str, Tuple[str, int]] = {}
+        for board, paths in layer.items():
+            for cell in range(variant.cells):
+                if board[cell] != engine.EMPTY:
+                    continue
+                child = board[:cell] + player + board[cell + 1:]
+                if variant.wins_after(child, cell, player):
+                    outcome = player
+                elif depth + 1 == variant.cells:
+                    outcome = "draw"
+                else:
+                    next_layer[child] = next_layer.get(child, 0) + paths
+                    # Проверяем лимит по ходу обхода, не дожидаясь конца слоя
+                    if total + len(next_layer) > limit:
+                        raise LimitExceeded(f"больше {limit} позиций")
+                    continue
+                # Одна терминальная позиция может быть достигнута разными путями
+                previous = ended.get(child)
+                ended[child] = (outcome, (previous[1] if previous else 0) + paths)
+        for outcome, paths in ended.values():
+            terminal[outcome] += 1
+            games[outcome] += paths
+        depth += 1
+        if not next_layer and not ended:
+            break
+        # Позиции глубины: продолжающиеся и завершившиеся
+        boards = set(next_layer) | set(ended)
+        per_depth.append(len(boards))
+        canonical_per_depth.append(len({variant.canonical(b) for b in boards}))
+        total += len(boards)
+        if total > limit:
+            raise LimitExceeded(f"больше {limit} позиций")
+        layer = next_layer
+    return {
+        "positions": total,
+        "per_depth": per_depth,
+        "canonical": sum(canonical_per_depth),
+        "canonical_per_depth": canonical_per_depth,
+        "terminal": terminal,
+        "games": games,
+    }
+
+
+class Solver:
+    """Негамакс с кэшем по каноническим позициям."""
+
+    def __init__(self, variant: Variant, limit: int = DEFAULT_NODES) -> None:
+        """Создает решатель варианта с лимитом узлов."""
+        self.variant: Variant = variant
+        self.limit: int = limit
+        # Кэш: каноническая позиция -> исход для ходящего (WIN/DRAW/LOSS)
+        self.memo: Dict[str, int] = {}
+        self.nodes: int = 0
+
+    def value(self, board: str, player: str) -> int:
+        """Исход нетерминальной позиции для ходящего игрока."""
+        key = self.variant.canonical(board)
+        cached = self.memo.get(key)
+        if cached is not None:
+            return cached
+        self.nodes += 1
+        if self.nodes > self.limit:
+            raise LimitExceeded(f"больше {self.limit} узлов решателя")
+        best = engine.LOSS
+        opponent = engine.other(player)
+        children = []
+        for cell in range(self.variant.cells):
+            if board[cell] != engine.EMPTY:
+                continue
+            child = board[:cell] + player + board[cell + 1:]
+            if self.variant.wins_after(child, cell, player):
+                best = engine.WIN  # Немедленная победа — дальше не ищем
+                break
+            children.append(child)
+        else:
+            if not children:
+                best = engine.DRAW
+            for child in children:
+                if engine.EMPTY not in child:
+                    result = engine.DRAW
+                else:
+                    result = -self.value(child, opponent)
+                if result > best:
+                    best = result
+                    if best == engine.WIN:
+                        break
+        self.memo[key] = best
+        return best
+
+    def move_values(self, board: str, player: str) -> Dict[int, int]:
+        """Точный исход каждого хода для ходящего."""
+        values: Dict[int, int] = {}
+        for cell in range(self.variant.cells):
+            if board[cell] != engine.EMPTY:
+                continue
+            child = board[:cell] + player + board[cell + 1:]
+            if self.variant.wins_after(child, cell, player):
+                values[cell] = engine.WIN
+            elif engine.EMPTY not in child:
+                values[cell] = engine.DRAW
+            else:
+                values[cell] = -self.value(child, engine.other(player))
+        return values
+
+
+def analyze_variant(args: Tuple[int, int, int, int]) -> Dict[str, Any]:
+    """Статистика и решение одного варианта (выполняется в рабочем процессе).
+
+    Args:
+        args: (N, K, лимит позиций, лимит узлов решателя)
+
+    Returns:
+        Итоги варианта с временем каждой части
+    """
+    n, k, limit, node_limit = args
+    variant = Variant(n, k)
+    report: Dict[str, Any] = {"name": variant.name, "lines": len(variant.lines)}
+    started = time.perf_counter()
+    try:
+        report["stats"] = tree_stats(variant, limit)
+    except LimitExceeded as exc:
+        report["stats_error"] = str(exc)
+    report["stats_time"] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    solver = Solver(variant, node_limit)
+    try:
+        report["value"] = solver.value(engine.EMPTY * variant.cells, "X")
+    except LimitExceeded as exc:
+        report["value_error"] = str(exc)
+    report["solve_nodes"] = solver.nodes
+    report["solve_time"] = time.perf_counter() - started
+    return report
+
+
+def verify_hard(level: str = "hard") -> Tuple[int, int, List[str]]:
+    """Проверяет стратегию ИИ на всех достижимых позициях 3×3.
+
+    Ход стратегии должен иметь тот же исход, что и лучший ход по точному
+    решению дерева, а оценка движка (engine.solve) должна совпадать с оракулом.
+
+    Returns:
+        Кортеж (проверено позиций, ошибок, примеры ошибок)
+    """
+    import ai_registry  # Импорт здесь: для статистики вариантов реестр не нужен
+    from threats import ThreatIndex  # Индекс угроз, как в игре
+
+    variant = Variant(3, 3)
+    assert set(variant.lines) == set(engine.WIN_LINES), "Линии 3x3 не совпадают с движком"
+    solver = Solver(variant)
+    strategy = ai_registry.get_strategy(level)
+    rng = random.Random(0)
+    checked, errors, examples = 0, 0, []
+    layer: Set[str] = {engine.EMPTY_BOARD}
+    for depth in range(9):
+        player = "X" if depth % 2 == 0 else "O"
+        next_layer: Set[str] = set()
+        for board in layer:
+            values = solver.move_values(board, player)
+            best = max(values.values())
+            chosen = strategy.choose_move(board, player, rng, ThreatIndex.from_board(board))
+            engine_value = engine.solve(board, player)[0]
+            checked += 1
+            if chosen is None or values.get(chosen) != best or engine_value != best:
+                errors += 1
+                if len(examples) < 5:
+                    examples.append(f"{board} ({player}): ход {chosen}, лучший исход {best}, движок {engine_value}")
+            for cell, value in values.items():
+                child = board[:cell] + player + board[cell + 1:]
+                if not variant.wins_after(child, cell, player) and engine.EMPTY in child:
+                    next_layer.add(child)
+        layer = next_layer
+    return checked, errors, examples
+
+
+def parse_variant(text: str) -> Tuple[int, int]:
+    """Разбирает вариант вида "4x4/3" или "4/3"."""
+    size, _, k = text.partition("/")
+    n = int(size.split("x")[0])
+    return n, int(k) if k else n
+
+
+def format_report(report: Dict[str, Any]) -> str:
+    """Текст отчета по варианту."""
+    outcome_names = {engine.WIN: "победа X", engine.DRAW: "ничья", engine.LOSS: "победа O"}
+    lines = [f"{report['name']} ({report['lines']} линий)"]
+    stats = report.get("stats")
+    if stats:
+        term, games = stats["terminal"], stats["games"]
+        lines.append(
+            f"  позиций: {stats['positions']} (канонических {stats['canonical']}), "
+            f"терминальных: X {term['X']} / O {term['O']} / ничьих {term['draw']}"
+        )
+        lines.append(
+            f"  партий: {sum(games.values())} (X {games['X']} / O {games['O']} / ничьих {games['draw']})"
+        )
+        lines.append("  по глубине: " + " ".join(f"{d}:{c}" for d, c in enumerate(stats["per_depth"])))
+    else:
+        lines.append(f"  статистика: не посчитана ({report['stats_error']})")
+    lines.append(f"  время обхода: {report['stats_time']:.3f} с")
+    if "value" in report:
+        lines.append(f"  решение: {outcome_names[report['value']]} "
+                     f"({report['solve_nodes']} узлов, {report['solve_time']:.3f} с)")
+    else:
+        lines.append(f"  решение: не найдено ({report['value_error']}, {report['solve_time']:.3f} с)")
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Печатает статистику и решения вариантов или проверяет ИИ."""
+    parser = argparse.ArgumentParser(description="Статистика дерева игры и решатель N×N / K")
+    parser.add_argument("--variants", nargs="+", help="Варианты вида 3x3/3 (по умолчанию до 4×4)")
+    parser.add_argument("--limit", type=int, default=DEFAULT_LIMIT, help="Лимит позиций обхода на вариант")
+    parser.add_argument("--nodes", type=int, default=DEFAULT_NODES, help="Лимит узлов решателя на вариант")
+    parser.add_argument("--workers", type=int, default=1, help="Количество процессов")
+    parser.add_argument("--verify", action="store_true", help="Проверить ИИ на всех позициях 3×3")
+    parser.add_argument("--level", default="hard", help="Уровень ИИ для проверки")
+    args = parser.parse_args(argv)
+
+    if args.verify:
+        started = time.perf_counter()
+        checked, errors, examples = verify_hard(args.level)
+        print(f"Проверено позиций: {checked}, ошибок: {errors} ({time.perf_counter() - started:.2f} с)")
+        for example in examples:
+            print("  " + example)
+        parser.exit(1 if errors else 0)
+
+    variants = [parse_variant(v) for v in args.variants] if args.variants else list(DEFAULT_VARIANTS)
+    tasks = [(n, k, args.limit, args.nodes) for n, k in variants]
+    started = time.perf_counter()
+    if args.workers <= 1:
+        reports = [analyze_variant(task) for task in tasks]
+    else:
+        with multiprocessing.Pool(args.workers) as pool:
+            reports = pool.map(analyze_variant, tasks)
+    for report in reports:
+        print(format_report(report))
+    print(f"Всего: {time.perf_counter() - started:.2f} с")
+
+
+if __name__ == "__main__":
+    main()
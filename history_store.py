@@ -0,0 +1,285 @@
+# -*- coding: utf-8 -*-
+# Хранилище истории игр "Крестики-нолики"
+# Потоковое чтение JSON-массива истории без загрузки всего файла в память,
+# быстрый разбор меток времени и поиск границы хранения бинарным поиском
+
+# Импортируем необходимые модули
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple  # Для указания типов данных
+from datetime import datetime  # Для перевода дат в метки времени
+import json  # Для декодирования отдельных записей
+import os  # Для работы с файловой системой (проверка файлов)
+import re  # Для пропуска пробелов и разделителей между записями
+import threading  # Для фоновой загрузки истории
+import time  # Для текущей метки времени
+
+import events  # Шина событий (ошибки чтения и записи данных)
+from storage import locked_update  # Запись под межпроцессной блокировкой
+
+# Файл для сохранения истории игр
+HISTORY_FILE: str = "tic_tac_toe_history.json"
+
+# Ограничения для хранения данных
+MAX_DAYS: int = 90  # Максимальный возраст записей в днях (3 месяца)
+MAX_GAMES: int = 100  # Максимальное количество хранимых игр в истории
+SECONDS_PER_DAY: int = 86400  # Количество секунд в сутках
+
+# Формат дат в старых записях истории и файле счета
+DATE_FORMAT: str = "%Y-%m-%d %H:%M:%S"
+
+# Размер блока чтения файла (64 КБ)
+CHUNK_SIZE: int = 1 << 16
+
+# Пробелы и запятые между элементами массива
+_SEPARATORS = re.compile(r"[\s,]*")
+
+
+def parse_timestamp(value: Any) -> int:
+    """Преобразует дату записи в метку времени (секунды эпохи).
+
+    Новые записи хранят целое число секунд и возвращаются как есть.
+    Старые строки "%Y-%m-%d %H:%M:%S" разбираются срезами без strptime,
+    что в несколько раз быстрее.
+
+    Args:
+        value: Целое число секунд или строка даты
+
+    Returns:
+        Метка времени в секундах (0 для некорректных значений)
+    """
+    if isinstance(value, int):
+        return value
+    if isinstance(value, float):
+        return int(value)
+    text = str(value)
+    try:
+        # Позиции полей фиксированы: ГГГГ-ММ-ДД ЧЧ:ММ:СС
+        return int(datetime(
+            int(text[0:4]), int(text[5:7]), int(text[8:10]),
+            int(text[11:13]), int(text[14:16]), int(text[17:19]),
+        ).timestamp())
+    except ValueError:
+        return 0
+
+
+def format_timestamp(timestamp: int) -> str:
+    """Преобразует метку времени в строку для отображения."""
+    return datetime.fromtimestamp(timestamp).strftime(DATE_FORMAT)
+
+
+def retention_start(history: List[Dict[str, Any]], cutoff: int) -> int:
+    """Находит бинарным поиском первую запись не старше порога.
+
+    История хранится в хронологическом порядке, поэтому вместо
+    фильтрации всех записей достаточно O(log n) разборов дат.
+
+    Args:
+        history: Записи истории, отсортированные по дате
+        cutoff: Пороговая метка времени
+
+    Returns:
+        Индекс первой записи, которую нужно сохранить
+    """
+    low, high = 0, len(history)
+    while low < high:
+        mid = (low + high) // 2
+        if parse_timestamp(history[mid].get("date", 0)) < cutoff:
+            low = mid + 1
+        else:
+            high = mid
+    return low
+
+
+def iter_json_array(path: str, chunk_size: int = CHUNK_SIZE) -> Iterator[Any]:
+    """Построчно (поэлементно) читает JSON-массив из файла.
+
+    В памяти одновременно находится только текущий блок файла,
+    поэтому история любого размера читается за один проход.
+
+    Args:
+        path: Путь к файлу с JSON-массивом
+        chunk_size: Размер блока чтения в символах
+
+    Yields:
+        Элементы массива по одному
+    """
+    decoder = json.JSONDecoder()
+    with open(path, "r", encoding="utf-8") as f:
+        buf = f.read(chunk_size)
+        # Пропускаем пробелы перед открывающей скобкой
+        pos = _SEPARATORS.match(buf).end()
+        if pos >= len(buf) or buf[pos] != "[":
+            return  # Пустой файл или не массив
+        pos += 1
+        eof = False
+
+        while True:
+            # Пропускаем пробелы и запятые между элементами
+            pos = _SEPARATORS.match(buf, pos).end()
+            if pos < len(buf) and buf[pos] == "]":
+                return  # Конец массива
+            try:
+                item, end = decoder.raw_decode(buf, pos)
+            except json.JSONDecodeError:
+                # Элемент обрезан границей блока — дочитываем файл
+                if eof:
+                    raise
+                chunk = f.read(chunk_size)
+                eof = not chunk
+                # Отбрасываем уже прочитанную часть буфера
+                buf = buf[pos:] + chunk
+                pos = 0
+                continue
+            yield item
+            pos = end
+            # Периодически сжимаем буфер, чтобы он не рос бесконечно
+            if pos > chunk_size:
+                buf = buf[pos:]
+                pos = 0
+
+
+def iter_history(path: str = HISTORY_FILE) -> Iterator[Dict[str, Any]]:
+    """Потоково перебирает записи истории игр.
+
+    Args:
+        path: Путь к файлу истории
+
+    Yields:
+        Словари с записями истории (некорректные элементы пропускаются)
+    """
+    if not os.path.exists(path):
+        return
+    try:
+        for item in iter_json_array(path):
+            if isinstance(item, dict):
+                yield item
+    except (json.JSONDecodeError, OSError) as exc:
+        events.report_error("чтения истории", exc)
+
+
+def load_history(path: str = HISTORY_FILE) -> List[Dict[str, Any]]:
+    """Загружает историю игр из файла.
+
+    Args:
+        path: Путь к файлу истории
+
+    Returns:
+        Список словарей с историей игр в формате [{"date": секунды эпохи, "result": строка, ...}]
+    """
+    # Проверяем существование файла
+    if not os.path.exists(path):
+        return []  # Файла нет, возвращаем пустой список
+
+    try:
+        # Открываем файл для чтения
+        with open(path, "r", encoding="utf-8") as f:
+            # Загружаем данные из JSON
+            data = json.load(f)
+
+        # Проверяем, что данные в правильном формате (список)
+        if not isinstance(data, list):
+            return []  # Неверный формат, возвращаем пустой список
+
+        # Нормализуем данные (дата - секунды эпохи, результат - строка)
+        normalized: List[Dict[str, Any]] = []
+        for item in data:
+            if isinstance(item, dict):
+                record = dict(item)  # Сохраняем дополнительные поля (игроки, ходы)
+                record["date"] = parse_timestamp(item.get("date", 0))
+                record["result"] = str(item.get("result", ""))
+                normalized.append(record)
+        return normalized
+
+    except (json.JSONDecodeError, OSError) as exc:
+        # Обрабатываем ошибки чтения
+        events.report_error("загрузки истории", exc)
+        return []
+
+
+class HistoryCache:
+    """Кэш загруженной истории.
+
+    Файл перечитывается, только если изменились его время изменения или размер,
+    поэтому повторное открытие окон истории не разбирает JSON заново.
+    Первую загрузку можно запустить в фоне сразу после отрисовки окна.
+    """
+
+    def __init__(self) -> None:
+        """Создает пустой кэш."""
+        # Ключ версии файла: (путь, время изменения, размер)
+        self.key: Optional[Tuple[str, float, int]] = None
+        self.records: List[Dict[str, Any]] = []
+        # Блокировка: если фоновая загрузка уже идет, окно дождется ее, а не начнет свою
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def _file_key(path: str) -> Optional[Tuple[str, float, int]]:
+        """Версия файла или None, если файла нет."""
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        return path, stat.st_mtime, stat.st_size
+
+    def get(self, path: str = HISTORY_FILE) -> List[Dict[str, Any]]:
+        """Возвращает историю, перечитывая файл только при его изменении."""
+        key = self._file_key(path)
+        with self.lock:
+            if key is None:
+                self.key, self.records = None, []
+            elif key != self.key:
+                self.records = load_history(path)
+                self.key = key
+            return list(self.records)
+
+    def preload(self, path: str = HISTORY_FILE) -> threading.Thread:
+        """Загружает историю в фоновом потоке."""
+        thread = threading.Thread(target=self.get, args=(path,), name="history-preload", daemon=True)
+        thread.start()
+        return thread
+
+
+def append_history(records: Iterable[Dict[str, Any]], path: str = HISTORY_FILE,
+                   max_days: int = MAX_DAYS, max_games: int = MAX_GAMES,
+                   evict: Optional[Callable[[List[Dict[str, Any]]], Any]] = None) -> None:
+    """Добавляет записи в историю и применяет ограничения хранения.
+
+    Чтение, добавление и запись идут под межпроцессной блокировкой, поэтому
+    записи, одновременно добавленные другими процессами, не теряются.
+    Записи с уже сохраненным идентификатором партии повторно не добавляются,
+    а даты всех записей сохраняются секундами эпохи (старые строки переводятся).
+
+    Args:
+        records: Новые записи (в хронологическом порядке)
+        path: Путь к файлу истории
+        max_days: Максимальный возраст записей в днях
+        max_games: Максимальное количество хранимых записей
+        evict: Получает вытесненные записи до записи истории (например, archive.archive_records);
+            None — вытесненные записи отбрасываются
+    """
+    records = list(records)
+
+    def _merge(data: Any) -> List[Dict[str, Any]]:
+        """Добавляет новые записи к истории, прочитанной под блокировкой."""
+        history = [item for item in data if isinstance(item, dict)] if isinstance(data, list) else []
+        known = {item.get("id") for item in history if item.get("id")}
+        history.extend(dict(r) for r in records if not r.get("id") or r.get("id") not in known)
+        # Старые строковые даты переписываются секундами эпохи при первой же записи
+        for item in history:
+            if not isinstance(item.get("date"), int):
+                item["date"] = parse_timestamp(item.get("date", 0))
+
+        # Рассчитываем пороговую дату (текущая дата минус max_days)
+        cutoff = int(time.time()) - max_days * SECONDS_PER_DAY
+        # История отсортирована по дате: границу находим бинарным поиском,
+        # а количество записей сразу ограничиваем до max_games
+        start = max(retention_start(history, cutoff), len(history) - max_games)
+        if evict is not None and start > 0:
+            # Пока история заблокирована, эти записи не вытеснит другой процесс
+            evict(history[:start])
+        return history[start:]
+
+    try:
+        locked_update(path, _merge, [])
+    except OSError as exc:
+        # Обрабатываем ошибки записи
+        events.report_error("сохранения истории", exc)
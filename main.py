@@ -4,104 +4,103 @@
 # Особенности: несколько уровней сложности, смена тем оформления, сохранение статистики
 
 # Импортируем необходимые модули
-from typing import Any, Dict, List, Optional, Set, Tuple  # Для указания типов данных
+from typing import Any, Dict, List, Optional, Tuple  # Для указания типов данных
 import json  # Для работы с JSON-файлами (чтение/запись)
 import os  # Для работы с файловой системой (проверка файлов)
-import threading  # Для много поточности (для звуковых эффектов)
-from datetime import datetime, timedelta  # Для работы с датой и временем
+import threading  # Для много поточности (звуковые эффекты, подсказки)
+import queue  # Для передачи результатов фоновых задач в поток интерфейса
+import time  # Для меток времени (секунды эпохи)
 import importlib  # Для динамической загрузки модулей (pygame)
-import random  # Для генерации случайных чисел (ходы ИИ)
+import sys  # Для аргументов командной строки
+import random  # Для генераторов случайных чисел партий (ходы ИИ) и интерфейса
+import uuid  # Для генерации идентификаторов партий
 
 import tkinter as tk  # Основная библиотека для создания графического интерфейса
-from tkinter import messagebox, simpledialog  # Готовые диалоговые окна
-
-# Константы для файлов сохранения
-HISTORY_FILE: str = "tic_tac_toe_history.json"  # Файл для сохранения истории игр
-SCORE_FILE: str = "tic_tac_toe_score.json"  # Файл для сохранения статистики игроков
-
-# Ограничения для хранения данных
-MAX_DAYS: int = 90  # Максимальный возраст записей в днях (3 месяца)
-MAX_GAMES: int = 100  # Максимальное количество хранимых игр в истории
-
-# Цветовые темы интерфейса
-THEMES: Dict[str, Dict[str, str]] = {
-    "light": {
-        "bg": "#f0f0f0",  # Цвет фона окна
-        "btn_bg": "#ffffff",  # Цвет фона кнопок
-        "btn_fg": "#000000",  # Цвет текста кнопок
-        "highlight": "#90ee90",  # Цвет победной линии
-        "text_highlight": "#006400",  # Цвет текста на победной линии
-        "title": "Светлая",  # Название темы для меню
-    },
-    "dark": {
-        "bg": "#2e2e2e",  # Темный фон
-        "btn_bg": "#444444",  # Темные кнопки
-        "btn_fg": "#ffffff",  # Белый текст
-        "highlight": "#32cd32",  # Зеленая подсветка
-        "text_highlight": "#98fb98",  # Светло-зеленый текст
-        "title": "Тёмная",  # Название темы
-    },
-    "neon_night": {
-        "bg": "#000000",  # Черный фон
-        "btn_bg": "#111111",  # Очень темные кнопки
-        "btn_fg": "#00ff88",  # Неоново-зеленый текст
-        "highlight": "#00ffcc",  # Бирюзовая подсветка
-        "text_highlight": "#00ffff",  # Голубой текст
-        "border": "#00ff88",  # Цвет границ кнопок
-        "glow": "#00ff88",  # Цвет свечения уведомлений
-        "title": "Ночной неон",  # Название темы
-    },
-    "neon_day": {
-        "bg": "#e0ffe0",  # Светло-зеленый фон
-        "btn_bg": "#ffffff",  # Белые кнопки
-        "btn_fg": "#ff0066",  # Розовый текст
-        "highlight": "#ff66cc",  # Розовая подсветка
-        "text_highlight": "#ff00aa",  # Ярко-розовый текст
-        "border": "#ff0066",  # Розовые границы
-        "glow": "#ff0066",  # Розовое свечение
-        "title": "Дневной неон",  # Название темы
-    },
-    "cosmos": {
-        "bg": "#0a0020",  # Темно-синий фон (космос)
-        "btn_bg": "#1a0a3a",  # Фиолетовые кнопки
-        "btn_fg": "#00aaff",  # Голубой текст
-        "highlight": "#00ffff",  # Бирюзовая подсветка
-        "text_highlight": "#ff9900",  # Оранжевый текст
-        "border": "#5500ff",  # Фиолетовые границы
-        "glow": "#0077ff",  # Синее свечение
-        "title": "Космос",  # Название темы
-    },
-}
-
-# Пороговые значения для уведомлений о рекордах
-RECORDS: List[int] = [3, 5, 10, 15, 20, 25, 30]  # Количество побед для показа уведомлений
-
-# Пытаемся загрузить pygame для звуковых эффектов
-try:
-    # Динамически импортируем pygame (если установлен)
-    PYGAME: Any = importlib.import_module("pygame")
-    # Инициализируем звуковую систему
-    PYGAME.mixer.init()
-    # Флаг, что звук доступен
-    AUDIO_OK: bool = True
-except Exception as _audio_exc:
-    # Если pygame недоступен, продолжаем без звука
-    print(f"[WARN] pygame недоступен или ошибка аудио: {_audio_exc}")
-    PYGAME = None
-    AUDIO_OK = False
+from tkinter import filedialog, messagebox, simpledialog  # Готовые диалоговые окна
+
+from achievements import AchievementStore, Rule  # Достижения игроков
+import ai_registry  # Реестр стратегий ИИ с учетом их стоимости
+import engine  # Точный решатель позиций с кэшем (подсказки и сложный ИИ)
+from analytics import HistoryAnalytics  # Отчеты по истории игр
+from archive import iter_all_history  # Вся история: архив и быстрое хранилище
+from event_sink import EventLogSink  # Пакетный журнал и метрики событий
+import events  # Шина событий игры (ходы, партии, рекорды, ошибки данных)
+from history_store import (  # Хранилище истории и метки времени
+    SECONDS_PER_DAY, HistoryCache, format_timestamp, parse_timestamp,
+)
+from multiboard import MultiBoardWindow  # Несколько досок в одном окне
+from persistence import PersistenceWriter  # Единый фоновый писатель файлов данных
+from profiles import PVP_KEY, ProfileStore  # Профили игроков и агрегаты
+from ratings import RatingStore  # Рейтинги Эло / Glicko-2
+from replay import ReplayViewer  # Просмотр записанных партий
+from session import load_session, restore_rng, rng_state  # Снимок сессии
+import settings  # Настройки: файл, окружение TTT_*, командная строка
+from simulator import derive_seed, new_seed  # Зерна генераторов случайных чисел
+from themes import THEMES  # Цветовые темы интерфейса
+from threats import ThreatIndex  # Индекс угроз, обновляемый на каждом ходу
+import timing  # Время ходов и гистограммы перцентилей
+from ultimate_window import UltimateWindow  # Ультимативные крестики-нолики
+
+# Пути к файлам сохранения и ограничения хранения данных задаются в settings
+
+# Цвета подсказок по исходу хода (победа, ничья, поражение)
+HINT_COLORS: Dict[int, str] = {engine.WIN: "#2e7d32", engine.DRAW: "#f9a825", engine.LOSS: "#c62828"}
+# Интервал проверки готовности подсказки (мс)
+HINT_POLL_MS: int = 30
+# Сколько окно ждет записи очереди писателя перед чтением истории (с)
+FLUSH_TIMEOUT_S: float = 2.0
+# Номер потока зерна для генератора интерфейса (партии серии используют номера от 0)
+UI_RNG_STREAM: int = -1
+
+
+
+class _Audio:
+    """Звуковая система: pygame загружается, только если звук включен в настройках."""
+
+    pygame: Any = None  # Модуль pygame с инициализированным микшером
+    tried: bool = False  # Загрузка уже выполнялась (успешно или нет)
+
+
+def init_audio() -> bool:
+    """Загружает pygame и инициализирует микшер (один раз).
+
+    Returns:
+        True, если звук доступен
+    """
+    if not _Audio.tried:
+        _Audio.tried = True
+        try:
+            # Динамически импортируем pygame (если установлен) и инициализируем звук
+            module = importlib.import_module("pygame")
+            module.mixer.init()
+            _Audio.pygame = module
+        except Exception as exc:
+            # Если pygame недоступен, продолжаем без звука
+            events.report_error("инициализации звука (pygame)", exc)
+    return _Audio.pygame is not None
 
 
 class TicTacToeApp:
     """Основной класс приложения для игры в крестики-нолики."""
 
-    def __init__(self, window: tk.Tk) -> None:
-        """Инициализация игрового приложения."""
+    def __init__(self, window: tk.Tk, config: Optional[settings.Settings] = None) -> None:
+        """Инициализация игрового приложения.
+
+        Args:
+            window: Главное окно
+            config: Настройки (по умолчанию — загруженные один раз settings.get())
+        """
+        # Неизменяемые настройки; заменяются целиком при изменении файла настроек
+        self.settings: settings.Settings = config or settings.get()
+        # Звуковая система загружается, только если звук включен
+        if self.settings.audio:
+            init_audio()
         # Сохраняем ссылку на главное окно
         self.window: tk.Tk = window
         # Устанавливаем заголовок окна
         self.window.title("Крестики-нолики | N-888")
         # Устанавливаем размер окна (ширина x высота)
-        self.window.geometry("350x600")
+        self.window.geometry(self.settings.geometry)
         # Запрещаем изменение размера окна
         self.window.resizable(False, False)
 
@@ -120,21 +119,65 @@ class TicTacToeApp:
         # Координаты выигрышной линии (если есть)
         self.win_line: List[Tuple[int, int]] = []
         # Режим игры: против ИИ (True) или два игрока (False)
-        self.vs_ai: bool = False
-        # Уровень сложности ИИ (easy, normal, hard)
-        self.ai_difficulty: str = "normal"
+        self.vs_ai: bool = self.settings.mode == "ai"
+        # Уровень сложности ИИ (ключ стратегии в ai_registry)
+        self.ai_difficulty: str = self.settings.difficulty
+        # Идентификатор текущей партии и время ее начала (для событий и истории)
+        self.game_id: str = uuid.uuid4().hex
+        self.game_started: float = time.monotonic()
+        # Зерно текущей партии (записывается в историю для воспроизведения)
+        self.seed: int = new_seed()
+        # Генератор случайных чисел партии: все случайные решения ИИ берутся из него
+        self.rng: random.Random = random.Random(self.seed)
+        # Отдельный генератор интерфейса (тексты уведомлений): выводится из зерна первой
+        # партии, но не сдвигает генератор партии, от которого зависят ходы ИИ
+        self.ui_rng: random.Random = random.Random(derive_seed(self.seed, UI_RNG_STREAM))
         # Окно для уведомлений о рекордах
         self.record_notification: Optional[tk.Toplevel] = None
+        # Ходы текущей партии (индексы клеток 0-8)
+        self.moves: List[int] = []
+        # Время каждого хода партии (мс): обдумывание человеком или расчет ИИ
+        self.move_ms: List[float] = []
+        # Момент, с которого ходящий человек обдумывает ход (монотонные часы)
+        self.turn_started: float = time.monotonic()
+        # Гистограммы времени ходов за сессию (человек, уровни ИИ, анимация)
+        self.timings: timing.MoveTimings = timing.MoveTimings()
+        # Логическое состояние поля ("" — пустая клетка), не зависит от анимации
+        self.board: List[str] = [""] * 9
+        # Счетчики знаков по линиям для мгновенного поиска угроз и вилок
+        self.threats: ThreatIndex = ThreatIndex()
+        # Метки подсказок поверх клеток поля
+        self.hint_labels: List[tk.Label] = []
+        # Очередь результатов анализа из фонового потока
+        self.hint_queue: "queue.Queue[Tuple[int, Dict[int, Tuple[int, int]]]]" = queue.Queue()
 
         # --- Статистика и настройки ---
         # Имена игроков (для X и O)
         self.player_names: Dict[str, str] = {"X": "Игрок X", "O": "Игрок O"}
         # Количество побед каждого игрока
         self.win_count: Dict[str, int] = {"X": 0, "O": 0}
-        # Уже показанные рекорды (чтобы не показывать повторно)
-        self.shown_records: Dict[str, Set[int]] = {"X": set(), "O": set()}
+        # Счет на момент последней загрузки или записи (база для слияния с другими окнами)
+        self.score_base: Dict[str, int] = {"X": 0, "O": 0}
         # Текущая цветовая тема
-        self.current_theme: str = "light"
+        self.current_theme: str = self.settings.theme if self.settings.theme in THEMES else "light"
+        # Профили игроков с постоянными идентификаторами
+        self.profiles: ProfileStore = ProfileStore.load(self.settings.profiles_file)
+        # Идентификаторы профилей, играющих за X и O
+        self.player_ids: Dict[str, str] = {}
+        # Рейтинги игроков и уровней ИИ
+        self.ratings: RatingStore = RatingStore.load(self.settings.ratings_file)
+        # Прогресс достижений игроков (правила в achievements)
+        self.achievements: AchievementStore = AchievementStore.load(self.settings.achievements_file)
+        # Запланированная отложенная запись профилей и рейтингов
+        self.flush_job: Optional[str] = None
+        # Единственный писатель файлов данных (общий для всех досок)
+        self.writer: PersistenceWriter = PersistenceWriter()
+        # История загружается в фоне после отрисовки окна и перечитывается только при изменении
+        self.history_cache: HistoryCache = HistoryCache()
+        # Шина событий: подписчики (журнал и метрики) работают в ее потоке, а не в потоке интерфейса
+        self.events: events.EventBus = events.get_bus()
+        self.event_sink: EventLogSink = EventLogSink(self.settings.events_file, self.settings.metrics_file)
+        self.event_sink.attach(self.events)
 
         # --- Элементы интерфейса (инициализируются позже) ---
         self.score_label: Optional[tk.Label] = None
@@ -144,13 +187,36 @@ class TicTacToeApp:
         self.theme_button: Optional[tk.Button] = None
         self.history_button: Optional[tk.Button] = None
         self.names_button: Optional[tk.Button] = None
+        self.hint_button: Optional[tk.Button] = None
+
+        # Снимок прошлой сессии (None — начинаем с чистого листа)
+        snapshot = load_session(self.settings.session_file) if self.settings.restore_session else None
 
         # Создаем верхнее меню
         self.create_menu()
-        # Загружаем сохраненную статистику
-        self.load_score()
+        if snapshot is not None:
+            # Счет, имена, режим и тема из снимка — без разбора файла счета
+            self.restore_session_settings(snapshot)
+        else:
+            # Загружаем сохраненную статистику
+            self.load_score()
+        # Связываем имена игроков с их профилями
+        self.sync_player_profiles()
         # Создаем элементы интерфейса
         self.create_widgets()
+        if snapshot is not None:
+            # Возвращаем незаконченную партию
+            self.restore_board(snapshot)
+        # Полная история нужна только окнам истории — грузим ее в фоне после отрисовки
+        self.window.after_idle(lambda: self.history_cache.preload(self.settings.history_file))
+        # Периодически записываем снимок сессии
+        if self.settings.session_interval_ms:
+            self.window.after(self.settings.session_interval_ms, self.autosave_session)
+        # При закрытии окна записываем отложенные изменения
+        self.window.protocol("WM_DELETE_WINDOW", self.on_close)
+        # Следим за изменением файла настроек
+        if self.settings.reload_poll_ms:
+            self.window.after(self.settings.reload_poll_ms, self.poll_settings)
 
     def create_menu(self) -> None:
         """Создает верхнее меню приложения."""
@@ -161,8 +227,17 @@ class TicTacToeApp:
         game_menu = tk.Menu(menu_bar, tearoff=0)
         # Добавляем пункты в меню "Игра"
         game_menu.add_command(label="Новая игра", command=self.reset_game)
+        game_menu.add_command(label="Подсказка", command=self.show_hint)
         game_menu.add_command(label="Выбрать имена игроков", command=self.set_player_names)
         game_menu.add_command(label="История игр", command=self.show_history)
+        game_menu.add_command(label="Повтор партий", command=self.show_replay)
+        game_menu.add_command(label="Таблица лидеров", command=self.show_leaderboard)
+        game_menu.add_command(label="Статистика", command=self.show_stats)
+        game_menu.add_command(label="Достижения", command=self.show_achievements)
+        game_menu.add_command(label="Стоимость ИИ", command=self.show_ai_costs)
+        game_menu.add_command(label="Время ходов", command=self.show_move_timings)
+        game_menu.add_command(label="Несколько досок", command=self.show_multiboard)
+        game_menu.add_command(label="Ультимативная игра", command=self.show_ultimate)
         game_menu.add_separator()  # Разделительная линия
 
         # Создаем подпункт меню "Тема"
@@ -177,7 +252,7 @@ class TicTacToeApp:
         game_menu.add_cascade(label="Выбрать тему", menu=theme_menu)
         game_menu.add_separator()
         # Пункт "Выход"
-        game_menu.add_command(label="Выход", command=self.window.quit)
+        game_menu.add_command(label="Выход", command=self.on_close)
 
         # Добавляем меню "Игра" в панель меню
         menu_bar.add_cascade(label="Игра", menu=game_menu)
@@ -251,10 +326,20 @@ class TicTacToeApp:
         )
         self.reset_button.pack(fill=tk.X, pady=3)
 
+        # Кнопка подсказки (оценка всех ходов)
+        self.hint_button = tk.Button(
+            control_frame,
+            text="💡 Подсказка",
+            font=("Arial", 10),
+            bg="#fff59d",  # Светло-желтый фон
+            command=self.show_hint
+        )
+        self.hint_button.pack(fill=tk.X, pady=3)
+
         # Кнопка переключения режима игры
         self.mode_button = tk.Button(
             control_frame,
-            text="🎮 Режим: 2 игрока",
+            text="🎮 Режим: ИИ" if self.vs_ai else "🎮 Режим: 2 игрока",
             font=("Arial", 10),
             bg="#90ee90",  # Светло-зеленый фон
             command=self.toggle_game_mode
@@ -264,7 +349,7 @@ class TicTacToeApp:
         # Кнопка выбора сложности ИИ
         self.difficulty_button = tk.Button(
             control_frame,
-            text="📊 Сложность: Normal",
+            text=f"📊 Сложность: {ai_registry.title_of(self.ai_difficulty)}",
             font=("Arial", 10),
             bg="#f08080",  # Светло-красный фон
             command=self.set_ai_difficulty
@@ -349,67 +434,57 @@ class TicTacToeApp:
     def load_score(self) -> None:
         """Загружает статистику игроков из файла, если он существует."""
         # Проверяем существование файла
-        if not os.path.exists(SCORE_FILE):
+        if not os.path.exists(self.settings.score_file):
             return  # Файла нет, ничего не загружаем
 
         try:
             # Открываем файл для чтения
-            with open(SCORE_FILE, "r", encoding="utf-8") as f:
+            with open(self.settings.score_file, "r", encoding="utf-8") as f:
                 # Загружаем данные из JSON
                 data: Dict[str, Any] = json.load(f)
 
-            # Проверяем наличие даты последней игры
-            last_played_str = data.get("last_played", "")
-            if not last_played_str:
+            # Проверяем наличие даты последней игры (секунды эпохи или старая строка)
+            last_played = parse_timestamp(data.get("last_played", 0))
+            if not last_played:
                 return  # Нет даты, пропускаем
 
-            # Преобразуем строку в объект даты
-            last_played = datetime.strptime(last_played_str, "%Y-%m-%d %H:%M:%S")
-
-            # Проверяем, не устарели ли данные (больше MAX_DAYS дней)
-            if datetime.now() - last_played > timedelta(days=MAX_DAYS):
+            # Проверяем, не устарели ли данные (больше max_days дней)
+            if time.time() - last_played > self.settings.max_days * SECONDS_PER_DAY:
                 return  # Данные устарели, не загружаем
 
             # Обновляем счет побед
             wins = data.get("wins", {})
             self.win_count["X"] = int(wins.get("X", 0))
             self.win_count["O"] = int(wins.get("O", 0))
+            self.score_base = self.win_count.copy()
 
             # Обновляем имена игроков
             names = data.get("names", {})
             self.player_names["X"] = str(names.get("X", "Игрок X"))
             self.player_names["O"] = str(names.get("O", "Игрок O"))
 
-            # Обновляем информацию о показанных рекордах
-            shown = data.get("shown_records", {"X": [], "O": []})
-            self.shown_records["X"] = set(shown.get("X", []))
-            self.shown_records["O"] = set(shown.get("O", []))
-
         except (json.JSONDecodeError, OSError, ValueError) as exc:
             # Обрабатываем возможные ошибки
-            print(f"Ошибка загрузки счета: {exc}")
+            events.report_error("загрузки счета", exc)
 
     def save_score(self) -> None:
-        """Сохраняет текущую статистику игроков в файл."""
+        """Сохраняет текущую статистику игроков в файл.
+
+        Если другое окно с теми же игроками уже записало свои победы,
+        к счету на диске прибавляются только свои победы с прошлой записи
+        (см. persistence.write_score).
+        """
         # Формируем данные для сохранения
         data = {
             "wins": self.win_count.copy(),  # Копируем счет
             "names": self.player_names.copy(),  # Копируем имена
-            "last_played": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),  # Текущая дата
-            "shown_records": {  # Конвертируем множества в списки
-                "X": list(self.shown_records["X"]),
-                "O": list(self.shown_records["O"])
-            },
+            "last_played": int(time.time()),  # Текущая дата (секунды эпохи)
         }
-
-        try:
-            # Открываем файл для записи
-            with open(SCORE_FILE, "w", encoding="utf-8") as f:
-                # Записываем данные в JSON с форматированием
-                json.dump(data, f, ensure_ascii=False, indent=4)
-        except OSError as exc:
-            # Обрабатываем ошибки записи
-            print(f"Ошибка сохранения счета: {exc}")
+        # Запись и слияние со счетом на диске выполняет поток писателя (блокировка файла
+        # другим процессом не задерживает интерфейс); текущий счет становится новой базой
+        self.writer.save_score(data, self.score_base.copy(), self.settings.score_file)
+        self.score_base = self.win_count.copy()
+        self.update_score_label()
 
     def update_score_label(self) -> None:
         """Обновляет текст метки с текущим счетом игроков."""
@@ -436,84 +511,310 @@ class TicTacToeApp:
         )
 
         # Обновляем имена, если введены непустые значения
-        if x_name:
-            self.player_names["X"] = x_name
-        if o_name:
-            self.player_names["O"] = o_name
+        for key, new_name in (("X", x_name), ("O", o_name)):
+            if not new_name or new_name == self.player_names[key]:
+                continue
+            self.player_names[key] = new_name
+            # Переключаем слот на профиль нового игрока
+            profile = self.profiles.get_or_create(new_name)
+            self.player_ids[key] = profile.id
+            # Счет слота принадлежит новому игроку: это его победы по профилю (как и при
+            # переносе счета между машинами). База слияния сдвигается вместе со счетом,
+            # иначе save_score прибавил бы к счету на диске разницу со счетом прежнего игрока
+            self.win_count[key] = profile.wins
+            self.score_base[key] = profile.wins
 
         # Обновляем отображение счета
         self.update_score_label()
         # Сохраняем изменения
         self.save_score()
 
-    @staticmethod
-    def load_history() -> List[Dict[str, str]]:
-        """Загружает историю игр из файла.
+    def sync_player_profiles(self) -> None:
+        """Находит (или создает) профили для текущих имен игроков."""
+        # Если файла профилей еще нет, переносим победы из старого файла счета
+        migrate = not os.path.exists(self.settings.profiles_file)
+        for key in ("X", "O"):
+            profile = self.profiles.get_or_create(self.player_names[key])
+            self.player_ids[key] = profile.id
+            if migrate:
+                self.profiles.import_legacy_wins(profile.id, self.win_count[key])
+        if migrate:
+            self.writer.save_profiles(self.profiles, self.settings.profiles_file)
+
+    def current_opponent_ids(self) -> Tuple[str, str, str]:
+        """Возвращает идентификаторы игроков X и O и ключ сложности партии."""
+        if self.vs_ai:
+            # Против ИИ за O играет профиль ИИ текущего уровня
+            ai_profile = self.profiles.get_or_create_ai(self.ai_difficulty)
+            return self.player_ids["X"], ai_profile.id, self.ai_difficulty
+        return self.player_ids["X"], self.player_ids["O"], PVP_KEY
+
+    def record_profile_result(self, winner: Optional[str]) -> None:
+        """Учитывает результат партии в профилях и рейтингах игроков.
 
-        Returns:
-            Список словарей с историей игр в формате [{"date": строка, "result": строка}]
+        Args:
+            winner: Символ победителя ('X' или 'O') или None для ничьей
         """
-        # Проверяем существование файла
-        if not os.path.exists(HISTORY_FILE):
-            return []  # Файла нет, возвращаем пустой список
+        x_id, o_id, difficulty = self.current_opponent_ids()
+        # Обновление агрегатов — O(1), без перечитывания истории
+        self.profiles.record_game(x_id, o_id, winner, difficulty, len(self.moves))
+        # Обновляем рейтинги обоих игроков
+        self.ratings.record_game(x_id, o_id, winner)
+        self.record_achievements(x_id, o_id, winner, difficulty, len(self.moves))
+        self.schedule_flush()
+
+    def record_achievements(self, x_id: str, o_id: str, winner: Optional[str], difficulty: str,
+                            length: int) -> None:
+        """Учитывает партию в достижениях и показывает полученные.
+
+        Вызывается из всех окон игры; запись выполняет schedule_flush вызывающего.
+
+        Args:
+            x_id: Идентификатор игрока X
+            o_id: Идентификатор игрока O
+            winner: Символ победителя или None для ничьей
+            difficulty: Уровень сложности ИИ или "pvp"
+            length: Количество ходов в партии
+        """
+        for player_id, rule in self.achievements.record_game(x_id, o_id, winner, difficulty, length):
+            self.check_records(player_id, rule)
+
+    def schedule_flush(self) -> None:
+        """Записывает профили и рейтинги сразу или откладывает запись.
+
+        При flush_interval_ms > 0 несколько партий подряд сохраняются одной записью.
+        """
+        if not self.settings.flush_interval_ms:
+            self.flush_stores()
+        elif self.flush_job is None:
+            self.flush_job = self.window.after(self.settings.flush_interval_ms, self.flush_stores)
+
+    def flush_stores(self) -> None:
+        """Передает снимки профилей, рейтингов и достижений писателю."""
+        if self.flush_job is not None:
+            self.window.after_cancel(self.flush_job)
+            self.flush_job = None
+        self.writer.save_profiles(self.profiles, self.settings.profiles_file)
+        self.writer.save_ratings(self.ratings, self.settings.ratings_file)
+        self.writer.save_achievements(self.achievements, self.settings.achievements_file)
+
+    def on_close(self) -> None:
+        """Закрывает приложение, дождавшись записи всех изменений."""
+        # Снимок сессии для мгновенного восстановления при следующем запуске
+        self.writer.save_session(self.session_state(), self.settings.session_file)
+        if self.flush_job is not None:
+            self.flush_stores()
+        self.writer.close()
+        # Дописываем журнал и метрики событий
+        self.events.close()
+        self.window.destroy()
+
+    def session_state(self) -> Dict[str, Any]:
+        """Текущее состояние сессии для снимка."""
+        return {
+            "moves": list(self.moves),  # Поле восстанавливается по ходам
+            "move_ms": list(self.move_ms),
+            "game_id": self.game_id,
+            "game_over": self.game_over,
+            "vs_ai": self.vs_ai,
+            "difficulty": self.ai_difficulty,
+            "theme": self.current_theme,
+            "seed": self.seed,
+            "rng": rng_state(self.rng),  # Генератор партии — ходы ИИ останутся воспроизводимыми
+            "player_names": dict(self.player_names),
+            "win_count": dict(self.win_count),
+            "score_base": dict(self.score_base),
+        }
+
+    def autosave_session(self) -> None:
+        """Передает снимок сессии писателю по таймеру."""
+        self.writer.save_session(self.session_state(), self.settings.session_file)
+        if self.settings.session_interval_ms:
+            self.window.after(self.settings.session_interval_ms, self.autosave_session)
+
+    def restore_session_settings(self, snapshot: Dict[str, Any]) -> None:
+        """Восстанавливает режим, сложность, тему, имена и счет из снимка.
 
+        Args:
+            snapshot: Проверенный снимок сессии (см. session.load_session)
+        """
+        self.vs_ai = bool(snapshot.get("vs_ai", self.vs_ai))
+        if snapshot.get("difficulty") in ai_registry.available():
+            self.ai_difficulty = snapshot["difficulty"]
+        if snapshot.get("theme") in THEMES:
+            self.current_theme = snapshot["theme"]
         try:
-            # Открываем файл для чтения
-            with open(HISTORY_FILE, "r", encoding="utf-8") as f:
-                # Загружаем данные из JSON
-                data = json.load(f)
-
-            # Проверяем, что данные в правильном формате (список)
-            if not isinstance(data, list):
-                return []  # Неверный формат, возвращаем пустой список
-
-            # Нормализуем данные (убеждаемся, что все строки)
-            normalized: List[Dict[str, str]] = []
-            for item in data:
-                if isinstance(item, dict):
-                    normalized.append({
-                        "date": str(item.get("date", "")),
-                        "result": str(item.get("result", ""))
-                    })
-            return normalized
-
-        except (json.JSONDecodeError, OSError) as exc:
-            # Обрабатываем ошибки чтения
-            print(f"Ошибка загрузки истории: {exc}")
-            return []
-
-    def save_game_result(self, result: str) -> None:
-        """Сохраняет результат текущей игры в историю.
+            for key in ("X", "O"):
+                self.player_names[key] = str(snapshot["player_names"][key])
+                self.win_count[key] = int(snapshot["win_count"][key])
+                self.score_base[key] = int(snapshot["score_base"][key])
+        except (KeyError, TypeError, ValueError) as exc:
+            events.report_error("загрузки сессии", exc)
+            self.load_score()
+
+    def restore_board(self, snapshot: Dict[str, Any]) -> None:
+        """Восстанавливает поле, очередь хода и генератор незаконченной партии.
 
         Args:
-            result: Строка с результатом игры (например, "Победа: Игрок X")
+            snapshot: Проверенный снимок сессии
         """
-        # Загружаем текущую историю игр
-        history = self.load_history()
-        # Добавляем новую запись с текущей датой и результатом
-        history.append({
-            "date": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-            "result": result
-        })
-
-        # Рассчитываем пороговую дату (текущая дата минус MAX_DAYS)
-        cutoff_date = datetime.now() - timedelta(days=MAX_DAYS)
-        # Фильтруем записи, оставляя только свежие
-        filtered = [
-            game for game in history
-            if datetime.strptime(game["date"], "%Y-%m-%d %H:%M:%S") >= cutoff_date
+        moves = snapshot["moves"]
+        for ply, cell in enumerate(moves):
+            symbol = "X" if ply % 2 == 0 else "O"
+            self.record_move(cell, symbol)
+            self.buttons[cell // 3][cell % 3].config(text=symbol)
+        self.seed = int(snapshot["seed"])
+        self.rng = restore_rng(snapshot["rng"])
+        self.game_id = str(snapshot.get("game_id") or self.game_id)
+        # Время ходов прошлой сессии (старые снимки его не содержат)
+        move_ms = snapshot.get("move_ms")
+        if isinstance(move_ms, list) and len(move_ms) == len(moves):
+            self.move_ms = [float(value) for value in move_ms]
+        # Очередь хода определяется по числу ходов (снимок мог быть сделан до смены игрока)
+        self.current_player = "X" if len(moves) % 2 == 0 else "O"
+        self.game_over = bool(snapshot.get("game_over"))
+
+        board = engine.board_from_cells(self.board)
+        finished = engine.winner(board) is not None or engine.EMPTY not in board
+        if self.game_over:
+            # Партия уже учтена — только подсвечиваем выигрышную линию
+            if self.check_winner_with_line():
+                self.highlight_win_line()
+        elif finished:
+            # Последний ход сделан, но партия еще не учтена — завершаем ее
+            self.current_player = "O" if self.current_player == "X" else "X"
+            self.window.after(0, self.check_and_end_game)
+        elif self.vs_ai and self.current_player == "O":
+            # Сессия закрылась, пока ИИ думал
+            self.window.after(self.settings.ai_time_budget_ms, self.ai_move)
+
+    def remember_settings(self, **changes: Any) -> None:
+        """Сохраняет выбор пользователя в файле настроек, если он изменился."""
+        if any(getattr(self.settings, key) != value for key, value in changes.items()):
+            self.settings = settings.save(**changes)
+
+    def poll_settings(self) -> None:
+        """Проверяет, изменился ли файл настроек, и применяет новые значения."""
+        changed = settings.reload_if_changed()
+        if changed is not None:
+            self.apply_settings(changed)
+        if self.settings.reload_poll_ms:
+            self.window.after(self.settings.reload_poll_ms, self.poll_settings)
+
+    def apply_settings(self, new: settings.Settings) -> None:
+        """Применяет перезагруженные настройки без перезапуска.
+
+        Пороги, пути и флаг звука читаются из self.settings при каждом
+        использовании, поэтому здесь обновляется только видимое состояние.
+
+        Args:
+            new: Новые настройки
+        """
+        old, self.settings = self.settings, new
+        # Хранилища по новым путям: сначала сохраняем изменения по старым
+        old_files = (old.profiles_file, old.ratings_file, old.achievements_file)
+        if old_files != (new.profiles_file, new.ratings_file, new.achievements_file):
+            if self.flush_job is not None:
+                self.window.after_cancel(self.flush_job)
+                self.flush_job = None
+            self.writer.save_profiles(self.profiles, old.profiles_file)
+            self.writer.save_ratings(self.ratings, old.ratings_file)
+            self.writer.save_achievements(self.achievements, old.achievements_file)
+            self.profiles = ProfileStore.load(new.profiles_file)
+            self.ratings = RatingStore.load(new.ratings_file)
+            self.achievements = AchievementStore.load(new.achievements_file)
+            self.sync_player_profiles()
+        # Меняем только то, что изменилось в настройках, не трогая выбор в интерфейсе
+        if new.audio and not old.audio:
+            init_audio()
+        if new.geometry != old.geometry:
+            self.window.geometry(new.geometry)
+        if new.theme != old.theme and new.theme in THEMES:
+            self.set_theme(new.theme)
+        if new.difficulty != old.difficulty:
+            self.ai_difficulty = new.difficulty
+            if self.difficulty_button:
+                self.difficulty_button.config(text=f"📊 Сложность: {ai_registry.title_of(new.difficulty)}")
+        if new.mode != old.mode and (new.mode == "ai") != self.vs_ai:
+            self.toggle_game_mode()
+
+    def show_leaderboard(self) -> None:
+        """Показывает окно с таблицей лидеров по всем профилям."""
+        # Рейтинг уже отсортирован, поэтому просто выводим строки
+        leaders = self.profiles.leaderboard()
+        if not leaders:
+            messagebox.showinfo("Таблица лидеров", "Пока нет ни одного игрока.")
+            return
+
+        # Создаем новое окно для таблицы
+        board_window = tk.Toplevel(self.window)
+        board_window.title("Таблица лидеров")  # Заголовок окна
+        board_window.geometry("500x400")  # Размер окна
+        board_window.transient(self.window)  # Делаем окно зависимым
+
+        # Создаем заголовок
+        tk.Label(
+            board_window,
+            text="Победы / Поражения / Ничьи",
+            font=("Arial", 14, "bold")
+        ).pack(pady=10)
+
+        # Listbox быстро отображает сотни строк без отдельного виджета на строку
+        listbox = tk.Listbox(board_window, font=("Courier", 10))
+        scrollbar = tk.Scrollbar(board_window, orient="vertical", command=listbox.yview)
+        listbox.configure(yscrollcommand=scrollbar.set)
+
+        # Формируем строки таблицы
+        rows = [
+            f"{idx:>3}. {p.name[:16]:<16} {p.wins:>4}/{p.losses:<4}/{p.draws:<4} "
+            f"рейт. {self.ratings.rating(p.id):6.0f} "
+            f"серия {p.best_streak:<3} ср. {p.avg_game_length:.1f} х."
+            for idx, p in enumerate(leaders, 1)
         ]
+        listbox.insert(tk.END, *rows)
 
-        # Ограничиваем количество записей до MAX_GAMES
-        filtered = filtered[-MAX_GAMES:]
+        # Размещаем элементы в окне
+        listbox.pack(side="left", fill="both", expand=True)
+        scrollbar.pack(side="right", fill="y")
 
-        try:
-            # Сохраняем обновленную историю в файл
-            with open(HISTORY_FILE, "w", encoding="utf-8") as f:
-                json.dump(filtered, f, ensure_ascii=False, indent=4)
-        except OSError as exc:
-            # Обрабатываем ошибки записи
-            print(f"Ошибка сохранения истории: {exc}")
+    def load_history(self) -> List[Dict[str, Any]]:
+        """Загружает историю игр из файла.
+
+        Returns:
+            Список словарей с историей игр в формате [{"date": секунды эпохи, "result": строка, ...}]
+        """
+        # Дожидаемся записи партий, еще стоящих в очереди писателя (не дольше FLUSH_TIMEOUT_S)
+        self.writer.flush(FLUSH_TIMEOUT_S)
+        # Файл перечитывается, только если изменился после фоновой загрузки
+        return self.history_cache.get(self.settings.history_file)
+
+    def save_game_result(self, result: str, winner: Optional[str] = None) -> None:
+        """Сохраняет результат текущей игры в историю.
+
+        Args:
+            result: Строка с результатом игры (например, "Победа: Игрок X")
+            winner: Символ победителя ('X' или 'O') или None для ничьей
+        """
+        # Идентификаторы игроков для профилей и пересчета статистики
+        x_id, o_id, difficulty = self.current_opponent_ids()
+        # Добавляем новую запись с текущей датой (секунды эпохи) и результатом;
+        # старые и лишние записи отбрасываются по max_days и max_games из настроек
+        self.writer.add_history({
+            "date": int(time.time()),
+            "result": result,
+            "id": self.game_id,  # Идентификатор партии
+            "players": {"X": x_id, "O": o_id},  # Профили игроков
+            "winner": winner or "",  # Пустая строка - ничья
+            "difficulty": difficulty,  # Уровень ИИ или "pvp"
+            "length": len(self.moves),  # Количество ходов
+            "moves": "".join(str(cell) for cell in self.moves),  # Ходы строкой индексов клеток
+            "seed": self.seed,  # Зерно генератора для воспроизведения ходов ИИ
+            # Время каждого хода (мс); в партии из старого снимка сессии его нет
+            "move_ms": list(self.move_ms) if len(self.move_ms) == len(self.moves) else [],
+        }, self.settings.history_file, self.settings.max_days, self.settings.max_games, self.settings.archive_dir)
+        self.events.publish(events.GameEnded(
+            self.game_id, winner or "", difficulty, len(self.moves), time.monotonic() - self.game_started,
+        ))
 
     def show_history(self) -> None:
         """Показывает окно с историей последних игр."""
@@ -538,6 +839,14 @@ class TicTacToeApp:
             font=("Arial", 14, "bold")  # Жирный шрифт
         ).pack(pady=10)  # Размещаем с отступом
 
+        # Кнопка просмотра записанных партий
+        tk.Button(
+            hist_window,
+            text="▶ Повтор партий",
+            font=("Arial", 10),
+            command=lambda: ReplayViewer(hist_window, history, THEMES[self.current_theme])
+        ).pack(side="bottom", fill="x", padx=10, pady=5)
+
         # Создаем область с прокруткой
         canvas = tk.Canvas(hist_window)  # Холст для прокрутки
         scrollbar = tk.Scrollbar(hist_window, orient="vertical", command=canvas.yview)  # Вертикальный скроллбар
@@ -558,7 +867,7 @@ class TicTacToeApp:
             # Создаем метку для каждой игры
             tk.Label(
                 scroll_frame,
-                text=f"{idx}. {game['date']} — {game['result']}",  # Форматируем текст
+                text=f"{idx}. {format_timestamp(game['date'])} — {game['result']}",  # Форматируем текст
                 font=("Arial", 10),  # Обычный шрифт
                 anchor="w",  # Выравнивание по левому краю
                 justify="left"  # Выравнивание текста
@@ -568,6 +877,155 @@ class TicTacToeApp:
         canvas.pack(side="left", fill="both", expand=True)
         scrollbar.pack(side="right", fill="y")
 
+    def show_stats(self) -> None:
+        """Показывает окно с аналитическими отчетами по истории игр."""
+        # Загружаем кэш сводок и учитываем только новые записи истории
+        self.writer.flush(FLUSH_TIMEOUT_S)
+        analytics = HistoryAnalytics.load(self.settings.rollups_file)
+        # Архив и быстрое хранилище; разделы архива старше уже учтенных записей не читаются
+        records = iter_all_history(self.settings.history_file, self.settings.archive_dir, analytics.watermark)
+        if analytics.refresh(records):
+            analytics.save(self.settings.rollups_file)
+        if not analytics.days:
+            messagebox.showinfo("Статистика", "История игр пуста.")
+            return
+
+        # Создаем новое окно для отчетов
+        stats_window = tk.Toplevel(self.window)
+        stats_window.title("Статистика")  # Заголовок окна
+        stats_window.geometry("500x500")  # Размер окна
+        stats_window.transient(self.window)  # Делаем окно зависимым
+
+        def export() -> None:
+            """Сохраняет отчеты в CSV-файл, выбранный пользователем."""
+            path = filedialog.asksaveasfilename(
+                parent=stats_window,
+                defaultextension=".csv",
+                filetypes=[("CSV", "*.csv")],
+            )
+            if not path:
+                return  # Пользователь отменил выбор
+            try:
+                analytics.export_csv(path)
+            except OSError as exc:
+                messagebox.showerror("Статистика", f"Ошибка экспорта: {exc}")
+
+        # Кнопка экспорта в CSV
+        tk.Button(
+            stats_window,
+            text="💾 Экспорт в CSV",
+            font=("Arial", 10),
+            command=export
+        ).pack(side="bottom", fill="x", padx=10, pady=5)
+
+        # Текстовое поле с отчетом (моноширинный шрифт для выравнивания)
+        text = tk.Text(stats_window, font=("Courier", 10), wrap="none")
+        scrollbar = tk.Scrollbar(stats_window, orient="vertical", command=text.yview)
+        text.configure(yscrollcommand=scrollbar.set)
+        text.insert("1.0", analytics.format_report())
+        text.config(state="disabled")  # Только для чтения
+
+        # Размещаем элементы в окне
+        text.pack(side="left", fill="both", expand=True)
+        scrollbar.pack(side="right", fill="y")
+
+    def show_replay(self) -> None:
+        """Открывает окно повтора записанных партий."""
+        # Повторяются только партии на поле 3x3 (без отметки варианта)
+        history = [record for record in self.load_history() if "variant" not in record]
+        if not history:
+            messagebox.showinfo("Повтор партий", "История игр пуста.")
+            return
+        ReplayViewer(self.window, history, THEMES[self.current_theme])
+
+    def show_ai_costs(self) -> None:
+        """Показывает стоимость работы загруженных стратегий ИИ."""
+        strategies = ai_registry.loaded()
+        if not strategies:
+            messagebox.showinfo("Стоимость ИИ", "ИИ еще не делал ходов.")
+            return
+
+        # Формируем строки отчета: ходы, узлы, среднее время и память
+        lines = [f"{'Стратегия':<12}{'Ходы':>6}{'Узлы':>10}{'мс/ход':>9}{'Память':>10}"]
+        for strategy in strategies.values():
+            stats = strategy.stats
+            lines.append(
+                f"{strategy.title:<12}{stats.calls:>6}{stats.nodes:>10}"
+                f"{stats.avg_time_ms:>9.2f}{strategy.memory_bytes() / 1024:>8.0f}КБ"
+            )
+
+        # Создаем новое окно для отчета
+        cost_window = tk.Toplevel(self.window)
+        cost_window.title("Стоимость ИИ")  # Заголовок окна
+        cost_window.transient(self.window)  # Делаем окно зависимым
+        tk.Label(
+            cost_window,
+            text="\n".join(lines),
+            font=("Courier", 10),
+            justify="left"
+        ).pack(padx=10, pady=10)
+
+    def show_achievements(self) -> None:
+        """Показывает достижения игроков X и O и прогресс по остальным правилам."""
+        lines = []
+        for key in ("X", "O"):
+            player_id = self.player_ids.get(key)
+            if player_id is None:
+                continue
+            lines.append(f"{self.player_names[key]}:")
+            unlocked = {rule.id for rule, _ts in self.achievements.unlocked(player_id)}
+            for rule in self.achievements.engine.rules.values():
+                if rule.id in unlocked:
+                    lines.append(f"  ✔ {rule.title}")
+                else:
+                    lines.append(f"    {rule.title} ({self.achievements.progress_of(player_id, rule)}/{rule.target})")
+
+        # Создаем новое окно для отчета
+        achievements_window = tk.Toplevel(self.window)
+        achievements_window.title("Достижения")  # Заголовок окна
+        achievements_window.transient(self.window)  # Делаем окно зависимым
+        tk.Label(
+            achievements_window,
+            text="\n".join(lines),
+            font=("Courier", 10),
+            justify="left"
+        ).pack(padx=10, pady=10)
+
+    def show_move_timings(self) -> None:
+        """Показывает перцентили времени ходов за сессию (человек, уровни ИИ, анимация)."""
+        if not self.timings.histograms:
+            messagebox.showinfo("Время ходов", "В этой сессии еще не было ходов.")
+            return
+
+        # Создаем новое окно для отчета
+        timing_window = tk.Toplevel(self.window)
+        timing_window.title("Время ходов, мс")  # Заголовок окна
+        timing_window.transient(self.window)  # Делаем окно зависимым
+        tk.Label(
+            timing_window,
+            text="\n".join(self.timings.report_lines()),
+            font=("Courier", 10),
+            justify="left"
+        ).pack(padx=10, pady=10)
+
+    def show_multiboard(self) -> None:
+        """Открывает окно с несколькими досками, играющими одновременно."""
+        count = simpledialog.askinteger(
+            "Несколько досок",
+            f"Количество досок ({MultiBoardWindow.MIN_BOARDS}–{MultiBoardWindow.MAX_BOARDS}):",
+            parent=self.window,
+            initialvalue=4,
+            minvalue=MultiBoardWindow.MIN_BOARDS,
+            maxvalue=MultiBoardWindow.MAX_BOARDS,
+        )
+        if count:
+            # Доски используют профили, рейтинги и писатель этого окна
+            MultiBoardWindow(self, count, THEMES[self.current_theme])
+
+    def show_ultimate(self) -> None:
+        """Открывает окно ультимативной игры (9 малых полей) в текущем режиме."""
+        UltimateWindow(self, THEMES[self.current_theme])
+
     @staticmethod
     def destroy_notification_safely(widget: Optional[tk.Toplevel]) -> None:
         """Безопасно закрывает окно уведомления, если оно существует.
@@ -587,11 +1045,12 @@ class TicTacToeApp:
             # Игнорируем ошибки (если окно уже закрыто)
             pass
 
-    def show_record_notification(self, player_key: str) -> None:
-        """Показывает уведомление о достижении рекорда.
+    def show_record_notification(self, name: str, title: str) -> None:
+        """Показывает уведомление о полученном достижении.
 
         Args:
-            player_key: Ключ игрока ('X' или 'O'), достигшего рекорда
+            name: Имя игрока
+            title: Название достижения
         """
         # Закрываем предыдущее уведомление (если было)
         self.destroy_notification_safely(self.record_notification)
@@ -608,19 +1067,16 @@ class TicTacToeApp:
         bg_color = theme.get("glow", theme["highlight"])
         self.record_notification.config(bg=bg_color)  # Устанавливаем фон
 
-        # Подготовка сообщения
-        name = self.player_names[player_key]  # Имя игрока
-        count = self.win_count[player_key]  # Количество побед
-
         # Список возможных сообщений
         messages = [
-            f"🚀 Вау, {name}! Это уже {count}-я победа!",
-            f"🎉 Поздравляем, {name}! Рекорд достигнут!",
-            f"🏆 {name}, ты становишься легендой! {count} побед!",
-            f"💫 Блестяще, {name}! {count} раз ты выиграл!",
+            f"🚀 Вау, {name}! Достижение «{title}»!",
+            f"🎉 Поздравляем, {name}! Получено: «{title}»",
+            f"🏆 {name}, ты становишься легендой! «{title}»",
+            f"💫 Блестяще, {name}! Новое достижение: «{title}»",
         ]
-        # Выбираем случайное сообщение
-        msg = random.choice(messages)
+        # Выбираем случайное сообщение генератором интерфейса: генератор партии трогать нельзя,
+        # иначе уведомление (оно приходит с задержкой) сдвинет воспроизводимые ходы ИИ
+        msg = self.ui_rng.choice(messages)
 
         # Создаем текстовую метку
         label = tk.Label(
@@ -638,23 +1094,23 @@ class TicTacToeApp:
         # Закрываем уведомление через 3 секунды
         self.window.after(3000, lambda: self.destroy_notification_safely(self.record_notification))
 
-    @staticmethod
-    def play_victory_sound() -> None:
-        """Воспроизводит звук победы, если доступен."""
+    def play_victory_sound(self) -> None:
+        """Воспроизводит звук победы, если доступен и включен в настройках."""
         # Проверяем, доступен ли звук
-        if not AUDIO_OK or PYGAME is None:
+        if not self.settings.audio or not init_audio():
             return
+        pygame = _Audio.pygame
 
         def _play() -> None:
             """Внутренняя функция для воспроизведения звука в отдельном потоке."""
             try:
                 # Загружаем звуковой файл
-                PYGAME.mixer.music.load("victory.mp3")
+                pygame.mixer.music.load("victory.mp3")
                 # Воспроизводим звук
-                PYGAME.mixer.music.play()
+                pygame.mixer.music.play()
             except Exception as exc:
-                # Обрабатываем ошибки воспроизведения
-                print(f"Ошибка звука: {exc}")
+                # Ошибка воспроизведения выводится потоком шины событий
+                events.report_error("воспроизведения звука", exc)
 
         # Запускаем звук в отдельном потоке
         threading.Thread(target=_play, daemon=True).start()
@@ -662,62 +1118,24 @@ class TicTacToeApp:
     def check_winner_with_line(self) -> Optional[str]:
         """Проверяет, есть ли победитель, и запоминает выигрышную линию.
 
+        Результат определяется по логическому полю: кнопки только отображают
+        его и могут отставать из-за анимации последнего хода.
+
         Returns:
             Символ победителя ('X' или 'O') или None, если победителя нет
         """
-        # Сбрасываем предыдущую выигрышную линию
-        self.win_line = []
-
-        # Проверяем строки
-        for row in range(3):
-            if (self.buttons[row][0]["text"] ==
-                    self.buttons[row][1]["text"] ==
-                    self.buttons[row][2]["text"] != ""):
-                # Запоминаем выигрышную линию
-                self.win_line = [(row, 0), (row, 1), (row, 2)]
-                # Возвращаем символ победителя
-                return self.buttons[row][0]["text"]
-
-        # Проверяем столбцы
-        for col in range(3):
-            if (self.buttons[0][col]["text"] ==
-                    self.buttons[1][col]["text"] ==
-                    self.buttons[2][col]["text"] != ""):
-                self.win_line = [(0, col), (1, col), (2, col)]
-                return self.buttons[0][col]["text"]
-
-        # Проверяем диагонали
-        # Главная диагональ (слева направо вниз)
-        if (self.buttons[0][0]["text"] ==
-                self.buttons[1][1]["text"] ==
-                self.buttons[2][2]["text"] != ""):
-            self.win_line = [(0, 0), (1, 1), (2, 2)]
-            return self.buttons[0][0]["text"]
-
-        # Побочная диагональ (справа налево вниз)
-        if (self.buttons[0][2]["text"] ==
-                self.buttons[1][1]["text"] ==
-                self.buttons[2][0]["text"] != ""):
-            self.win_line = [(0, 2), (1, 1), (2, 0)]
-            return self.buttons[0][2]["text"]
-
-        # Победителя нет
-        return None
+        line = engine.winning_line(engine.board_from_cells(self.board))
+        # Запоминаем выигрышную линию (или сбрасываем предыдущую)
+        self.win_line = [divmod(cell, 3) for cell in line] if line else []
+        return self.board[line[0]] if line else None
 
     def check_draw(self) -> bool:
         """Проверяет, закончилась ли игра вничью (все клетки заполнены).
 
         Returns:
-            True, если все клетки заполнены и нет победителя, иначе False
+            True, если все клетки логического поля заполнены, иначе False
         """
-        # Проходим по всем клеткам поля
-        for row in self.buttons:
-            for btn in row:
-                # Если найдена пустая клетка - ничьи еще нет
-                if btn["text"] == "":
-                    return False
-        # Все клетки заполнены - ничья
-        return True
+        return all(self.board)
 
     def highlight_win_line(self) -> None:
         """Подсвечивает выигрышную линию на поле."""
@@ -780,19 +1198,25 @@ class TicTacToeApp:
         """
         # Начальное состояние - пробел
         btn.config(text=" ")
+        started = time.monotonic()
+
+        def _final_frame(char: str, delay: int) -> None:
+            """Последний кадр: опоздание относительно плана — задержка интерфейса."""
+            btn.config(text=char)
+            self.timings.record_ms(timing.ANIMATION_KEY, (time.monotonic() - started) * 1000 - delay)
 
         if symbol == "X":
             # Анимация для X: сначала показываем "/", потом "X"
             self.window.after(50, lambda: btn.config(text="/"))
-            self.window.after(150, lambda: btn.config(text="X"))
+            self.window.after(150, lambda: _final_frame("X", 150))
         else:
             # Анимация для O: постепенно увеличиваем символ
-            for step in range(1, 6):  # 5 шагов анимации
+            for step in range(1, 5):  # 4 промежуточных шага анимации
                 delay = step * 50  # Задержка для каждого шага
-                # Для первых 4 шагов используем "о", на последнем - "O"
-                char = "o" if step < 5 else "O"
                 # Планируем изменение текста кнопки
-                self.window.after(delay, lambda c=char: btn.config(text=c))
+                self.window.after(delay, lambda: btn.config(text="o"))
+            # На последнем шаге - "O"
+            self.window.after(250, lambda: _final_frame("O", 250))
 
     def on_click(self, row: int, col: int) -> None:
         """Обрабатывает клик игрока по клетке поля.
@@ -802,11 +1226,16 @@ class TicTacToeApp:
             col: Номер столбца (0-2)
         """
         # Если игра завершена или клетка уже занята - игнорируем клик
-        if self.game_over or self.buttons[row][col]["text"] != "":
+        if self.game_over or self.board[row * 3 + col] or self.buttons[row][col]["text"] != "":
             return
 
         # Получаем кнопку, по которой кликнули
         btn = self.buttons[row][col]
+        # Время обдумывания с момента, когда ход перешел к игроку
+        self.time_move(timing.HUMAN_KEY, (time.monotonic() - self.turn_started) * 1000)
+        # Запоминаем ход
+        self.record_move(row * 3 + col, self.current_player)
+        self.publish_move(row * 3 + col, self.current_player, "human")
         # Запускаем анимацию для текущего игрока
         self.animate_move(btn, self.current_player)
         # Планируем проверку состояния игры через 200 мс
@@ -824,7 +1253,9 @@ class TicTacToeApp:
             # Показываем сообщение о победе
             messagebox.showinfo("Победа!", f"🎉 {winner_name} победил(а)!")
             # Сохраняем результат игры
-            self.save_game_result(f"Победа: {winner_name}")
+            self.save_game_result(f"Победа: {winner_name}", winner)
+            # Обновляем профили игроков
+            self.record_profile_result(winner)
             # Воспроизводим звук победы
             self.play_victory_sound()
             # Увеличиваем счет победителя
@@ -833,8 +1264,6 @@ class TicTacToeApp:
             self.update_score_label()
             # Сохраняем обновленную статистику
             self.save_score()
-            # Проверяем, нужно ли показать уведомление о рекорде
-            self.check_records(winner)
             # Помечаем игру как завершенную
             self.game_over = True
             return
@@ -845,17 +1274,21 @@ class TicTacToeApp:
             messagebox.showinfo("Ничья!", "🤝")
             # Сохраняем результат игры
             self.save_game_result("Ничья")
+            # Обновляем профили игроков
+            self.record_profile_result(None)
             # Помечаем игру как завершенную
             self.game_over = True
             return
 
         # Меняем текущего игрока
         self.current_player = "O" if self.current_player == "X" else "X"
+        # С этого момента следующий игрок обдумывает ход
+        self.turn_started = time.monotonic()
 
         # Если играем против ИИ и сейчас его ход
         if self.vs_ai and self.current_player == "O" and not self.game_over:
-            # Планируем ход ИИ через 300 мс
-            self.window.after(300, self.ai_move)
+            # Планируем ход ИИ через время, отведенное на ход в настройках
+            self.window.after(self.settings.ai_time_budget_ms, self.ai_move)
 
     def ai_move(self) -> None:
         """Выполняет ход компьютерного игрока (ИИ)."""
@@ -863,154 +1296,114 @@ class TicTacToeApp:
         if self.game_over:
             return
 
-        # Собираем список свободных клеток
-        empty_cells = [
-            (i, j)
-            for i in range(3)
-            for j in range(3)
-            if self.buttons[i][j]["text"] == ""
-        ]
-
-        # Если свободных клеток нет - выходим
-        if not empty_cells:
-            return
-
-        # Переменная для лучшего хода
-        best_move: Optional[Tuple[int, int]] = None
-
-        # Выбираем стратегию в зависимости от уровня сложности
-        if self.ai_difficulty == "hard":
-            # Используем оптимизированный минимакс для сложного уровня
-            _, best_move = self.optimized_minimax(True)
-        elif self.ai_difficulty == "normal":
-            # Для среднего уровня ищем выигрышные ходы или блокировки
-            # Поиск хода для победы ИИ
-            winning_move = self.find_winning_move("O")
-            # Поиск хода для блокировки игрока
-            blocking_move = self.find_winning_move("X")
-
-            if winning_move is not None:
-                best_move = winning_move  # Выбираем выигрышный ход
-            elif blocking_move is not None:
-                best_move = blocking_move  # Блокируем игрока
-            else:
-                # Если нет выигрышных ходов - случайный ход
-                best_move = random.choice(empty_cells)
-        else:
-            # Для легкого уровня - всегда случайный ход
-            best_move = random.choice(empty_cells)
+        # Получаем стратегию текущего уровня (модуль загружается при первом ходе)
+        strategy = ai_registry.get_strategy(self.ai_difficulty)
+        # Стратегия выбирает клетку и сама учитывает стоимость хода
+        started = time.monotonic()
+        cell = strategy.choose_move(engine.board_from_cells(self.board), "O", self.rng, self.threats)
+        elapsed_ms = (time.monotonic() - started) * 1000
 
-        # Если ход не найден (маловероятно) - выходим
-        if best_move is None:
+        # Если ход не найден (свободных клеток нет) - выходим
+        if cell is None:
             return
 
         # Извлекаем координаты хода
-        i, j = best_move
+        i, j = divmod(cell, 3)
         # Получаем кнопку по координатам
         btn = self.buttons[i][j]
+        self.time_move(timing.ai_key(self.ai_difficulty), elapsed_ms)
+        # Запоминаем ход
+        self.record_move(i * 3 + j, "O")
+        self.publish_move(i * 3 + j, "O", "ai")
         # Запускаем анимацию для символа O
         self.animate_move(btn, "O")
         # Планируем проверку состояния игры через 200 мс
         self.window.after(200, self.check_and_end_game)
 
-    def find_winning_move(self, player_symbol: str) -> Optional[Tuple[int, int]]:
-        """Ищет выигрышный ход для указанного символа.
+    def record_move(self, cell: int, symbol: str) -> None:
+        """Запоминает ход в логическом состоянии партии.
 
         Args:
-            player_symbol: Символ игрока ('X' или 'O')
-
-        Returns:
-            Кортеж (строка, столбец) с координатами выигрышного хода или None
+            cell: Индекс клетки (0-8)
+            symbol: Символ игрока ('X' или 'O')
         """
-        # Проходим по всем клеткам поля
-        for i in range(3):
-            for j in range(3):
-                # Если клетка свободна
-                if self.buttons[i][j]["text"] == "":
-                    # Пробуем поставить символ
-                    self.buttons[i][j]["text"] = player_symbol
-                    # Проверяем, привело ли это к победе
-                    is_win = self.check_winner_with_line() == player_symbol
-                    # Отменяем ход (возвращаем пустую клетку)
-                    self.buttons[i][j]["text"] = ""
-
-                    # Если это выигрышный ход - возвращаем координаты
-                    if is_win:
-                        return (i, j)
-        # Выигрышных ходов не найдено
-        return None
-
-    def optimized_minimax(self, is_maximizing: bool, depth: int = 0, alpha: float = -float('inf'),
-                          beta: float = float('inf')) -> Tuple[float, Optional[Tuple[int, int]]]:
-        """Оптимизированный алгоритм минимакс с альфа-бета отсечением.
+        self.board[cell] = symbol
+        self.moves.append(cell)
+        # Обновляем счетчики линий этой клетки
+        self.threats.play(cell, symbol)
+        # Подсказки относятся к предыдущей позиции
+        self.clear_hints()
 
-        Args:
-            is_maximizing: True если это ход активизирующего игрока (ИИ)
-            depth: Глубина рекурсии
-            alpha: Лучшее значение для активизирующего игрока
-            beta: Лучшее значение для минимизирующего игрока
+    def time_move(self, key: str, elapsed_ms: float) -> None:
+        """Запоминает время хода в партии и в гистограмме сессии.
 
-        Returns:
-            Кортеж (оценка позиции, лучший ход)
+        Args:
+            key: Ключ гистограммы (timing.HUMAN_KEY или timing.ai_key(уровень))
+            elapsed_ms: Время обдумывания или расчета хода (мс)
         """
-        # Проверяем терминальные состояния (победа, поражение, ничья)
-        winner = self.check_winner_with_line()
-        if winner == "O":  # Победа ИИ
-            return 1, None
-        if winner == "X":  # Победа игрока
-            return -1, None
-        if self.check_draw():  # Ничья
-            return 0, None
-
-        # Переменная для лучшего хода
-        best_move: Optional[Tuple[int, int]] = None
-
-        if is_maximizing:  # Ход ИИ (максимизация выигрыша)
-            max_eval = -float('inf')  # Начальное значение оценки
-            for i in range(3):
-                for j in range(3):
-                    # Для каждой свободной клетки
-                    if self.buttons[i][j]["text"] == "":
-                        # Делаем ход вместо ИИ (символ O)
-                        self.buttons[i][j]["text"] = "O"
-                        # Рекурсивно вызываем минимакс для следующего хода
-                        eval_val, _ = self.optimized_minimax(False, depth + 1, alpha, beta)
-                        # Отменяем ход
-                        self.buttons[i][j]["text"] = ""
-
-                        # Если оценка лучше текущей - обновляем
-                        if eval_val > max_eval:
-                            max_eval = eval_val
-                            best_move = (i, j)
-
-                        # Альфа-бета отсечение
-                        alpha = max(alpha, eval_val)
-                        if beta <= alpha:
-                            break  # Прерываем цикл
-            return max_eval, best_move
-        else:  # Ход игрока (минимизация выигрыша ИИ)
-            min_eval = float('inf')  # Начальное значение оценки
-            for i in range(3):
-                for j in range(3):
-                    # Для каждой свободной клетки
-                    if self.buttons[i][j]["text"] == "":
-                        # Делаем ход за игрока (символ X)
-                        self.buttons[i][j]["text"] = "X"
-                        # Рекурсивно вызываем минимакс для следующего хода
-                        eval_val, _ = self.optimized_minimax(True, depth + 1, alpha, beta)
-                        # Отменяем ход
-                        self.buttons[i][j]["text"] = ""
-
-                        # Если оценка лучше текущей - обновляем
-                        if eval_val < min_eval:
-                            min_eval = eval_val
-                            best_move = (i, j)
-
-                        # Альфа-бета отсечение
-                        beta = min(beta, eval_val)
-                        if beta <= alpha:
-                            break  # Прерываем цикл
-            return min_eval, best_move
+        self.move_ms.append(round(elapsed_ms, 1))
+        self.timings.record_ms(key, elapsed_ms)
+
+    def publish_move(self, cell: int, symbol: str, source: str) -> None:
+        """Публикует событие хода (журнал пишется в потоке шины)."""
+        self.events.publish(events.MovePlayed(self.game_id, symbol, cell, len(self.moves), source))
+
+    def show_hint(self) -> None:
+        """Запускает анализ позиции в фоновом потоке и показывает оценки ходов."""
+        if self.game_over:
+            return
+        # Ход ИИ еще не сделан — подсказка не нужна
+        if self.vs_ai and self.current_player == "O":
+            return
+
+        # Кто ходит, определяем по логическому полю (не зависит от анимации)
+        board = engine.board_from_cells(self.board)
+        player = "X" if board.count("X") == board.count("O") else "O"
+        ply = len(self.moves)
+
+        def _analyze() -> None:
+            """Внутренняя функция анализа в отдельном потоке."""
+            self.hint_queue.put((ply, engine.analyze(board, player)))
+
+        # Интерфейс не ждет решателя: результат заберем из очереди
+        threading.Thread(target=_analyze, daemon=True).start()
+        self.window.after(HINT_POLL_MS, self.poll_hints)
+
+    def poll_hints(self) -> None:
+        """Забирает результат анализа из очереди и рисует подсказки."""
+        try:
+            ply, values = self.hint_queue.get_nowait()
+        except queue.Empty:
+            # Анализ еще идет — проверим позже
+            self.window.after(HINT_POLL_MS, self.poll_hints)
+            return
+
+        # Позиция изменилась, пока шел анализ — подсказка устарела
+        if ply != len(self.moves) or self.game_over:
+            return
+
+        self.clear_hints()
+        for cell, (outcome, distance) in values.items():
+            # Победа через N ходов: "+N", ничья: "=", поражение через N ходов: "-N"
+            text = "=" if outcome == engine.DRAW else f"{'+' if outcome == engine.WIN else '-'}{distance}"
+            label = tk.Label(
+                self.buttons[cell // 3][cell % 3],
+                text=text,
+                font=("Arial", 9, "bold"),
+                bg=HINT_COLORS[outcome],
+                fg="white"
+            )
+            # Клик по метке работает так же, как клик по клетке
+            label.bind("<Button-1>", lambda _e, c=cell: self.on_click(c // 3, c % 3))
+            # Размещаем метку в углу клетки, не меняя текст кнопки
+            label.place(relx=1.0, rely=0.0, anchor="ne")
+            self.hint_labels.append(label)
+
+    def clear_hints(self) -> None:
+        """Убирает метки подсказок с поля."""
+        for label in self.hint_labels:
+            label.destroy()
+        self.hint_labels = []
 
     def reset_game(self) -> None:
         """Начинает новую игру, сбрасывая состояние."""
@@ -1018,6 +1411,19 @@ class TicTacToeApp:
         self.current_player = "X"
         # Сбрасываем флаг завершения игры
         self.game_over = False
+        # Новая партия: идентификатор, время начала, зерно и генератор
+        self.game_id = uuid.uuid4().hex
+        self.game_started = time.monotonic()
+        self.seed = new_seed()
+        self.rng = random.Random(self.seed)
+        # Очищаем список ходов и логическое поле
+        self.moves = []
+        self.move_ms = []
+        self.turn_started = time.monotonic()
+        self.board = [""] * 9
+        self.threats = ThreatIndex()
+        # Убираем подсказки прошлой партии
+        self.clear_hints()
         # Сбрасываем цвета кнопок и очищаем поле
         self.reset_button_colors()
 
@@ -1030,6 +1436,8 @@ class TicTacToeApp:
         if self.mode_button:
             text = "🎮 Режим: ИИ" if self.vs_ai else "🎮 Режим: 2 игрока"
             self.mode_button.config(text=text)
+        # Запоминаем режим в файле настроек
+        self.remember_settings(mode="ai" if self.vs_ai else "pvp")
 
         # Начинаем новую игру
         self.reset_game()
@@ -1045,16 +1453,19 @@ class TicTacToeApp:
             """
             # Сохраняем выбранный уровень сложности
             self.ai_difficulty = chosen
+            self.remember_settings(difficulty=chosen)
             # Обновляем текст кнопки
             if self.difficulty_button:
-                self.difficulty_button.config(text=f"📊 Сложность: {chosen.capitalize()}")
+                self.difficulty_button.config(text=f"📊 Сложность: {ai_registry.title_of(chosen)}")
             # Закрываем окно выбора сложности
             diff_window.destroy()
 
         # Создаем диалоговое окно
         diff_window = tk.Toplevel(self.window)
         diff_window.title("Уровень сложности ИИ")  # Заголовок
-        diff_window.geometry("250x200")  # Размер окна
+        # Высота окна зависит от количества зарегистрированных стратегий
+        levels = ai_registry.available()
+        diff_window.geometry(f"250x{80 + 40 * len(levels)}")  # Размер окна
         diff_window.resizable(False, False)  # Запрет изменения размера
         diff_window.transient(self.window)  # Делаем окно зависимым
         diff_window.grab_set()  # Блокируем главное окно
@@ -1067,11 +1478,11 @@ class TicTacToeApp:
         ).pack(pady=10)  # Размещаем с отступом
 
         # Кнопки для каждого уровня сложности
-        for level in ["easy", "normal", "hard"]:
+        for level in levels:
             # Создаем кнопку
             btn = tk.Button(
                 diff_window,
-                text=level.capitalize(),  # Текст с заглавной буквы
+                text=ai_registry.title_of(level),  # Название стратегии
                 font=("Arial", 10),  # Шрифт
                 width=15,  # Ширина
                 command=lambda l=level: apply_diff(l)  # Обработчик
@@ -1088,8 +1499,9 @@ class TicTacToeApp:
         if theme_key not in THEMES:
             return
 
-        # Сохраняем выбранную тему
+        # Сохраняем выбранную тему (и в файле настроек)
         self.current_theme = theme_key
+        self.remember_settings(theme=theme_key)
 
         # Обновляем текст кнопки выбора темы
         if self.theme_button:
@@ -1142,6 +1554,7 @@ class TicTacToeApp:
         # Мы сохраняем их базовые цвета, но обновляем текстовые цвета
         buttons_to_update = [
             (self.reset_button, "#add8e6"),
+            (self.hint_button, "#fff59d"),
             (self.mode_button, "#90ee90"),
             (self.difficulty_button, "#f08080"),
             (self.theme_button, "#dda0dd"),
@@ -1156,29 +1569,25 @@ class TicTacToeApp:
                     fg=theme["btn_fg"]  # Обновляем цвет текста
                 )
 
-    def check_records(self, player_key: str) -> None:
-        """Проверяет и показывает уведомление о достижении рекорда.
+    def check_records(self, player_id: str, rule: Rule) -> None:
+        """Сообщает о полученном достижении и показывает уведомление.
 
         Args:
-            player_key: Ключ игрока ('X' или 'O')
+            player_id: Идентификатор профиля игрока
+            rule: Правило полученного достижения
         """
-        # Текущее количество побед игрока
-        count = self.win_count[player_key]
-
-        # Проверяем, достигнут ли порог рекорда и не показывали ли его ранее
-        if count in RECORDS and count not in self.shown_records[player_key]:
-            # Добавляем рекорд в показанные
-            self.shown_records[player_key].add(count)
-            # Сохраняем обновленные данные
-            self.save_score()
-            # Планируем показ уведомления
-            self.window.after(600, lambda: self.show_record_notification(player_key))
-
+        profile = self.profiles.get(player_id)
+        name = profile.name if profile else player_id
+        self.events.publish(events.RecordReached(player_id, name, rule.id, rule.title))
+        # Планируем показ уведомления (после окна с итогом партии)
+        self.window.after(600, lambda: self.show_record_notification(name, rule.title))
 
 # Точка входа в приложение
 if __name__ == "__main__":
     # Создаем главное окно приложения
     root_window = tk.Tk()
+    # Загружаем настройки один раз: файл, окружение TTT_*, аргументы командной строки
+    settings.load(sys.argv[1:])
     # Создаем экземпляр нашего приложения
     app = TicTacToeApp(root_window)
     # Запускаем главный цикл обработки событий
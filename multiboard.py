@@ -0,0 +1,298 @@
+# -*- coding: utf-8 -*-
+# Режим нескольких досок для игры "Крестики-нолики"
+# Несколько партий (от 2 до 16) идут одновременно в одном окне и одном процессе.
+# Ходы ИИ считает общий пул потоков, а все записи на диск делает единственный
+# писатель приложения (persistence.PersistenceWriter), поэтому доски не пишут
+# одни и те же файлы наперегонки. У каждой партии свой идентификатор и зерно.
+
+# Импортируем необходимые модули
+from typing import Any, Dict, List, Optional, Tuple  # Для указания типов данных
+from concurrent.futures import ThreadPoolExecutor  # Общий пул потоков ИИ
+import math  # Для размеров сетки досок
+import queue  # Для передачи ходов ИИ в поток интерфейса
+import random  # Для генераторов случайных чисел партий
+import time  # Для меток времени записей
+import uuid  # Для идентификаторов партий
+
+import tkinter as tk  # Основная библиотека для создания графического интерфейса
+
+import ai_registry  # Реестр стратегий ИИ
+import engine  # Правила игры
+import events  # Шина событий (ходы и концы партий)
+from profiles import PVP_KEY  # Ключ партий двух игроков
+from simulator import new_seed  # Зерна партий
+from threats import ThreatIndex  # Индекс угроз, обновляемый на каждом ходу
+
+# Интервал проверки готовых ходов ИИ (мс)
+AI_POLL_MS: int = 30
+
+
+class AIPool:
+    """Общий пул потоков, считающий ходы ИИ для всех досок.
+
+    Стратегии — общие экземпляры из ai_registry; они потокобезопасны (см.
+    AIStrategy), поэтому доски с одним уровнем ИИ считают ходы параллельно.
+    """
+
+    def __init__(self, workers: int) -> None:
+        """Создает пул.
+
+        Args:
+            workers: Количество потоков
+        """
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="ai")
+        # Готовые ходы: (номер доски, номер партии на доске, клетка)
+        self.results: "queue.Queue[Tuple[int, int, Optional[int]]]" = queue.Queue()
+
+    def submit(self, board_no: int, token: int, level: str, board: str, player: str,
+               rng: random.Random, threats: ThreatIndex) -> None:
+        """Ставит расчет хода в очередь пула.
+
+        Args:
+            board_no: Номер доски
+            token: Номер партии на доске (устаревшие ответы отбрасываются)
+            level: Уровень ИИ
+            board: Строка поля движка
+            player: Символ ИИ
+            rng: Генератор партии (пока ИИ думает, доска его не трогает)
+            threats: Индекс угроз доски
+        """
+        def _think() -> None:
+            """Считает ход в потоке пула (модуль стратегии загружается здесь, а не в интерфейсе)."""
+            cell = ai_registry.get_strategy(level).choose_move(board, player, rng, threats)
+            self.results.put((board_no, token, cell))
+
+        self.executor.submit(_think)
+
+    def shutdown(self) -> None:
+        """Останавливает пул, не дожидаясь поставленных расчетов."""
+        self.executor.shutdown(wait=False)
+
+
+class BoardView:
+    """Одна доска: поле 3x3, состояние партии и строка состояния."""
+
+    def __init__(self, host: "MultiBoardWindow", parent: tk.Misc, board_no: int) -> None:
+        """Создает доску.
+
+        Args:
+            host: Окно нескольких досок
+            parent: Родительский виджет
+            board_no: Номер доски (с единицы)
+        """
+        self.host: "MultiBoardWindow" = host
+        self.board_no: int = board_no
+        theme = host.theme
+        self.frame = tk.Frame(parent, bg=theme["bg"], bd=1, relief="groove")
+        self.title = tk.Label(self.frame, font=("Arial", 9, "bold"), bg=theme["bg"], fg=theme["btn_fg"])
+        self.title.grid(row=0, column=0, columnspan=3)
+        self.buttons: List[tk.Button] = []
+        for cell in range(9):
+            btn = tk.Button(
+                self.frame,
+                text="",
+                font=("Arial", 16, "bold"),
+                width=2,
+                height=1,
+                bg=theme["btn_bg"],
+                fg=theme["btn_fg"],
+                command=lambda c=cell: self.on_click(c),
+            )
+            btn.grid(row=1 + cell // 3, column=cell % 3, padx=1, pady=1)
+            self.buttons.append(btn)
+        self.status = tk.Label(self.frame, font=("Arial", 9), bg=theme["bg"], fg=theme["btn_fg"])
+        self.status.grid(row=4, column=0, columnspan=3)
+        # Номер партии на доске: ответы ИИ для прошлых партий игнорируются
+        self.token: int = 0
+        self.new_game()
+
+    def new_game(self) -> None:
+        """Начинает новую партию на доске со своим идентификатором и зерном."""
+        self.token += 1
+        self.game_id: str = uuid.uuid4().hex
+        self.seed: int = new_seed()
+        self.rng: random.Random = random.Random(self.seed)
+        self.started: float = time.monotonic()
+        self.board: List[str] = [""] * 9
+        self.moves: List[int] = []
+        self.threats: ThreatIndex = ThreatIndex()
+        self.current_player: str = "X"
+        self.game_over: bool = False
+        self.thinking: bool = False
+        theme = self.host.theme
+        for btn in self.buttons:
+            btn.config(text="", bg=theme["btn_bg"], fg=theme["btn_fg"])
+        self.title.config(text=f"Доска {self.board_no} · {self.game_id[:6]}")
+        self.status.config(text="Ход X")
+
+    def on_click(self, cell: int) -> None:
+        """Обработчик нажатия на клетку доски."""
+        if self.game_over or self.thinking or self.board[cell]:
+            return
+        self.play(cell)
+        if not self.game_over and self.host.vs_ai:
+            # Ход ИИ считает общий пул, доска ждет ответа
+            self.thinking = True
+            self.status.config(text="ИИ думает…")
+            self.host.pool.submit(self.board_no, self.token, self.host.difficulty,
+                                  engine.board_from_cells(self.board), "O", self.rng, self.threats)
+
+    def on_ai_move(self, cell: Optional[int]) -> None:
+        """Применяет ход, посчитанный пулом ИИ."""
+        self.thinking = False
+        if cell is not None and not self.game_over and not self.board[cell]:
+            self.play(cell)
+
+    def play(self, cell: int) -> None:
+        """Делает ход текущего игрока и проверяет конец партии."""
+        symbol = self.current_player
+        self.board[cell] = symbol
+        self.moves.append(cell)
+        self.threats.play(cell, symbol)
+        self.buttons[cell].config(text=symbol)
+        self.current_player = engine.other(symbol)
+        source = "ai" if self.host.vs_ai and symbol == "O" else "human"
+        events.publish(events.MovePlayed(self.game_id, symbol, cell, len(self.moves), source))
+
+        board = engine.board_from_cells(self.board)
+        line = engine.winning_line(board)
+        if line is not None:
+            theme = self.host.theme
+            for win_cell in line:
+                self.buttons[win_cell].config(bg=theme.get("highlight", "#90ee90"),
+                                              fg=theme.get("text_highlight", "green"))
+            self.finish(symbol)
+        elif engine.EMPTY not in board:
+            self.finish(None)
+        else:
+            self.status.config(text=f"Ход {self.current_player}")
+
+    def finish(self, winner: Optional[str]) -> None:
+        """Завершает партию и передает результат окну."""
+        self.game_over = True
+        self.status.config(text=f"Победа: {winner}" if winner else "Ничья")
+        self.host.record_game(self, winner)
+
+
+class MultiBoardWindow:
+    """Окно с сеткой досок, общим пулом ИИ и общими хранилищами приложения."""
+
+    # Допустимое количество досок
+    MIN_BOARDS: int = 2
+    MAX_BOARDS: int = 16
+
+    def __init__(self, app: Any, count: int, theme: Dict[str, str]) -> None:
+        """Создает окно и доски.
+
+        Args:
+            app: Главное приложение (профили, рейтинги, настройки и писатель)
+            count: Количество досок
+            theme: Текущая цветовая тема
+        """
+        self.app: Any = app
+        self.theme: Dict[str, str] = theme
+        # Режим и сложность берутся из главного окна на момент открытия
+        self.vs_ai: bool = app.vs_ai
+        self.difficulty: str = app.ai_difficulty
+        self.pool = AIPool(app.settings.ai_workers)
+        self.poll_job: Optional[str] = None
+
+        count = max(self.MIN_BOARDS, min(count, self.MAX_BOARDS))
+        self.window = tk.Toplevel(app.window)
+        mode = f"ИИ: {ai_registry.title_of(self.difficulty)}" if self.vs_ai else "2 игрока"
+        self.window.title(f"Несколько досок ({count}) | {mode}")
+        self.window.config(bg=theme["bg"])
+        self.window.protocol("WM_DELETE_WINDOW", self.close)
+
+        # Общая панель управления
+        top = tk.Frame(self.window, bg=theme["bg"])
+        top.pack(fill="x", padx=5, pady=5)
+        tk.Button(top, text="🔄 Новые партии", font=("Arial", 10), command=self.new_games).pack(side="left")
+        self.summary = tk.Label(top, text="", font=("Arial", 10), bg=theme["bg"], fg=theme["btn_fg"])
+        self.summary.pack(side="left", padx=10)
+        # Итоги окна: победы X, победы O, ничьи
+        self.totals: List[int] = [0, 0, 0]
+
+        # Сетка досок, близкая к квадратной
+        grid = tk.Frame(self.window, bg=theme["bg"])
+        grid.pack(padx=5, pady=5)
+        columns = math.ceil(math.sqrt(count))
+        self.boards: List[BoardView] = []
+        for index in range(count):
+            board = BoardView(self, grid, index + 1)
+            board.frame.grid(row=index // columns, column=index % columns, padx=3, pady=3)
+            self.boards.append(board)
+        self.update_summary()
+
+        if self.vs_ai:
+            self.poll_job = self.window.after(AI_POLL_MS, self.poll_ai)
+
+    def poll_ai(self) -> None:
+        """Раздает доскам готовые ходы ИИ."""
+        while True:
+            try:
+                board_no, token, cell = self.pool.results.get_nowait()
+            except queue.Empty:
+                break
+            board = self.boards[board_no - 1]
+            # Ответ для уже завершенной или перезапущенной партии не нужен
+            if token == board.token:
+                board.on_ai_move(cell)
+        self.poll_job = self.window.after(AI_POLL_MS, self.poll_ai)
+
+    def new_games(self) -> None:
+        """Начинает новые партии на всех досках."""
+        for board in self.boards:
+            board.new_game()
+
+    def record_game(self, board: BoardView, winner: Optional[str]) -> None:
+        """Учитывает завершенную партию доски в профилях, рейтингах и истории.
+
+        Args:
+            board: Доска
+            winner: Символ победителя или None для ничьей
+        """
+        app = self.app
+        x_id = app.player_ids["X"]
+        if self.vs_ai:
+            o_id, difficulty = app.profiles.get_or_create_ai(self.difficulty).id, self.difficulty
+        else:
+            o_id, difficulty = app.player_ids["O"], PVP_KEY
+        app.profiles.record_game(x_id, o_id, winner, difficulty, len(board.moves))
+        app.ratings.record_game(x_id, o_id, winner)
+        app.record_achievements(x_id, o_id, winner, difficulty, len(board.moves))
+        app.schedule_flush()
+
+        names = {"X": app.profiles.get(x_id).name, "O": app.profiles.get(o_id).name}
+        config = app.settings
+        app.writer.add_history({
+            "date": int(time.time()),
+            "result": f"Победа: {names[winner]}" if winner else "Ничья",
+            "id": board.game_id,  # Идентификатор партии доски
+            "players": {"X": x_id, "O": o_id},
+            "winner": winner or "",
+            "difficulty": difficulty,
+            "length": len(board.moves),
+            "moves": "".join(str(cell) for cell in board.moves),
+            "seed": board.seed,
+            "board": board.board_no,  # Номер доски в режиме нескольких досок
+        }, config.history_file, config.max_days, config.max_games, config.archive_dir)
+        events.publish(events.GameEnded(
+            board.game_id, winner or "", difficulty, len(board.moves), time.monotonic() - board.started,
+        ))
+
+        self.totals[0 if winner == "X" else 1 if winner == "O" else 2] += 1
+        self.update_summary()
+
+    def update_summary(self) -> None:
+        """Обновляет итоги окна."""
+        x_wins, o_wins, draws = self.totals
+        self.summary.config(text=f"X: {x_wins} — O: {o_wins} — ничьих: {draws}")
+
+    def close(self) -> None:
+        """Закрывает окно и останавливает пул ИИ."""
+        if self.poll_job is not None:
+            self.window.after_cancel(self.poll_job)
+            self.poll_job = None
+        self.pool.shutdown()
+        self.window.destroy()
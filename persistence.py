@@ -0,0 +1,203 @@
+# -*- coding: utf-8 -*-
+# Единый писатель файлов данных игры "Крестики-нолики"
+# Все записи (история, профили, рейтинги, достижения, счет, снимок сессии) выполняет
+# один фоновый поток, поэтому несколько досок в одном процессе не пишут одни и те же
+# файлы наперегонки, а интерфейс не ждет диска и чужих блокировок файлов.
+# Накопившиеся задания объединяются в одну запись.
+# Между процессами записи защищены блокировкой файлов и слиянием (см. storage).
+
+# Импортируем необходимые модули
+from typing import Any, Callable, Dict, List, Optional, Tuple  # Для указания типов данных
+import queue  # Очередь заданий на запись
+import threading  # Фоновый поток записи
+
+import events  # Шина событий (ошибки чтения и записи данных)
+from archive import store_history  # Добавление записей в историю с архивом вытесненных
+from profiles import ProfileStore  # Снимки профилей
+from ratings import RatingStore  # Снимки рейтингов
+from achievements import AchievementStore  # Снимки достижений
+from session import save_session  # Снимок сессии
+from storage import locked_update  # Запись под межпроцессной блокировкой
+
+# Задание: (вид, ключ, данные); вид — "history", "snapshot", "flush" или "stop"
+Job = Tuple[str, Any, Any]
+# Запись снимка: (функция записи, снимок, база слияния); функция возвращает True при успехе
+SnapshotJob = Tuple[Callable[..., bool], Dict[str, Any], Optional[Dict[str, Any]]]
+
+
+def write_score(path: str, data: Dict[str, Any], base: Optional[Dict[str, Any]] = None) -> bool:
+    """Записывает счет слотов X/O под блокировкой файла.
+
+    Если на диске счет тех же игроков (другое окно уже записало свои победы),
+    к нему прибавляются только свои победы с момента base.
+
+    Args:
+        path: Файл счета
+        data: Счет {"wins", "names", "last_played"}
+        base: Победы {"X", "O"} на момент предыдущей записи (None — записать как есть)
+
+    Returns:
+        True, если счет записан
+    """
+    def _merge(disk: Any) -> Dict[str, Any]:
+        """Оптимистичное слияние со счетом на диске (под блокировкой файла)."""
+        if base is None or not isinstance(disk, dict) or disk.get("names") != data["names"]:
+            return data  # Другие игроки — записываем свой счет
+        wins = disk.get("wins", {})
+        merged = dict(data)
+        merged["wins"] = {key: int(wins.get(key, 0)) + data["wins"][key] - base[key] for key in ("X", "O")}
+        return merged
+
+    try:
+        locked_update(path, _merge, {})
+    except OSError as exc:
+        events.report_error("сохранения счета", exc)
+        return False
+    return True
+
+
+def _write_session(path: str, data: Dict[str, Any], base: Optional[Dict[str, Any]] = None) -> bool:
+    """Записывает снимок сессии (слияние не нужно — снимок заменяет файл)."""
+    return save_session(data, path)
+
+
+class PersistenceWriter:
+    """Фоновый писатель: очередь заданий и один поток, который владеет файлами."""
+
+    def __init__(self) -> None:
+        """Создает очередь и запускает поток записи."""
+        self.jobs: "queue.Queue[Job]" = queue.Queue()
+        # Количество выполненных записей на диск (для отладки и отчетов)
+        self.writes: int = 0
+        # Снимки, запись которых не удалась: повторяются со следующей пачкой от той же базы,
+        # поэтому изменения с прошлой успешной записи не теряются (доступ только из потока записи)
+        self.retry: Dict[str, SnapshotJob] = {}
+        self.thread = threading.Thread(target=self._run, name="persistence-writer", daemon=True)
+        self.thread.start()
+
+    def add_history(self, record: Dict[str, Any], path: str, max_days: int, max_games: int,
+                    archive_dir: str = "") -> None:
+        """Ставит запись партии в очередь на добавление в историю.
+
+        Args:
+            record: Запись партии
+            path: Файл истории
+            max_days: Срок хранения записей (дней)
+            max_games: Максимум записей в истории
+            archive_dir: Каталог архива вытесненных записей ("" — не архивировать)
+        """
+        self.jobs.put(("history", (path, max_days, max_games, archive_dir), record))
+
+    def save_profiles(self, profiles: ProfileStore, path: str) -> None:
+        """Ставит снимок профилей в очередь (снимок делается в вызывающем потоке)."""
+        data, base = profiles.take_snapshot()
+        self.jobs.put(("snapshot", path, (ProfileStore.write_snapshot, data, base)))
+
+    def save_ratings(self, ratings: RatingStore, path: str) -> None:
+        """Ставит снимок рейтингов в очередь (снимок делается в вызывающем потоке)."""
+        data, base = ratings.take_snapshot()
+        self.jobs.put(("snapshot", path, (RatingStore.write_snapshot, data, base)))
+
+    def save_achievements(self, achievements: AchievementStore, path: str) -> None:
+        """Ставит снимок достижений в очередь (снимок делается в вызывающем потоке)."""
+        data, base = achievements.take_snapshot()
+        self.jobs.put(("snapshot", path, (AchievementStore.write_snapshot, data, base)))
+
+    def save_score(self, data: Dict[str, Any], base: Dict[str, int], path: str) -> None:
+        """Ставит счет слотов в очередь (base — победы на момент прошлой записи)."""
+        self.jobs.put(("snapshot", path, (write_score, data, base)))
+
+    def save_session(self, state: Dict[str, Any], path: str) -> None:
+        """Ставит снимок сессии в очередь (из нескольких снимков пишется последний)."""
+        self.jobs.put(("snapshot", path, (_write_session, state, None)))
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Ждет, пока все поставленные в очередь задания будут записаны.
+
+        Returns:
+            True, если запись завершилась за отведенное время
+        """
+        if not self.thread.is_alive():
+            return True  # Писатель остановлен — ждать нечего
+        done = threading.Event()
+        self.jobs.put(("flush", None, done))
+        return done.wait(timeout)
+
+    def close(self, timeout: Optional[float] = 5.0) -> None:
+        """Записывает оставшиеся задания и останавливает поток."""
+        if self.thread.is_alive():
+            self.jobs.put(("stop", None, None))
+            self.thread.join(timeout)
+
+    def _run(self) -> None:
+        """Цикл потока записи: забирает все накопившиеся задания и пишет их пачкой."""
+        while True:
+            batch: List[Job] = [self.jobs.get()]
+            # Забираем все, что уже лежит в очереди, чтобы записать одной пачкой
+            while True:
+                try:
+                    batch.append(self.jobs.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                running = self._write_batch(batch)
+            except Exception as exc:
+                # Неожиданная ошибка не должна останавливать поток: иначе ожидающие flush зависнут
+                events.report_error("записи данных", exc)
+                running = not any(kind == "stop" for kind, _key, _payload in batch)
+            if not running:
+                return
+
+    def _write_batch(self, batch: List[Job]) -> bool:
+        """Записывает пачку заданий.
+
+        Записи истории группируются по файлу, из снимков одного файла
+        записывается последний — со слиянием относительно базы первого.
+        Неудавшиеся записи снимков повторяются со следующей пачкой.
+
+        Returns:
+            False, если среди заданий была остановка потока
+        """
+        history: Dict[Tuple[str, int, int, str], List[Dict[str, Any]]] = {}
+        # Сначала неудавшиеся снимки: их база раньше баз новых снимков того же файла
+        snapshots: Dict[str, SnapshotJob] = self.retry
+        self.retry = {}
+        waiters: List[threading.Event] = []
+        running = True
+        for kind, key, payload in batch:
+            if kind == "history":
+                history.setdefault(key, []).append(payload)
+            elif kind == "snapshot":
+                write, data, base = payload
+                if key in snapshots:
+                    # Изменения обоих снимков считаются от базы более раннего
+                    base = snapshots[key][2]
+                snapshots[key] = (write, data, base)
+            elif kind == "flush":
+                waiters.append(payload)
+            elif kind == "stop":
+                running = False
+
+        try:
+            # Ошибка одной записи не должна останавливать поток записи
+            for (path, max_days, max_games, archive_dir), records in history.items():
+                try:
+                    store_history(records, path, archive_dir, max_days, max_games)
+                    self.writes += 1
+                except Exception as exc:
+                    events.report_error("записи истории", exc)
+            for path, (write, data, base) in snapshots.items():
+                try:
+                    written = write(path, data, base)
+                except Exception as exc:
+                    events.report_error(f"записи {path}", exc)
+                    written = False
+                if written:
+                    self.writes += 1
+                else:
+                    self.retry[path] = (write, data, base)
+        finally:
+            # Сообщаем ожидающим, что все задания до них обработаны (даже при ошибке)
+            for waiter in waiters:
+                waiter.set()
+        return running
@@ -0,0 +1,386 @@
+# -*- coding: utf-8 -*-
+# Профили игроков для игры "Крестики-нолики"
+# Хранит постоянные идентификаторы игроков и инкрементальные агрегаты статистики:
+# победы/поражения/ничьи по соперникам и уровням сложности, серии и среднюю длину партии.
+
+# Импортируем необходимые модули
+from typing import Any, Dict, List, Optional, Set, Tuple  # Для указания типов данных
+import bisect  # Для поддержки отсортированного рейтинга без полной пересортировки
+import json  # Для работы с JSON-файлами (чтение/запись)
+import os  # Для работы с файловой системой (проверка файлов)
+import uuid  # Для генерации постоянных идентификаторов игроков
+
+import events  # Шина событий (ошибки чтения и записи данных)
+from storage import locked_update  # Запись под межпроцессной блокировкой
+
+# Файл для сохранения профилей игроков
+PROFILES_FILE: str = "tic_tac_toe_profiles.json"
+
+# Ключ "сложности" для партий двух людей (без ИИ)
+PVP_KEY: str = "pvp"
+
+# Префикс постоянных идентификаторов профилей ИИ ("ai:" + уровень сложности)
+AI_PREFIX: str = "ai:"
+
+# Индексы в тройках [победы, поражения, ничьи]
+WIN, LOSS, DRAW = 0, 1, 2
+
+
+class PlayerProfile:
+    """Профиль игрока с инкрементально обновляемыми агрегатами."""
+
+    __slots__ = (
+        "id", "name", "kind", "wins", "losses", "draws", "total_moves",
+        "streak", "best_streak", "vs_opponent", "by_difficulty",
+    )
+
+    def __init__(self, profile_id: str, name: str, kind: str = "human") -> None:
+        """Создает пустой профиль.
+
+        Args:
+            profile_id: Постоянный идентификатор игрока
+            name: Отображаемое имя игрока
+            kind: Тип игрока ("human" или "ai")
+        """
+        self.id: str = profile_id
+        self.name: str = name
+        self.kind: str = kind
+        # Общие счетчики результатов
+        self.wins: int = 0
+        self.losses: int = 0
+        self.draws: int = 0
+        # Суммарное количество ходов во всех партиях (для средней длины)
+        self.total_moves: int = 0
+        # Текущая серия: >0 — подряд победы, <0 — подряд поражения
+        self.streak: int = 0
+        # Лучшая серия побед
+        self.best_streak: int = 0
+        # Результаты против каждого соперника: id -> [победы, поражения, ничьи]
+        self.vs_opponent: Dict[str, List[int]] = {}
+        # Результаты по уровням сложности: уровень -> [победы, поражения, ничьи]
+        self.by_difficulty: Dict[str, List[int]] = {}
+
+    @property
+    def games(self) -> int:
+        """Общее количество сыгранных партий."""
+        return self.wins + self.losses + self.draws
+
+    @property
+    def avg_game_length(self) -> float:
+        """Средняя длина партии в ходах (0, если партий не было)."""
+        return self.total_moves / self.games if self.games else 0.0
+
+    def rank_key(self) -> Tuple[int, int, str]:
+        """Ключ сортировки для таблицы лидеров (больше побед — выше)."""
+        return -self.wins, self.losses, self.id
+
+    def apply_result(self, outcome: int, opponent_id: str, difficulty: str, length: int) -> None:
+        """Учитывает результат одной партии за O(1).
+
+        Args:
+            outcome: WIN, LOSS или DRAW
+            opponent_id: Идентификатор соперника
+            difficulty: Уровень сложности ИИ или PVP_KEY
+            length: Количество ходов в партии
+        """
+        # Обновляем общие счетчики
+        if outcome == WIN:
+            self.wins += 1
+            # Продолжаем серию побед или начинаем новую
+            self.streak = self.streak + 1 if self.streak > 0 else 1
+            self.best_streak = max(self.best_streak, self.streak)
+        elif outcome == LOSS:
+            self.losses += 1
+            # Продолжаем серию поражений или начинаем новую
+            self.streak = self.streak - 1 if self.streak < 0 else -1
+        else:
+            self.draws += 1
+            # Ничья прерывает любую серию
+            self.streak = 0
+
+        # Обновляем длину партий
+        self.total_moves += length
+        # Обновляем агрегаты по сопернику и по сложности
+        self.vs_opponent.setdefault(opponent_id, [0, 0, 0])[outcome] += 1
+        self.by_difficulty.setdefault(difficulty, [0, 0, 0])[outcome] += 1
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Преобразует профиль в словарь для сохранения в JSON."""
+        return {
+            "id": self.id,
+            "name": self.name,
+            "kind": self.kind,
+            "wins": self.wins,
+            "losses": self.losses,
+            "draws": self.draws,
+            "total_moves": self.total_moves,
+            "streak": self.streak,
+            "best_streak": self.best_streak,
+            # Копии счетчиков: снимок может записываться в другом потоке
+            "vs_opponent": {key: list(value) for key, value in self.vs_opponent.items()},
+            "by_difficulty": {key: list(value) for key, value in self.by_difficulty.items()},
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "PlayerProfile":
+        """Восстанавливает профиль из словаря (с проверкой типов)."""
+        profile = cls(str(data["id"]), str(data.get("name", "")), str(data.get("kind", "human")))
+        profile.wins = int(data.get("wins", 0))
+        profile.losses = int(data.get("losses", 0))
+        profile.draws = int(data.get("draws", 0))
+        profile.total_moves = int(data.get("total_moves", 0))
+        profile.streak = int(data.get("streak", 0))
+        profile.best_streak = int(data.get("best_streak", 0))
+        profile.vs_opponent = {
+            str(k): [int(x) for x in v] for k, v in data.get("vs_opponent", {}).items()
+        }
+        profile.by_difficulty = {
+            str(k): [int(x) for x in v] for k, v in data.get("by_difficulty", {}).items()
+        }
+        return profile
+
+
+class ProfileStore:
+    """Хранилище профилей с индексом по имени и отсортированной таблицей лидеров."""
+
+    def __init__(self) -> None:
+        """Создает пустое хранилище."""
+        # Профили по идентификатору
+        self.profiles: Dict[str, PlayerProfile] = {}
+        # Индекс: имя в нижнем регистре -> идентификатор
+        self.name_index: Dict[str, str] = {}
+        # Отсортированный список ключей рейтинга (поддерживается инкрементально)
+        self.ranking: List[Tuple[int, int, str]] = []
+        # Снимок на момент последней загрузки или записи — база для слияния
+        # с изменениями других процессов (None — файл перезаписывается целиком)
+        self.saved: Optional[Dict[str, Any]] = None
+        # Ключи уже учтенных пакетов результатов (например, матчей турнира):
+        # записываются вместе с профилями, поэтому повторный учет можно отсечь
+        self.applied: Set[str] = set()
+
+    @staticmethod
+    def ai_id(difficulty: str) -> str:
+        """Возвращает постоянный идентификатор ИИ заданного уровня."""
+        return AI_PREFIX + difficulty
+
+    def _add(self, profile: PlayerProfile) -> None:
+        """Добавляет профиль во все индексы."""
+        self.profiles[profile.id] = profile
+        if profile.kind == "human":
+            self.name_index[profile.name.casefold()] = profile.id
+        bisect.insort(self.ranking, profile.rank_key())
+
+    def get(self, profile_id: str) -> Optional[PlayerProfile]:
+        """Возвращает профиль по идентификатору или None."""
+        return self.profiles.get(profile_id)
+
+    def find_by_name(self, name: str) -> Optional[PlayerProfile]:
+        """Ищет профиль человека по имени (без учета регистра)."""
+        profile_id = self.name_index.get(name.casefold())
+        return self.profiles.get(profile_id) if profile_id else None
+
+    def get_or_create(self, name: str) -> PlayerProfile:
+        """Возвращает профиль человека по имени, создавая его при необходимости."""
+        profile = self.find_by_name(name)
+        if profile is None:
+            # Новый игрок получает постоянный идентификатор
+            profile = PlayerProfile(uuid.uuid4().hex, name)
+            self._add(profile)
+        return profile
+
+    def get_or_create_ai(self, difficulty: str) -> PlayerProfile:
+        """Возвращает профиль ИИ заданного уровня сложности."""
+        profile_id = self.ai_id(difficulty)
+        profile = self.profiles.get(profile_id)
+        if profile is None:
+            profile = PlayerProfile(profile_id, f"ИИ ({difficulty.capitalize()})", "ai")
+            self._add(profile)
+        return profile
+
+    def import_legacy_wins(self, profile_id: str, wins: int) -> None:
+        """Переносит победы из старого формата статистики (только счетчик побед).
+
+        Args:
+            profile_id: Идентификатор профиля
+            wins: Количество побед из файла счета
+        """
+        profile = self.profiles.get(profile_id)
+        if profile is None or wins <= 0:
+            return
+        self._unrank(profile)
+        profile.wins += wins
+        bisect.insort(self.ranking, profile.rank_key())
+
+    def record_game(self, x_id: str, o_id: str, winner: Optional[str],
+                    difficulty: str, length: int) -> None:
+        """Учитывает результат партии в профилях обоих игроков за O(1).
+
+        Args:
+            x_id: Идентификатор игрока, игравшего за X
+            o_id: Идентификатор игрока, игравшего за O
+            winner: 'X', 'O' или None для ничьей
+            difficulty: Уровень сложности ИИ или PVP_KEY
+            length: Количество ходов в партии
+        """
+        if winner == "X":
+            outcomes = {x_id: WIN, o_id: LOSS}
+        elif winner == "O":
+            outcomes = {x_id: LOSS, o_id: WIN}
+        else:
+            outcomes = {x_id: DRAW, o_id: DRAW}
+
+        for player_id, opponent_id in ((x_id, o_id), (o_id, x_id)):
+            profile = self.profiles.get(player_id)
+            if profile is None:
+                continue  # Неизвестный игрок (не должно случаться)
+            # Убираем старый ключ рейтинга, обновляем профиль и вставляем новый ключ
+            self._unrank(profile)
+            profile.apply_result(outcomes[player_id], opponent_id, difficulty, length)
+            bisect.insort(self.ranking, profile.rank_key())
+
+    def _unrank(self, profile: PlayerProfile) -> None:
+        """Удаляет ключ профиля из отсортированного рейтинга."""
+        key = profile.rank_key()
+        pos = bisect.bisect_left(self.ranking, key)
+        if pos < len(self.ranking) and self.ranking[pos] == key:
+            del self.ranking[pos]
+
+    def leaderboard(self, limit: Optional[int] = None) -> List[PlayerProfile]:
+        """Возвращает профили в порядке рейтинга без пересортировки.
+
+        Args:
+            limit: Максимальное количество строк (None — все)
+        """
+        keys = self.ranking if limit is None else self.ranking[:limit]
+        return [self.profiles[key[2]] for key in keys]
+
+    @classmethod
+    def load(cls, path: str = PROFILES_FILE) -> "ProfileStore":
+        """Загружает профили из файла (пустое хранилище, если файла нет)."""
+        store = cls()
+        store.saved = {"profiles": []}
+        if not os.path.exists(path):
+            return store
+
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            for item in data.get("profiles", []):
+                store._add(PlayerProfile.from_dict(item))
+            store.applied = {str(key) for key in data.get("applied", [])}
+            store.saved = store.snapshot()
+        except (json.JSONDecodeError, OSError, ValueError, KeyError, TypeError) as exc:
+            events.report_error("загрузки профилей", exc)
+        return store
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Снимок всех профилей для записи (можно записать в другом потоке)."""
+        data: Dict[str, Any] = {"profiles": [p.to_dict() for p in self.profiles.values()]}
+        if self.applied:
+            data["applied"] = sorted(self.applied)
+        return data
+
+    def take_snapshot(self) -> Tuple[Dict[str, Any], Optional[Dict[str, Any]]]:
+        """Снимок для записи в другом потоке и база слияния; снимок становится новой базой.
+
+        Если запись не удастся, писатель повторит ее от прежней базы
+        (см. PersistenceWriter), поэтому изменения не теряются.
+
+        Returns:
+            Кортеж (снимок, снимок предыдущей записи или None)
+        """
+        data, base = self.snapshot(), self.saved
+        self.saved = data
+        return data, base
+
+    def save(self, path: str = PROFILES_FILE) -> None:
+        """Сохраняет все профили в файл, не теряя изменений других процессов."""
+        data = self.snapshot()
+        # База сдвигается только после успешной записи, иначе изменения потерялись бы
+        if self.write_snapshot(path, data, self.saved):
+            self.saved = data
+
+    @staticmethod
+    def write_snapshot(path: str, data: Dict[str, Any], base: Optional[Dict[str, Any]] = None) -> bool:
+        """Записывает снимок профилей под блокировкой файла.
+
+        Args:
+            path: Файл профилей
+            data: Снимок профилей
+            base: Снимок предыдущей записи; если задан, к данным на диске
+                прибавляются только изменения с этого снимка
+
+        Returns:
+            True, если снимок записан
+        """
+        def _merge(disk: Any) -> Dict[str, Any]:
+            return data if base is None else merge_snapshots(disk, data, base)
+
+        try:
+            locked_update(path, _merge, {"profiles": []})
+        except OSError as exc:
+            events.report_error("сохранения профилей", exc)
+            return False
+        return True
+
+
+# Счетчики профиля, которые при слиянии складываются
+_COUNTERS: Tuple[str, ...] = ("wins", "losses", "draws", "total_moves")
+
+
+def _games(item: Dict[str, Any]) -> int:
+    """Количество партий в словаре профиля."""
+    return sum(int(item.get(key, 0)) for key in ("wins", "losses", "draws"))
+
+
+def _merge_profile(disk: Dict[str, Any], mine: Dict[str, Any], base: Dict[str, Any]) -> Dict[str, Any]:
+    """Объединяет профиль с диска со своими изменениями с момента base."""
+    merged = dict(disk)
+    merged["name"], merged["kind"] = mine["name"], mine.get("kind", "human")
+    for key in _COUNTERS:
+        merged[key] = int(disk.get(key, 0)) + int(mine.get(key, 0)) - int(base.get(key, 0))
+    # Таблицы [победы, поражения, ничьи] по соперникам и уровням складываются поэлементно
+    for key in ("vs_opponent", "by_difficulty"):
+        table = {name: list(counts) for name, counts in disk.get(key, {}).items()}
+        previous = base.get(key, {})
+        for name, counts in mine.get(key, {}).items():
+            old = previous.get(name, [0, 0, 0])
+            current = table.get(name, [0, 0, 0])
+            table[name] = [c + m - o for c, m, o in zip(current, counts, old)]
+        merged[key] = table
+    # Серия — не счетчик: берем свою, если с прошлой записи были свои партии
+    if _games(mine) != _games(base):
+        merged["streak"] = mine.get("streak", 0)
+    merged["best_streak"] = max(int(disk.get("best_streak", 0)), int(mine.get("best_streak", 0)))
+    return merged
+
+
+def merge_snapshots(disk: Any, mine: Dict[str, Any], base: Dict[str, Any]) -> Dict[str, Any]:
+    """Оптимистичное слияние снимков профилей.
+
+    К профилям на диске (возможно, уже измененным другими процессами)
+    прибавляются только свои изменения с момента base, поэтому партии,
+    записанные одновременно несколькими процессами, не теряются.
+
+    Args:
+        disk: Данные файла, прочитанные под блокировкой
+        mine: Свой текущий снимок
+        base: Свой снимок на момент предыдущей записи
+
+    Returns:
+        Объединенные данные для записи
+    """
+    items = disk.get("profiles", []) if isinstance(disk, dict) else []
+    current = {item["id"]: item for item in items if isinstance(item, dict) and "id" in item}
+    previous = {item["id"]: item for item in base.get("profiles", [])}
+    for item in mine.get("profiles", []):
+        on_disk = current.get(item["id"])
+        if on_disk is None:
+            current[item["id"]] = item
+        else:
+            current[item["id"]] = _merge_profile(on_disk, item, previous.get(item["id"], {}))
+    merged: Dict[str, Any] = {"profiles": list(current.values())}
+    applied = set(disk.get("applied", []) if isinstance(disk, dict) else []) | set(mine.get("applied", []))
+    if applied:
+        merged["applied"] = sorted(applied)
+    return merged
@@ -0,0 +1,340 @@
+# -*- coding: utf-8 -*-
+# Рейтинги игроков и уровней ИИ для игры "Крестики-нолики"
+# Поддерживаются системы Эло и Glicko-2: инкрементальное обновление после каждой партии
+# и пакетный пересчет по всей истории в один потоковый проход.
+#
+# Пересчет из командной строки:
+#     python ratings.py --system glicko2 --tau 0.5
+#     python ratings.py --system elo --k 24
+
+# Импортируем необходимые модули
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple  # Для указания типов данных
+import argparse  # Для разбора аргументов командной строки
+import json  # Для работы с JSON-файлами (чтение/запись)
+import math  # Для формул Glicko-2
+import os  # Для работы с файловой системой (проверка файлов)
+import time  # Для замера времени пересчета
+
+import events  # Шина событий (ошибки чтения и записи данных)
+from archive import iter_all_history  # Потоковое чтение архива и истории
+from storage import locked_update  # Запись под межпроцессной блокировкой
+
+# Файл для сохранения рейтингов
+RATINGS_FILE: str = "tic_tac_toe_ratings.json"
+
+# Параметры по умолчанию
+DEFAULT_SYSTEM: str = "elo"  # Система рейтинга ("elo" или "glicko2")
+INITIAL_RATING: float = 1500.0  # Начальный рейтинг
+ELO_K: float = 32.0  # Коэффициент K для Эло
+INITIAL_RD: float = 350.0  # Начальное отклонение рейтинга (Glicko-2)
+INITIAL_VOLATILITY: float = 0.06  # Начальная волатильность (Glicko-2)
+GLICKO_TAU: float = 0.5  # Ограничение изменения волатильности (Glicko-2)
+
+# Масштаб перевода рейтинга в шкалу Glicko-2
+_GLICKO_SCALE: float = 173.7178
+# Точность итераций при расчете волатильности
+_GLICKO_EPS: float = 1e-6
+
+
+def elo_expected(rating: float, opponent: float) -> float:
+    """Ожидаемый результат игрока против соперника по формуле Эло."""
+    return 1.0 / (1.0 + 10.0 ** ((opponent - rating) / 400.0))
+
+
+def glicko2_update(rating: float, rd: float, vol: float,
+                   opp_rating: float, opp_rd: float, score: float,
+                   tau: float = GLICKO_TAU) -> List[float]:
+    """Обновляет рейтинг Glicko-2 по результату одной партии.
+
+    Args:
+        rating: Рейтинг игрока
+        rd: Отклонение рейтинга игрока
+        vol: Волатильность игрока
+        opp_rating: Рейтинг соперника
+        opp_rd: Отклонение рейтинга соперника
+        score: Результат (1 — победа, 0.5 — ничья, 0 — поражение)
+        tau: Параметр системы
+
+    Returns:
+        Список [новый рейтинг, новое отклонение, новая волатильность]
+    """
+    # Переводим в шкалу Glicko-2
+    mu = (rating - INITIAL_RATING) / _GLICKO_SCALE
+    phi = rd / _GLICKO_SCALE
+    opp_mu = (opp_rating - INITIAL_RATING) / _GLICKO_SCALE
+    opp_phi = opp_rd / _GLICKO_SCALE
+
+    # Влияние неопределенности соперника и ожидаемый результат
+    g = 1.0 / math.sqrt(1.0 + 3.0 * opp_phi * opp_phi / (math.pi * math.pi))
+    expected = 1.0 / (1.0 + math.exp(-g * (mu - opp_mu)))
+    variance = 1.0 / (g * g * expected * (1.0 - expected))
+    delta = variance * g * (score - expected)
+
+    # Новая волатильность (итерационный алгоритм Illinois)
+    a = math.log(vol * vol)
+
+    def f(x: float) -> float:
+        """Функция, нуль которой определяет новую волатильность."""
+        ex = math.exp(x)
+        num = ex * (delta * delta - phi * phi - variance - ex)
+        den = 2.0 * (phi * phi + variance + ex) ** 2
+        return num / den - (x - a) / (tau * tau)
+
+    big_a = a
+    if delta * delta > phi * phi + variance:
+        big_b = math.log(delta * delta - phi * phi - variance)
+    else:
+        k = 1
+        while f(a - k * tau) < 0:
+            k += 1
+        big_b = a - k * tau
+    f_a, f_b = f(big_a), f(big_b)
+    while abs(big_b - big_a) > _GLICKO_EPS:
+        big_c = big_a + (big_a - big_b) * f_a / (f_b - f_a)
+        f_c = f(big_c)
+        if f_c * f_b <= 0:
+            big_a, f_a = big_b, f_b
+        else:
+            f_a /= 2.0
+        big_b, f_b = big_c, f_c
+    new_vol = math.exp(big_a / 2.0)
+
+    # Новые отклонение и рейтинг
+    phi_star = math.sqrt(phi * phi + new_vol * new_vol)
+    new_phi = 1.0 / math.sqrt(1.0 / (phi_star * phi_star) + 1.0 / variance)
+    new_mu = mu + new_phi * new_phi * g * (score - expected)
+
+    # Возвращаемся к обычной шкале
+    return [
+        new_mu * _GLICKO_SCALE + INITIAL_RATING,
+        new_phi * _GLICKO_SCALE,
+        new_vol,
+    ]
+
+
+class RatingStore:
+    """Рейтинги игроков с инкрементальным обновлением и пакетным пересчетом."""
+
+    def __init__(self, system: str = DEFAULT_SYSTEM, k: float = ELO_K,
+                 tau: float = GLICKO_TAU) -> None:
+        """Создает пустое хранилище рейтингов.
+
+        Args:
+            system: Система рейтинга ("elo" или "glicko2")
+            k: Коэффициент K для Эло
+            tau: Параметр tau для Glicko-2
+        """
+        if system not in ("elo", "glicko2"):
+            raise ValueError(f"Неизвестная система рейтинга: {system}")
+        self.system: str = system
+        self.k: float = k
+        self.tau: float = tau
+        # Рейтинги: id -> [рейтинг, отклонение, волатильность, партии]
+        self.ratings: Dict[str, List[float]] = {}
+        # Снимок на момент последней загрузки или записи — база для слияния
+        # с изменениями других процессов (None — файл перезаписывается целиком)
+        self.saved: Optional[Dict[str, Any]] = None
+        # Ключи уже учтенных пакетов результатов (см. ProfileStore.applied)
+        self.applied: Set[str] = set()
+
+    def entry(self, player_id: str) -> List[float]:
+        """Возвращает (создавая при необходимости) запись рейтинга игрока."""
+        entry = self.ratings.get(player_id)
+        if entry is None:
+            entry = [INITIAL_RATING, INITIAL_RD, INITIAL_VOLATILITY, 0]
+            self.ratings[player_id] = entry
+        return entry
+
+    def rating(self, player_id: str) -> float:
+        """Текущий рейтинг игрока (начальный, если партий не было)."""
+        entry = self.ratings.get(player_id)
+        return entry[0] if entry else INITIAL_RATING
+
+    def record_game(self, x_id: str, o_id: str, winner: Optional[str]) -> None:
+        """Обновляет рейтинги обоих игроков после партии.
+
+        Args:
+            x_id: Идентификатор игрока X
+            o_id: Идентификатор игрока O
+            winner: 'X', 'O' или None для ничьей
+        """
+        if x_id == o_id:
+            return  # Игра с самим собой не влияет на рейтинг
+        score_x = 1.0 if winner == "X" else 0.0 if winner == "O" else 0.5
+        x, o = self.entry(x_id), self.entry(o_id)
+
+        if self.system == "elo":
+            # Изменение Эло симметрично для обоих игроков
+            change = self.k * (score_x - elo_expected(x[0], o[0]))
+            x[0] += change
+            o[0] -= change
+        else:
+            # Обновляем оба рейтинга по значениям до партии
+            new_x = glicko2_update(x[0], x[1], x[2], o[0], o[1], score_x, self.tau)
+            new_o = glicko2_update(o[0], o[1], o[2], x[0], x[1], 1.0 - score_x, self.tau)
+            x[0:3], o[0:3] = new_x, new_o
+        x[3] += 1
+        o[3] += 1
+
+    def recompute(self, records: Iterable[Dict[str, Any]]) -> int:
+        """Пересчитывает все рейтинги с нуля, проходя записи истории один раз.
+
+        Args:
+            records: Поток записей истории в хронологическом порядке
+
+        Returns:
+            Количество учтенных партий
+        """
+        self.ratings = {}
+        # Пересчитанные рейтинги заменяют файл целиком, без слияния
+        self.saved = None
+        count = 0
+        for record in records:
+            players = record.get("players")
+            if not isinstance(players, dict):
+                continue  # Старые записи без идентификаторов игроков
+            self.record_game(str(players.get("X")), str(players.get("O")),
+                             record.get("winner") or None)
+            count += 1
+        return count
+
+    @classmethod
+    def load(cls, path: str = RATINGS_FILE) -> "RatingStore":
+        """Загружает рейтинги из файла (пустое хранилище, если файла нет)."""
+        if not os.path.exists(path):
+            store = cls()
+            store.saved = store.snapshot()
+            return store
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            store = cls(data.get("system", DEFAULT_SYSTEM),
+                        float(data.get("k", ELO_K)), float(data.get("tau", GLICKO_TAU)))
+            store.ratings = {
+                str(k): [float(x) for x in v] for k, v in data.get("ratings", {}).items()
+            }
+            store.applied = {str(key) for key in data.get("applied", [])}
+            store.saved = store.snapshot()
+            return store
+        except (json.JSONDecodeError, OSError, ValueError, TypeError) as exc:
+            events.report_error("загрузки рейтингов", exc)
+            return cls()
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Снимок рейтингов и параметров системы (копия, можно записать в другом потоке)."""
+        data: Dict[str, Any] = {"system": self.system, "k": self.k, "tau": self.tau,
+                                "ratings": {key: list(value) for key, value in self.ratings.items()}}
+        if self.applied:
+            data["applied"] = sorted(self.applied)
+        return data
+
+    def take_snapshot(self) -> Tuple[Dict[str, Any], Optional[Dict[str, Any]]]:
+        """Снимок для записи в другом потоке и база слияния; снимок становится новой базой.
+
+        Если запись не удастся, писатель повторит ее от прежней базы
+        (см. PersistenceWriter), поэтому изменения не теряются.
+
+        Returns:
+            Кортеж (снимок, снимок предыдущей записи или None)
+        """
+        data, base = self.snapshot(), self.saved
+        self.saved = data
+        return data, base
+
+    def save(self, path: str = RATINGS_FILE) -> None:
+        """Сохраняет рейтинги и параметры системы в файл, не теряя изменений других процессов."""
+        data = self.snapshot()
+        # База сдвигается только после успешной записи, иначе изменения потерялись бы
+        if self.write_snapshot(path, data, self.saved):
+            self.saved = data
+
+    @staticmethod
+    def write_snapshot(path: str, data: Dict[str, Any], base: Optional[Dict[str, Any]] = None) -> bool:
+        """Записывает снимок рейтингов под блокировкой файла.
+
+        Args:
+            path: Файл рейтингов
+            data: Снимок рейтингов
+            base: Снимок предыдущей записи (None — перезаписать файл целиком)
+
+        Returns:
+            True, если снимок записан
+        """
+        def _merge(disk: Any) -> Dict[str, Any]:
+            return data if base is None else merge_snapshots(disk, data, base)
+
+        try:
+            locked_update(path, _merge, {})
+        except OSError as exc:
+            events.report_error("сохранения рейтингов", exc)
+            return False
+        return True
+
+
+def merge_snapshots(disk: Any, mine: Dict[str, Any], base: Dict[str, Any]) -> Dict[str, Any]:
+    """Оптимистичное слияние снимков рейтингов.
+
+    К рейтингу на диске прибавляется свое изменение рейтинга и числа партий
+    с момента base; отклонение и волатильность берутся свои. Если система
+    рейтинга на диске другая (файл пересчитан), записывается свой снимок.
+
+    Args:
+        disk: Данные файла, прочитанные под блокировкой
+        mine: Свой текущий снимок
+        base: Свой снимок на момент предыдущей записи
+
+    Returns:
+        Объединенные данные для записи
+    """
+    if not isinstance(disk, dict) or disk.get("system") != mine.get("system"):
+        return mine
+    current = {str(k): [float(x) for x in v] for k, v in disk.get("ratings", {}).items()}
+    previous = base.get("ratings", {})
+    initial = [INITIAL_RATING, INITIAL_RD, INITIAL_VOLATILITY, 0]
+    for player_id, entry in mine.get("ratings", {}).items():
+        on_disk = current.get(player_id)
+        old = previous.get(player_id, initial)
+        if on_disk is None:
+            current[player_id] = list(entry)
+        elif entry[3] != old[3]:
+            # Свои партии с прошлой записи: переносим изменение поверх чужих
+            current[player_id] = [on_disk[0] + entry[0] - old[0], entry[1], entry[2],
+                                  on_disk[3] + entry[3] - old[3]]
+    merged = dict(mine)
+    merged["ratings"] = current
+    applied = set(disk.get("applied", [])) | set(mine.get("applied", []))
+    if applied:
+        merged["applied"] = sorted(applied)
+    return merged
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Пересчитывает рейтинги по всей истории с заданными параметрами."""
+    import settings  # Импорт здесь: settings сам импортирует этот модуль
+
+    parser = argparse.ArgumentParser(description="Пересчет рейтингов по истории игр")
+    parser.add_argument("--system", choices=["elo", "glicko2"], default=DEFAULT_SYSTEM)
+    parser.add_argument("--k", type=float, default=ELO_K, help="Коэффициент K (Эло)")
+    parser.add_argument("--tau", type=float, default=GLICKO_TAU, help="Параметр tau (Glicko-2)")
+    parser.add_argument("--history", default=None, help="Файл истории (по умолчанию из настроек)")
+    parser.add_argument("--output", default=None, help="Файл рейтингов (по умолчанию из настроек)")
+    args = parser.parse_args(argv)
+
+    config = settings.load([])
+
+    store = RatingStore(args.system, args.k, args.tau)
+    started = time.perf_counter()
+    # Вся история: вытесненные в архив партии тоже участвуют в пересчете
+    count = store.recompute(iter_all_history(args.history or config.history_file, config.archive_dir))
+    elapsed = time.perf_counter() - started
+    store.save(args.output or config.ratings_file)
+
+    print(f"Пересчитано партий: {count} за {elapsed:.3f} с ({args.system})")
+    # Печатаем лучших игроков
+    top = sorted(store.ratings.items(), key=lambda kv: -kv[1][0])[:10]
+    for player_id, (rating, rd, _vol, games) in top:
+        print(f"{player_id:<34} {rating:8.1f} ±{rd:6.1f} ({int(games)} партий)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,250 @@
+# -*- coding: utf-8 -*-
+# Просмотр записанных партий "Крестики-нолики"
+# Индекс позиций дает переход к любому ходу за O(1),
+# а позиции партии строятся только при ее открытии (лениво).
+
+# Импортируем необходимые модули
+from typing import Any, Dict, List, Optional, Tuple  # Для указания типов данных
+from collections import OrderedDict  # Для LRU-кэша индексов партий
+
+import tkinter as tk  # Основная библиотека для создания графического интерфейса
+
+from engine import WIN_LINES  # Выигрышные линии поля
+from history_store import format_timestamp  # Отображение дат записей
+from simulator import reproduce_game  # Проверка воспроизводимости ходов ИИ
+
+# Задержка между ходами при автоматическом воспроизведении (мс)
+PLAY_DELAY_MS: int = 600
+
+# Сколько индексов партий держать в кэше
+INDEX_CACHE_SIZE: int = 256
+
+
+class ReplayIndex:
+    """Индекс позиций одной партии: позиция после каждого хода."""
+
+    __slots__ = ("moves", "positions")
+
+    def __init__(self, moves: str) -> None:
+        """Строит все позиции партии за один проход.
+
+        Args:
+            moves: Ходы партии строкой индексов клеток (например, "40812")
+        """
+        self.moves: List[int] = [int(ch) for ch in moves if ch.isdigit()]
+        # positions[n] — поле из 9 символов после n ходов ("" — пустая клетка)
+        board = [""] * 9
+        self.positions: List[Tuple[str, ...]] = [tuple(board)]
+        for ply, cell in enumerate(self.moves):
+            board[cell] = "X" if ply % 2 == 0 else "O"
+            self.positions.append(tuple(board))
+
+    @property
+    def length(self) -> int:
+        """Количество ходов в партии."""
+        return len(self.moves)
+
+    def position(self, ply: int) -> Tuple[str, ...]:
+        """Позиция после заданного количества ходов (O(1))."""
+        return self.positions[max(0, min(ply, self.length))]
+
+    def win_line(self, ply: int) -> Optional[Tuple[int, int, int]]:
+        """Выигрышная линия в позиции после ply ходов (или None)."""
+        board = self.position(ply)
+        for line in WIN_LINES:
+            a, b, c = line
+            if board[a] and board[a] == board[b] == board[c]:
+                return line
+        return None
+
+
+class ReplayViewer:
+    """Окно просмотра партий: список игр, поле, перемотка и автоигра."""
+
+    def __init__(self, parent: tk.Misc, games: List[Dict[str, Any]], theme: Dict[str, str]) -> None:
+        """Создает окно просмотра.
+
+        Args:
+            parent: Родительское окно
+            games: Записи истории (новые в конце)
+            theme: Текущая цветовая тема приложения
+        """
+        self.games: List[Dict[str, Any]] = games
+        self.theme: Dict[str, str] = theme
+        # Кэш индексов: номер партии -> ReplayIndex (строится лениво)
+        self.index_cache: "OrderedDict[int, ReplayIndex]" = OrderedDict()
+        # Текущая партия (номер и индекс) и ход
+        self.current_no: int = -1
+        self.current: Optional[ReplayIndex] = None
+        self.ply: int = 0
+        # Идентификатор запланированного шага автоигры
+        self.play_job: Optional[str] = None
+
+        # Создаем окно
+        self.window = tk.Toplevel(parent)
+        self.window.title("Повтор партий")  # Заголовок окна
+        self.window.geometry("600x420")  # Размер окна
+        self.window.config(bg=theme["bg"])
+        self.window.protocol("WM_DELETE_WINDOW", self.close)
+
+        # --- Список партий (слева) ---
+        list_frame = tk.Frame(self.window, bg=theme["bg"])
+        list_frame.pack(side="left", fill="y", padx=5, pady=5)
+        self.listbox = tk.Listbox(list_frame, width=34, font=("Arial", 9), exportselection=False)
+        scrollbar = tk.Scrollbar(list_frame, orient="vertical", command=self.listbox.yview)
+        self.listbox.configure(yscrollcommand=scrollbar.set)
+        # Новые партии показываем первыми, как в истории
+        self.listbox.insert(tk.END, *[
+            f"{format_timestamp(game.get('date', 0))} — {game.get('result', '')}"
+            for game in reversed(games)
+        ])
+        self.listbox.bind("<<ListboxSelect>>", self.on_select)
+        self.listbox.pack(side="left", fill="y")
+        scrollbar.pack(side="right", fill="y")
+
+        # --- Поле и управление (справа) ---
+        right = tk.Frame(self.window, bg=theme["bg"])
+        right.pack(side="left", fill="both", expand=True, padx=5, pady=5)
+
+        # Поле 3x3 в том же стиле, что и основное
+        board_frame = tk.Frame(right, bg=theme["bg"])
+        board_frame.pack(pady=10)
+        self.cells: List[tk.Label] = []
+        for cell in range(9):
+            label = tk.Label(
+                board_frame,
+                text="",
+                font=("Arial", 28, "bold"),
+                width=3,
+                height=1,
+                bg=theme["btn_bg"],
+                fg=theme["btn_fg"],
+                relief="raised",
+            )
+            label.grid(row=cell // 3, column=cell % 3, padx=3, pady=3)
+            self.cells.append(label)
+
+        # Ползунок перемотки по ходам
+        self.scale = tk.Scale(right, from_=0, to=0, orient="horizontal", command=self.on_seek,
+                              bg=theme["bg"], fg=theme["btn_fg"], highlightthickness=0)
+        self.scale.pack(fill="x", padx=10)
+
+        # Кнопки управления
+        controls = tk.Frame(right, bg=theme["bg"])
+        controls.pack(pady=5)
+        for text, command in (
+            ("⏮", lambda: self.seek(0)),
+            ("◀", lambda: self.seek(self.ply - 1)),
+            ("▶ / ⏸", self.toggle_play),
+            ("▶|", lambda: self.seek(self.ply + 1)),
+            ("⏭", lambda: self.seek(self.current.length if self.current else 0)),
+        ):
+            tk.Button(controls, text=text, font=("Arial", 10), width=5, command=command).pack(side="left", padx=2)
+
+        # Проверка: повторяем ходы ИИ по записанному зерну
+        tk.Button(right, text="🎲 Воспроизвести ходы ИИ", font=("Arial", 10),
+                  command=self.verify).pack(pady=2)
+
+        # Строка состояния
+        self.status = tk.Label(right, text="Выберите партию", font=("Arial", 10),
+                               bg=theme["bg"], fg=theme["btn_fg"])
+        self.status.pack(pady=5)
+
+        # Сразу открываем последнюю партию
+        if games:
+            self.listbox.selection_set(0)
+            self.open_game(len(games) - 1)
+
+    def get_index(self, game_no: int) -> ReplayIndex:
+        """Возвращает индекс партии, строя его только при первом обращении."""
+        index = self.index_cache.get(game_no)
+        if index is None:
+            index = ReplayIndex(str(self.games[game_no].get("moves", "")))
+            self.index_cache[game_no] = index
+            # Ограничиваем размер кэша
+            if len(self.index_cache) > INDEX_CACHE_SIZE:
+                self.index_cache.popitem(last=False)
+        else:
+            self.index_cache.move_to_end(game_no)
+        return index
+
+    def on_select(self, _event: Optional[tk.Event] = None) -> None:
+        """Открывает партию, выбранную в списке."""
+        selection = self.listbox.curselection()
+        if selection:
+            # Список показан в обратном порядке
+            self.open_game(len(self.games) - 1 - selection[0])
+
+    def open_game(self, game_no: int) -> None:
+        """Открывает партию и показывает финальную позицию."""
+        self.stop()
+        self.current_no = game_no
+        self.current = self.get_index(game_no)
+        self.scale.config(to=self.current.length)
+        self.seek(self.current.length)
+
+    def on_seek(self, value: str) -> None:
+        """Обработчик перемещения ползунка."""
+        ply = int(float(value))
+        if ply != self.ply:
+            self.seek(ply)
+
+    def seek(self, ply: int) -> None:
+        """Переходит к позиции после заданного хода (O(1) по индексу)."""
+        if self.current is None:
+            return
+        self.ply = max(0, min(ply, self.current.length))
+        board = self.current.position(self.ply)
+        line = self.current.win_line(self.ply) or ()
+
+        # Отрисовываем поле с подсветкой выигрышной линии
+        for cell, label in enumerate(self.cells):
+            if cell in line:
+                label.config(text=board[cell], bg=self.theme.get("highlight", "#90ee90"),
+                             fg=self.theme.get("text_highlight", "green"))
+            else:
+                label.config(text=board[cell], bg=self.theme["btn_bg"], fg=self.theme["btn_fg"])
+
+        self.scale.set(self.ply)
+        if self.current.length:
+            self.status.config(text=f"Ход {self.ply} из {self.current.length}")
+        else:
+            self.status.config(text="Ходы этой партии не записаны")
+
+    def verify(self) -> None:
+        """Повторяет партию с записанным зерном и сверяет ходы ИИ."""
+        if self.current_no < 0:
+            return
+        _ok, message = reproduce_game(self.games[self.current_no])
+        self.status.config(text=message)
+
+    def toggle_play(self) -> None:
+        """Запускает или останавливает автоматическое воспроизведение."""
+        if self.play_job is not None:
+            self.stop()
+            return
+        if self.current is None:
+            return
+        # Если партия досмотрена — начинаем сначала
+        if self.ply >= self.current.length:
+            self.seek(0)
+        self.play_job = self.window.after(PLAY_DELAY_MS, self.play_step)
+
+    def play_step(self) -> None:
+        """Один шаг автоматического воспроизведения."""
+        self.play_job = None
+        if self.current is None or self.ply >= self.current.length:
+            return
+        self.seek(self.ply + 1)
+        self.play_job = self.window.after(PLAY_DELAY_MS, self.play_step)
+
+    def stop(self) -> None:
+        """Останавливает автоматическое воспроизведение."""
+        if self.play_job is not None:
+            self.window.after_cancel(self.play_job)
+            self.play_job = None
+
+    def close(self) -> None:
+        """Закрывает окно просмотра."""
+        self.stop()
+        self.window.destroy()
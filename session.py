@@ -0,0 +1,92 @@
+# -*- coding: utf-8 -*-
+# Снимок сессии игры "Крестики-нолики"
+# Небольшой JSON с полем, текущим игроком, режимом, сложностью, темой,
+# генератором партии и счетом. Записывается при выходе и по таймеру,
+# а при запуске позволяет восстановить незаконченную партию за миллисекунды.
+
+# Импортируем необходимые модули
+from typing import Any, Dict, List, Optional, Tuple  # Для указания типов данных
+import random  # Для состояния генератора партии
+import time  # Для метки времени снимка
+
+import events  # Шина событий (ошибки чтения и записи данных)
+from storage import atomic_write_json, read_json  # Атомарная запись и чтение JSON
+
+# Файл снимка сессии по умолчанию
+SESSION_FILE: str = "tic_tac_toe_session.json"
+
+# Версия формата снимка (снимки другой версии игнорируются)
+SESSION_VERSION: int = 1
+
+
+def rng_state(rng: random.Random) -> List[Any]:
+    """Состояние генератора в виде, пригодном для JSON."""
+    version, internal, gauss = rng.getstate()
+    return [version, list(internal), gauss]
+
+
+def restore_rng(state: List[Any]) -> random.Random:
+    """Создает генератор с сохраненным состоянием."""
+    rng = random.Random()
+    version, internal, gauss = state
+    rng.setstate((version, tuple(internal), gauss))
+    return rng
+
+
+def save_session(state: Dict[str, Any], path: str = SESSION_FILE) -> bool:
+    """Атомарно записывает снимок сессии (компактный JSON).
+
+    Args:
+        state: Состояние сессии (см. TicTacToeApp.session_state)
+        path: Файл снимка
+
+    Returns:
+        True, если снимок записан
+    """
+    data = dict(state)
+    data["version"] = SESSION_VERSION
+    data["saved_at"] = int(time.time())
+    try:
+        atomic_write_json(path, data, indent=None)
+    except OSError as exc:
+        events.report_error("сохранения сессии", exc)
+        return False
+    return True
+
+
+def _valid_moves(moves: Any) -> Optional[Tuple[int, ...]]:
+    """Проверяет ходы снимка: клетки 0-8 без повторов."""
+    if not isinstance(moves, list) or len(moves) > 9:
+        return None
+    if not all(isinstance(cell, int) and 0 <= cell <= 8 for cell in moves):
+        return None
+    if len(set(moves)) != len(moves):
+        return None
+    return tuple(moves)
+
+
+def load_session(path: str = SESSION_FILE) -> Optional[Dict[str, Any]]:
+    """Читает и проверяет снимок сессии.
+
+    Args:
+        path: Файл снимка
+
+    Returns:
+        Состояние сессии или None, если снимка нет или он поврежден
+    """
+    data = read_json(path, None)
+    if not isinstance(data, dict) or data.get("version") != SESSION_VERSION:
+        return None
+    moves = _valid_moves(data.get("moves"))
+    if moves is None:
+        events.report_error("загрузки сессии", "неверные ходы")
+        return None
+    try:
+        # Проверяем состояние генератора заранее, чтобы не упасть при восстановлении
+        restore_rng(data["rng"])
+        int(data["seed"])
+    except (KeyError, TypeError, ValueError) as exc:
+        events.report_error("загрузки сессии", exc)
+        return None
+    data["moves"] = list(moves)
+    return data
@@ -0,0 +1,284 @@
+# -*- coding: utf-8 -*-
+# Настройки игры "Крестики-нолики"
+# Значения собираются один раз из файла, переменных окружения (TTT_*) и аргументов
+# командной строки, проверяются и кэшируются как неизменяемый объект Settings.
+# При изменении файла настроек (по времени модификации) объект пересобирается.
+#
+# Приоритет источников: значения по умолчанию < файл < окружение < командная строка.
+# Пример: TTT_THEME=dark python main.py --difficulty hard --mode ai
+
+# Импортируем необходимые модули
+from typing import Any, Callable, Dict, List, Mapping, NamedTuple, Optional, Tuple  # Для указания типов данных
+import argparse  # Для разбора аргументов командной строки
+import json  # Для файла настроек
+import os  # Для переменных окружения и времени изменения файла
+import re  # Для проверки формата геометрии окна
+
+import events  # Шина событий (ошибки чтения и записи данных)
+import ai_registry  # Допустимые уровни сложности
+from history_store import HISTORY_FILE, MAX_DAYS, MAX_GAMES  # Умолчания хранения истории
+from analytics import ROLLUPS_FILE  # Файл агрегатов статистики
+from profiles import PROFILES_FILE  # Файл профилей
+from ratings import RATINGS_FILE  # Файл рейтингов
+from session import SESSION_FILE  # Файл снимка сессии
+from event_sink import EVENTS_FILE, METRICS_FILE  # Журнал и метрики событий
+from achievements import ACHIEVEMENTS_FILE  # Файл прогресса достижений
+from archive import ARCHIVE_DIR  # Каталог архива истории
+from themes import THEMES  # Допустимые цветовые темы
+from storage import atomic_write_json  # Атомарная запись файла настроек
+
+# Файл настроек по умолчанию
+SETTINGS_FILE: str = "tic_tac_toe_settings.json"
+
+# Файл счета по умолчанию
+SCORE_FILE: str = "tic_tac_toe_score.json"
+
+# Файл весов стратегии Policy по умолчанию (см. ai_policy)
+POLICY_FILE: str = "tic_tac_toe_policy.npz"
+
+# Префикс переменных окружения (например, TTT_THEME, TTT_MAX_GAMES)
+ENV_PREFIX: str = "TTT_"
+
+# Формат геометрии окна Tk: "ШИРИНАxВЫСОТА" или "ШИРИНАxВЫСОТА+X+Y"
+_GEOMETRY_RE = re.compile(r"^\d+x\d+([+-]\d+[+-]\d+)?$")
+
+
+class Settings(NamedTuple):
+    """Неизменяемый набор проверенных настроек."""
+
+    theme: str = "light"  # Ключ цветовой темы
+    difficulty: str = "normal"  # Уровень сложности ИИ
+    mode: str = "pvp"  # Режим: "pvp" (два игрока) или "ai"
+    geometry: str = "350x600"  # Размер (и позиция) главного окна
+    audio: bool = True  # Звуковые эффекты
+    ai_time_budget_ms: int = 300  # Время на ход ИИ (пауза перед ходом, мс)
+    ai_workers: int = 2  # Потоков общего пула ИИ в режиме нескольких досок
+    flush_interval_ms: int = 0  # Интервал отложенной записи профилей и рейтингов (0 — сразу)
+    max_days: int = MAX_DAYS  # Срок хранения истории и счета (дней)
+    max_games: int = MAX_GAMES  # Максимум партий в истории
+    reload_poll_ms: int = 2000  # Интервал проверки изменения файла настроек (0 — не проверять)
+    restore_session: bool = True  # Восстанавливать прошлую сессию при запуске
+    session_interval_ms: int = 30000  # Интервал записи снимка сессии (0 — только при выходе)
+    score_file: str = SCORE_FILE  # Файл счета
+    history_file: str = HISTORY_FILE  # Файл истории
+    archive_dir: str = ARCHIVE_DIR  # Каталог сжатого архива старых партий ("" — не архивировать)
+    profiles_file: str = PROFILES_FILE  # Файл профилей
+    ratings_file: str = RATINGS_FILE  # Файл рейтингов
+    achievements_file: str = ACHIEVEMENTS_FILE  # Файл прогресса достижений
+    rollups_file: str = ROLLUPS_FILE  # Файл агрегатов статистики
+    session_file: str = SESSION_FILE  # Файл снимка сессии
+    policy_file: str = POLICY_FILE  # Файл весов стратегии Policy
+    events_file: str = EVENTS_FILE  # Журнал событий (JSON Lines)
+    metrics_file: str = METRICS_FILE  # Сводные метрики событий
+
+
+def _parse_bool(value: Any) -> bool:
+    """Разбирает логическое значение из JSON или строки окружения."""
+    if isinstance(value, bool):
+        return value
+    text = str(value).strip().lower()
+    if text in ("1", "true", "yes", "on", "да"):
+        return True
+    if text in ("0", "false", "no", "off", "нет"):
+        return False
+    raise ValueError(f"ожидалось логическое значение, получено {value!r}")
+
+
+def _non_empty(value: str) -> bool:
+    """Проверка непустой строки (пути к файлам)."""
+    return bool(value.strip())
+
+
+# Правила проверки: поле -> (преобразование, проверка, описание допустимых значений)
+_RULES: Dict[str, Tuple[Callable[[Any], Any], Callable[[Any], bool], str]] = {
+    "theme": (str, lambda v: v in THEMES, "ключ темы из themes"),
+    "difficulty": (str, lambda v: v in ai_registry.available(), "уровень из ai_registry"),
+    "mode": (str, lambda v: v in ("pvp", "ai"), "pvp или ai"),
+    "geometry": (str, lambda v: bool(_GEOMETRY_RE.match(v)), "ШИРИНАxВЫСОТА[+X+Y]"),
+    "audio": (_parse_bool, lambda v: True, "логическое значение"),
+    "ai_time_budget_ms": (int, lambda v: 0 <= v <= 60000, "0..60000"),
+    "ai_workers": (int, lambda v: 1 <= v <= 16, "1..16"),
+    "flush_interval_ms": (int, lambda v: 0 <= v <= 600000, "0..600000"),
+    "max_days": (int, lambda v: v > 0, "больше 0"),
+    "max_games": (int, lambda v: v > 0, "больше 0"),
+    "reload_poll_ms": (int, lambda v: v == 0 or v >= 100, "0 или от 100"),
+    "restore_session": (_parse_bool, lambda v: True, "логическое значение"),
+    "session_interval_ms": (int, lambda v: v == 0 or v >= 1000, "0 или от 1000"),
+    "score_file": (str, _non_empty, "путь к файлу"),
+    "history_file": (str, _non_empty, "путь к файлу"),
+    "archive_dir": (str, lambda v: True, "путь к каталогу или пустая строка"),
+    "profiles_file": (str, _non_empty, "путь к файлу"),
+    "ratings_file": (str, _non_empty, "путь к файлу"),
+    "achievements_file": (str, _non_empty, "путь к файлу"),
+    "rollups_file": (str, _non_empty, "путь к файлу"),
+    "session_file": (str, _non_empty, "путь к файлу"),
+    "policy_file": (str, _non_empty, "путь к файлу"),
+    "events_file": (str, _non_empty, "путь к файлу"),
+    "metrics_file": (str, _non_empty, "путь к файлу"),
+}
+
+
+def _validate(values: Mapping[str, Any], source: str) -> Dict[str, Any]:
+    """Проверяет значения одного источника.
+
+    Неизвестные ключи и недопустимые значения пропускаются с сообщением,
+    чтобы одна ошибка в настройках не мешала запуску игры.
+
+    Args:
+        values: Сырые значения источника
+        source: Название источника для сообщений об ошибках
+
+    Returns:
+        Проверенные значения
+    """
+    checked: Dict[str, Any] = {}
+    for key, raw in values.items():
+        rule = _RULES.get(key)
+        if rule is None:
+            events.report_error(f"настроек ({source})", f"неизвестный параметр {key}")
+            continue
+        convert, check, allowed = rule
+        try:
+            value = convert(raw)
+            if not check(value):
+                raise ValueError(f"допустимо: {allowed}")
+        except (TypeError, ValueError) as exc:
+            events.report_error(f"настроек ({source})", f"{key}={raw!r} — {exc}")
+            continue
+        checked[key] = value
+    return checked
+
+
+def read_file(path: str) -> Dict[str, Any]:
+    """Читает значения из JSON-файла настроек (пустой словарь, если файла нет)."""
+    if not os.path.exists(path):
+        return {}
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        if not isinstance(data, dict):
+            raise ValueError("ожидался JSON-объект")
+        return data
+    except (json.JSONDecodeError, OSError, ValueError) as exc:
+        events.report_error("чтения настроек", exc)
+        return {}
+
+
+def read_env(environ: Mapping[str, str]) -> Dict[str, str]:
+    """Значения из переменных окружения с префиксом TTT_."""
+    return {
+        name[len(ENV_PREFIX):].lower(): value
+        for name, value in environ.items()
+        if name.startswith(ENV_PREFIX) and name != ENV_PREFIX + "CONFIG"
+    }
+
+
+def parse_args(argv: Optional[List[str]]) -> Tuple[Optional[str], Dict[str, Any]]:
+    """Разбирает аргументы командной строки.
+
+    Returns:
+        Кортеж (путь к файлу настроек или None, заданные значения)
+    """
+    parser = argparse.ArgumentParser(description="Крестики-нолики")
+    parser.add_argument("--config", default=None, help="Файл настроек")
+    for key in _RULES:
+        parser.add_argument("--" + key.replace("_", "-"), dest=key, default=None)
+    args, _unknown = parser.parse_known_args(argv)
+    values = {key: value for key, value in vars(args).items() if value is not None and key != "config"}
+    return args.config, values
+
+
+def build(path: str, overrides: Mapping[str, Any]) -> Settings:
+    """Собирает настройки: файл, поверх него проверенные значения окружения и командной строки."""
+    merged: Dict[str, Any] = _validate(read_file(path), path)
+    merged.update(overrides)
+    return Settings(**merged)
+
+
+def _mtime(path: str) -> float:
+    """Время изменения файла (0, если файла нет)."""
+    try:
+        return os.path.getmtime(path)
+    except OSError:
+        return 0.0
+
+
+class _Cache:
+    """Кэш настроек: объект и все, что нужно для его пересборки."""
+
+    path: str = SETTINGS_FILE
+    # Проверенные значения окружения и командной строки (не меняются до перезапуска)
+    overrides: Dict[str, Any] = {}
+    mtime: float = 0.0
+    settings: Optional[Settings] = None
+
+
+def load(argv: Optional[List[str]] = None, environ: Optional[Mapping[str, str]] = None) -> Settings:
+    """Загружает настройки один раз и кэширует их.
+
+    Args:
+        argv: Аргументы командной строки (None — без аргументов)
+        environ: Переменные окружения (None — os.environ)
+
+    Returns:
+        Неизменяемый объект настроек
+    """
+    env = dict(os.environ if environ is None else environ)
+    config_path, cli_values = parse_args(argv or [])
+    _Cache.path = config_path or env.get(ENV_PREFIX + "CONFIG") or SETTINGS_FILE
+    _Cache.overrides = _validate(read_env(env), "окружение")
+    _Cache.overrides.update(_validate(cli_values, "командная строка"))
+    _Cache.mtime = _mtime(_Cache.path)
+    _Cache.settings = build(_Cache.path, _Cache.overrides)
+    return _Cache.settings
+
+
+def get() -> Settings:
+    """Возвращает кэшированные настройки (загружая их при первом обращении)."""
+    if _Cache.settings is None:
+        return load()
+    return _Cache.settings
+
+
+def reload_if_changed() -> Optional[Settings]:
+    """Пересобирает настройки, если файл изменился.
+
+    Returns:
+        Новые настройки или None, если файл не менялся или значения те же
+    """
+    mtime = _mtime(_Cache.path)
+    if mtime == _Cache.mtime:
+        return None
+    _Cache.mtime = mtime
+    settings = build(_Cache.path, _Cache.overrides)
+    if settings == _Cache.settings:
+        return None
+    _Cache.settings = settings
+    return settings
+
+
+def save(**changes: Any) -> Settings:
+    """Сохраняет измененные пользователем значения в файл настроек.
+
+    В файл попадают только значения, отличные от умолчаний; переменные окружения
+    и аргументы командной строки по-прежнему имеют приоритет.
+
+    Args:
+        changes: Новые значения полей (например, theme="dark")
+
+    Returns:
+        Обновленные кэшированные настройки
+    """
+    data = read_file(_Cache.path)
+    data.update(_validate(changes, "интерфейс"))
+    defaults = Settings()
+    data = {key: value for key, value in data.items() if getattr(defaults, key, None) != value}
+    try:
+        # Атомарная замена: при сбое или одновременной перезагрузке файл не окажется обрезанным
+        atomic_write_json(_Cache.path, data)
+    except OSError as exc:
+        events.report_error("сохранения настроек", exc)
+    # Собственная запись не считается внешним изменением файла
+    _Cache.mtime = _mtime(_Cache.path)
+    _Cache.settings = build(_Cache.path, _Cache.overrides)
+    return _Cache.settings
@@ -0,0 +1,205 @@
+# -*- coding: utf-8 -*-
+# Симулятор партий ИИ против ИИ для игры "Крестики-нолики"
+# Все случайные решения берутся из генератора партии с записанным зерном (seed),
+# поэтому любую партию ИИ можно воспроизвести бит в бит, а зерна для
+# рабочих процессов выводятся детерминированно из одного главного зерна.
+#
+# Примеры:
+#     python simulator.py --x normal --o easy --games 10000 --seed 42 --workers 4
+#     python simulator.py --reproduce <id партии из истории>
+
+# Импортируем необходимые модули
+from typing import Any, Dict, List, Optional, Tuple  # Для указания типов данных
+import argparse  # Для разбора аргументов командной строки
+import hashlib  # Для детерминированного вывода зерен
+import multiprocessing  # Для параллельного запуска партий
+import os  # Для генерации случайного зерна
+import random  # Для генератора случайных чисел партии
+import time  # Для замера производительности
+
+import ai_registry  # Реестр стратегий ИИ
+import engine  # Правила игры
+from threats import ThreatIndex  # Индекс угроз, обновляемый на каждом ходу
+from archive import ARCHIVE_DIR, iter_all_history  # Поиск партий в архиве и истории
+from history_store import HISTORY_FILE  # Файл истории по умолчанию
+from profiles import AI_PREFIX  # Префикс идентификаторов профилей ИИ
+
+
+def new_seed() -> int:
+    """Создает новое случайное 63-битное зерно для партии."""
+    return int.from_bytes(os.urandom(8), "big") >> 1
+
+
+def derive_seed(master_seed: int, index: int) -> int:
+    """Детерминированно выводит зерно партии из главного зерна.
+
+    Зерно зависит только от главного зерна и номера партии, поэтому
+    результат не зависит от количества процессов и порядка выполнения.
+
+    Args:
+        master_seed: Главное зерно серии
+        index: Номер партии в серии
+
+    Returns:
+        63-битное зерно партии
+    """
+    digest = hashlib.blake2b(f"{master_seed}:{index}".encode("ascii"), digest_size=8).digest()
+    return int.from_bytes(digest, "big") >> 1
+
+
+def play_game(x_level: str, o_level: str, seed: int) -> Dict[str, Any]:
+    """Играет одну партию между двумя стратегиями.
+
+    Args:
+        x_level: Ключ стратегии за X
+        o_level: Ключ стратегии за O
+        seed: Зерно генератора случайных чисел партии
+
+    Returns:
+        Запись партии: ходы, победитель и зерно
+    """
+    rng = random.Random(seed)
+    strategies = {"X": ai_registry.get_strategy(x_level), "O": ai_registry.get_strategy(o_level)}
+    board = engine.EMPTY_BOARD
+    threats = ThreatIndex()
+    player = "X"
+    moves: List[int] = []
+    while engine.winner(board) is None and engine.EMPTY in board:
+        cell = strategies[player].choose_move(board, player, rng, threats)
+        if cell is None:
+            break
+        board = engine.play(board, cell, player)
+        threats.play(cell, player)
+        moves.append(cell)
+        player = engine.other(player)
+    return {
+        "players": {"X": AI_PREFIX + x_level, "O": AI_PREFIX + o_level},
+        "winner": engine.winner(board) or "",
+        "moves": "".join(str(cell) for cell in moves),
+        "seed": seed,
+    }
+
+
+def reproduce_game(record: Dict[str, Any]) -> Tuple[bool, str]:
+    """Повторяет партию из истории и сверяет ходы ИИ с записанными.
+
+    Ходы людей берутся из записи, ходы ИИ заново вычисляются
+    с генератором, созданным из записанного зерна.
+
+    Args:
+        record: Запись истории с полями "players", "moves" и "seed"
+
+    Returns:
+        Кортеж (совпали ли все ходы, описание результата)
+    """
+    if "seed" not in record or not isinstance(record.get("players"), dict):
+        return False, "В записи нет зерна или игроков"
+    if "variant" in record:
+        return False, f"Повтор варианта {record['variant']} не поддерживается"
+    rng = random.Random(int(record["seed"]))
+    recorded = [int(ch) for ch in str(record.get("moves", ""))]
+    board = engine.EMPTY_BOARD
+    threats = ThreatIndex()
+    player = "X"
+    for ply, cell in enumerate(recorded):
+        player_id = str(record["players"].get(player, ""))
+        if player_id.startswith(AI_PREFIX):
+            # Ход ИИ: вычисляем заново тем же генератором
+            level = player_id[len(AI_PREFIX):]
+            replayed = ai_registry.get_strategy(level).choose_move(board, player, rng, threats)
+            if replayed != cell:
+                return False, f"Расхождение на ходу {ply + 1}: записано {cell}, получено {replayed}"
+        board = engine.play(board, cell, player)
+        threats.play(cell, player)
+        player = engine.other(player)
+    return True, f"Все {len(recorded)} ходов совпали"
+
+
+def _run_chunk(args: Tuple[str, str, int, int, int]) -> List[int]:
+    """Играет часть серии в рабочем процессе.
+
+    Args:
+        args: (стратегия X, стратегия O, главное зерно, первый номер, последний номер)
+
+    Returns:
+        Счет [победы X, победы O, ничьи]
+    """
+    x_level, o_level, master_seed, start, stop = args
+    totals = [0, 0, 0]
+    for index in range(start, stop):
+        winner = play_game(x_level, o_level, derive_seed(master_seed, index))["winner"]
+        totals[0 if winner == "X" else 1 if winner == "O" else 2] += 1
+    return totals
+
+
+def run_series(x_level: str, o_level: str, games: int, master_seed: int,
+               workers: int = 1, chunk: int = 1000) -> List[int]:
+    """Играет серию партий, распределяя ее по процессам.
+
+    Args:
+        x_level: Ключ стратегии за X
+        o_level: Ключ стратегии за O
+        games: Количество партий
+        master_seed: Главное зерно серии
+        workers: Количество рабочих процессов
+        chunk: Партий в одном задании
+
+    Returns:
+        Счет [победы X, победы O, ничьи] (не зависит от количества процессов)
+    """
+    tasks = [
+        (x_level, o_level, master_seed, start, min(start + chunk, games))
+        for start in range(0, games, chunk)
+    ]
+    if workers <= 1:
+        parts = [_run_chunk(task) for task in tasks]
+    else:
+        with multiprocessing.Pool(workers) as pool:
+            parts = pool.map(_run_chunk, tasks)
+    # Суммируем счет всех заданий
+    return [sum(part[i] for part in parts) for i in range(3)]
+
+
+def find_record(game_id: str, path: str = HISTORY_FILE,
+                archive_dir: str = ARCHIVE_DIR) -> Optional[Dict[str, Any]]:
+    """Ищет партию по идентификатору (потоково): в архиве, затем в быстром хранилище."""
+    for record in iter_all_history(path, archive_dir):
+        if record.get("id") == game_id:
+            return record
+    return None
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Запускает серию партий или проверку воспроизводимости."""
+    import settings  # Импорт здесь: настройки нужны только командной строке
+
+    parser = argparse.ArgumentParser(description="Симулятор партий ИИ")
+    parser.add_argument("--x", default="normal", help="Стратегия за X")
+    parser.add_argument("--o", default="hard", help="Стратегия за O")
+    parser.add_argument("--games", type=int, default=1000, help="Количество партий")
+    parser.add_argument("--seed", type=int, default=None, help="Главное зерно серии")
+    parser.add_argument("--workers", type=int, default=1, help="Количество процессов")
+    parser.add_argument("--reproduce", metavar="ID", help="Проверить партию из истории")
+    parser.add_argument("--history", default=None, help="Файл истории (по умолчанию из настроек)")
+    args = parser.parse_args(argv)
+
+    if args.reproduce:
+        config = settings.load([])
+        record = find_record(args.reproduce, args.history or config.history_file, config.archive_dir)
+        if record is None:
+            parser.exit(1, f"Партия {args.reproduce} не найдена\n")
+        ok, message = reproduce_game(record)
+        print(message)
+        parser.exit(0 if ok else 1)
+
+    master_seed = new_seed() if args.seed is None else args.seed
+    started = time.perf_counter()
+    x_wins, o_wins, draws = run_series(args.x, args.o, args.games, master_seed, args.workers)
+    elapsed = time.perf_counter() - started
+    print(f"Зерно серии: {master_seed}")
+    print(f"{args.x} (X) — {args.o} (O): {x_wins} / {o_wins} / ничьих {draws}")
+    print(f"{args.games} партий за {elapsed:.2f} с ({args.games / max(elapsed, 1e-9):.0f} партий/с)")
+
+
+if __name__ == "__main__":
+    main()
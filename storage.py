@@ -0,0 +1,151 @@
+# -*- coding: utf-8 -*-
+# Безопасная запись общих файлов данных игры "Крестики-нолики"
+# Несколько процессов (окна игры, турниры, симулятор) могут писать одни и те же
+# JSON-файлы. Запись идет под межпроцессной блокировкой файла, атомарно
+# (временный файл + os.replace), а изменения объединяются с тем, что уже
+# записали другие процессы, поэтому результаты не теряются.
+
+# Импортируем необходимые модули
+from typing import Any, Callable, Optional  # Для указания типов данных
+import importlib  # Для загрузки модулей блокировки, доступных только на своей платформе
+import json  # Для работы с JSON-файлами
+import os  # Для атомарной замены файла
+import tempfile  # Для временного файла рядом с целевым
+import time  # Для пауз между попытками блокировки (Windows)
+
+import events  # Шина событий (ошибки чтения и записи данных)
+
+
+def _optional_module(name: str) -> Any:
+    """Импортирует модуль, если он есть на этой платформе (иначе None)."""
+    try:
+        return importlib.import_module(name)
+    except ImportError:
+        return None
+
+
+# fcntl есть на Linux/macOS, msvcrt — на Windows
+FCNTL: Any = _optional_module("fcntl")
+MSVCRT: Any = _optional_module("msvcrt")
+
+# Маска прав процесса: mkstemp создает файл с правами 0600, а новые файлы данных
+# должны получать обычные права (0666 с учетом umask), как при open()
+_UMASK: int = os.umask(0)
+os.umask(_UMASK)
+
+
+def _file_mode(path: str) -> int:
+    """Права для записываемого файла: права существующего файла или умолчание umask."""
+    try:
+        return os.stat(path).st_mode & 0o7777
+    except OSError:
+        return 0o666 & ~_UMASK
+
+# Суффикс файла блокировки
+LOCK_SUFFIX: str = ".lock"
+
+
+class FileLock:
+    """Межпроцессная эксклюзивная блокировка файла данных.
+
+    Блокируется отдельный файл "<путь>.lock", поэтому сам файл данных
+    можно атомарно заменять, а читатели никогда не видят его наполовину записанным.
+
+    Пример:
+        with FileLock("tic_tac_toe_history.json"):
+            ...  # чтение, изменение и запись файла
+    """
+
+    def __init__(self, path: str) -> None:
+        """Создает блокировку для файла данных.
+
+        Args:
+            path: Путь к файлу данных
+        """
+        self.lock_path: str = path + LOCK_SUFFIX
+        self.handle: Optional[Any] = None
+
+    def __enter__(self) -> "FileLock":
+        """Ждет и захватывает блокировку."""
+        self.handle = open(self.lock_path, "a+b")
+        if FCNTL is not None:
+            FCNTL.flock(self.handle.fileno(), FCNTL.LOCK_EX)
+        elif MSVCRT is not None:
+            # Блокируем первый байт файла; LK_LOCK сам повторяет попытки около 10 с
+            self.handle.seek(0)
+            while True:
+                try:
+                    MSVCRT.locking(self.handle.fileno(), MSVCRT.LK_LOCK, 1)
+                    break
+                except OSError:
+                    time.sleep(0.05)
+        return self
+
+    def __exit__(self, *_exc: Any) -> None:
+        """Освобождает блокировку."""
+        if self.handle is None:
+            return
+        try:
+            if FCNTL is not None:
+                FCNTL.flock(self.handle.fileno(), FCNTL.LOCK_UN)
+            elif MSVCRT is not None:
+                self.handle.seek(0)
+                MSVCRT.locking(self.handle.fileno(), MSVCRT.LK_UNLCK, 1)
+        finally:
+            self.handle.close()
+            self.handle = None
+
+
+def read_json(path: str, default: Any) -> Any:
+    """Читает JSON-файл; при отсутствии или ошибке возвращает default."""
+    if not os.path.exists(path):
+        return default
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (json.JSONDecodeError, OSError) as exc:
+        events.report_error(f"чтения {path}", exc)
+        return default
+
+
+def atomic_write_json(path: str, data: Any, indent: Optional[int] = 4) -> None:
+    """Атомарно записывает JSON: во временный файл рядом, затем os.replace.
+
+    Args:
+        path: Путь к файлу
+        data: Данные для записи
+        indent: Отступ JSON (None — компактная запись)
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(prefix=os.path.basename(path) + ".", suffix=".tmp", dir=directory)
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, indent=indent)
+            f.flush()
+            os.fsync(f.fileno())
+        # os.replace переносит права временного файла, поэтому задаем их заранее
+        os.chmod(tmp_path, _file_mode(path))
+        os.replace(tmp_path, path)
+    except BaseException:
+        # Не оставляем временный файл при ошибке
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def locked_update(path: str, update: Callable[[Any], Any], default: Any, indent: Optional[int] = 4) -> Any:
+    """Читает, изменяет и атомарно записывает файл под межпроцессной блокировкой.
+
+    Args:
+        path: Путь к файлу данных
+        update: Функция: текущие данные на диске -> новые данные
+        default: Данные, если файла еще нет
+        indent: Отступ JSON
+
+    Returns:
+        Записанные данные
+    """
+    with FileLock(path):
+        data = update(read_json(path, default))
+        atomic_write_json(path, data, indent)
+    return data
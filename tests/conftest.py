@@ -0,0 +1,25 @@
+# -*- coding: utf-8 -*-
+# Общие настройки тестов: модули игры лежат в корне репозитория
+
+# Импортируем необходимые модули
+import os  # Для пути к корню репозитория
+import sys  # Для пути импорта
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from typing import Any  # Для указания типов данных
+
+import pytest  # Фикстуры
+
+import settings  # Настройки с путями к файлам данных
+
+
+@pytest.fixture
+def data_dir(tmp_path: Any, monkeypatch: Any) -> Any:
+    """Временный рабочий каталог: файлы данных по умолчанию создаются в нем."""
+    monkeypatch.chdir(tmp_path)
+    for name in list(os.environ):
+        if name.startswith(settings.ENV_PREFIX):
+            monkeypatch.delenv(name)
+    settings.load([])
+    return tmp_path
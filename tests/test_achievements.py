@@ -0,0 +1,101 @@
+# -*- coding: utf-8 -*-
+# Тесты движка достижений
+
+# Импортируем необходимые модули
+from typing import Any, Dict, List  # Для указания типов данных
+import json  # Для файлов истории и прогресса
+
+import achievements  # Проверяемый модуль
+import archive  # Архив вытесненных записей
+import settings  # Пути к файлам данных
+from achievements import AchievementEngine, AchievementStore, merge_snapshots  # Движок и хранилище
+from profiles import ProfileStore  # Идентификаторы ИИ
+
+# Январь 2024 года по UTC
+BASE: int = 1704067200
+
+STREAK_RULES: List[Dict[str, Any]] = [
+    {"id": "streak_2", "on": ["win"], "reset": ["loss", "draw"], "target": 2},
+    {"id": "wins_2", "on": ["win"], "target": 2},
+]
+
+
+def _game(store: AchievementStore, winner: Any, difficulty: str = "pvp", length: int = 5,
+          ts: int = BASE) -> List[str]:
+    """Партия Ани (X) против Бори (O); возвращает полученные Аней достижения."""
+    return [rule.id for player, rule in store.record_game("anna", "boris", winner, difficulty, length, ts)
+            if player == "anna"]
+
+
+def test_streak_resets_but_counter_keeps_growing() -> None:
+    """Поражение обнуляет серию, а накопительный счетчик побед не трогает."""
+    store = AchievementStore(AchievementEngine(STREAK_RULES))
+    assert _game(store, "X") == []
+    assert _game(store, "O") == []
+    rule = store.engine.rules["streak_2"]
+    assert store.progress_of("anna", rule) == 0
+    assert store.progress_of("anna", store.engine.rules["wins_2"]) == 1
+
+    assert _game(store, "X") == ["wins_2"]
+    assert store.progress_of("anna", rule) == 1
+    assert _game(store, "X") == ["streak_2"]
+    # Ничья тоже сбрасывает серию, но полученное достижение остается
+    _game(store, None)
+    assert store.progress_of("anna", rule) == 0
+    assert [r.id for r, _ts in store.unlocked("anna")] == ["wins_2", "streak_2"]
+
+
+def test_where_filters_difficulty_and_own_moves() -> None:
+    """Фильтр where учитывает уровень ИИ и число своих ходов."""
+    store = AchievementStore()
+    hard = ProfileStore.ai_id("hard")
+    # Победа X за 5 ходов партии: у X три своих хода
+    unlocked = store.record_game("anna", hard, "X", "hard", 5, BASE)
+    assert {rule.id for _player, rule in unlocked} == {"beat_hard", "fast_win"}
+    # Профили ИИ прогресса не получают
+    assert hard not in store.players
+
+    # За O те же 6 ходов партии — три своих, а уровень не hard
+    unlocked = store.record_game("anna", "boris", "O", "easy", 6, BASE)
+    assert [rule.id for player, rule in unlocked if player == "boris"] == ["fast_win"]
+    # Победа X за 7 ходов партии (четыре своих) под фильтр не подходит
+    fresh = AchievementStore()
+    assert "fast_win" not in _game(fresh, "X", "hard", 7)
+
+
+def test_merge_adds_counts_and_keeps_earliest_unlock() -> None:
+    """Слияние складывает счетчики и сохраняет самое раннее время получения."""
+    base = {"players": {"anna": {"counts": {"wins_3": 1}, "streaks": {}, "unlocked": {}}}}
+    disk = {"players": {"anna": {"counts": {"wins_3": 3}, "streaks": {"streak_3": 2},
+                                 "unlocked": {"wins_3": BASE + 10}}}}
+    mine = {"players": {"anna": {"counts": {"wins_3": 4}, "streaks": {"streak_3": 1},
+                                 "unlocked": {"wins_3": BASE + 20, "fast_win": BASE + 5}}}}
+    merged = merge_snapshots(disk, mine, base)["players"]["anna"]
+    assert merged["counts"] == {"wins_3": 6}
+    assert merged["unlocked"] == {"wins_3": BASE + 10, "fast_win": BASE + 5}
+    # Серия не складывается: берется своя
+    assert merged["streaks"] == {"streak_3": 1}
+
+
+def test_backfill_reads_archive_and_history(data_dir: Any, capsys: Any) -> None:
+    """--backfill проходит архив и историю по порядку и заменяет файл прогресса."""
+    config = settings.get()
+    players = {"X": "anna", "O": ProfileStore.ai_id("hard")}
+    old = [{"id": f"a{i}", "date": BASE + i, "result": "", "winner": "X", "difficulty": "easy",
+            "length": 7, "players": players} for i in range(2)]
+    archive.archive_records(old, config.archive_dir)
+    recent = [{"id": "h0", "date": BASE + 100, "result": "", "winner": "X", "difficulty": "hard",
+               "length": 7, "players": players},
+              {"id": "h1", "date": BASE + 200, "result": "Ничья"}]  # Старая запись без профилей
+    with open(config.history_file, "w", encoding="utf-8") as f:
+        json.dump(recent, f)
+    with open(config.achievements_file, "w", encoding="utf-8") as f:
+        json.dump({"players": {"stale": {"counts": {"wins_3": 99}}}}, f)
+
+    achievements.main(["--backfill"])
+
+    assert "Учтено партий: 3, игроков: 1" in capsys.readouterr().out
+    with open(config.achievements_file, encoding="utf-8") as f:
+        data = json.load(f)["players"]
+    assert list(data) == ["anna"]
+    assert data["anna"]["unlocked"] == {"wins_3": BASE + 100, "streak_3": BASE + 100, "beat_hard": BASE + 100}
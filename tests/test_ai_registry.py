@@ -0,0 +1,34 @@
+# -*- coding: utf-8 -*-
+# Тесты реестра стратегий ИИ
+
+# Импортируем необходимые модули
+from concurrent.futures import ThreadPoolExecutor  # Параллельные ходы, как у досок пула ИИ
+import random  # Генераторы партий
+
+import ai_registry  # Проверяемый модуль
+import engine  # Поле движка
+
+
+def test_shared_strategy_is_thread_safe() -> None:
+    """Один экземпляр стратегии ходит из нескольких потоков без потери учета стоимости."""
+    strategy = ai_registry.get_strategy("strong")
+    before = strategy.stats.calls
+    boards = [engine.EMPTY_BOARD, "X........", "X...O...X", "XX..O...."]
+
+    def _move(i: int) -> int:
+        return strategy.choose_move(boards[i % len(boards)], "O" if i % 2 else "X", random.Random(i))
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        moves = list(pool.map(_move, range(400)))
+
+    assert strategy.stats.calls - before == 400
+    assert all(move is not None for move in moves)
+    # Тот же ход с тем же зерном, что и без потоков
+    assert moves[5] == _move(5)
+
+
+def test_get_strategy_creates_one_instance_per_key() -> None:
+    """Одновременные запросы одной стратегии получают один экземпляр."""
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        instances = list(pool.map(lambda _i: ai_registry.get_strategy("tricky"), range(32)))
+    assert len({id(instance) for instance in instances}) == 1
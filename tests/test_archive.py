@@ -0,0 +1,74 @@
+# -*- coding: utf-8 -*-
+# Тесты архива истории
+
+# Импортируем необходимые модули
+from typing import Any, Dict, List  # Для указания типов данных
+import os  # Для проверки файлов разделов
+
+import pytest  # Проверка исключений
+
+import archive  # Проверяемый модуль
+from storage import FileLock  # Блокировка оглавления
+
+# Январь 2024 года по UTC
+BASE: int = 1704067200
+DAY: int = 86400
+
+
+def _records(start: int, count: int, step: int = DAY) -> List[Dict[str, Any]]:
+    """Записи с идентификаторами и датами через step секунд."""
+    return [{"id": f"g{start + i * step}", "date": start + i * step, "result": "Ничья", "winner": ""}
+            for i in range(count)]
+
+
+def test_archive_records_and_period_reads(tmp_path: Any) -> None:
+    """Записи раскладываются по месяцам, а чтение за период открывает нужные разделы."""
+    directory = str(tmp_path / "archive")
+    records = _records(BASE, 70)  # Январь, февраль и начало марта
+    assert archive.archive_records(records, directory) == 70
+
+    index = archive.load_index(directory)
+    assert sorted(index) == ["2024-01", "2024-02", "2024-03"]
+    assert [index[key]["count"] for key in sorted(index)] == [31, 29, 10]
+    assert list(archive.iter_archive(directory)) == records
+    february = archive.partition_start("2024-02")
+    march = archive.partition_start("2024-03")
+    assert [r["date"] for r in archive.iter_archive(directory, february, march)] == \
+        [r["date"] for r in records if february <= r["date"] < march]
+
+
+def test_write_partitions_rewrites_from_key(tmp_path: Any) -> None:
+    """write_partitions заменяет разделы начиная с from_key и не трогает более ранние."""
+    directory = str(tmp_path / "archive")
+    archive.archive_records(_records(BASE, 60), directory)
+    january_file = archive.load_index(directory)["2024-01"]["file"]
+    february = archive.partition_start("2024-02")
+    # Поток читает старые разделы, которые переписываются этим же вызовом
+    old = list(archive.iter_archive(directory, february))
+    extra = _records(february + 3600, 29)
+    merged = sorted(old + extra, key=lambda r: r["date"])
+
+    with FileLock(archive.index_path(directory)):
+        written = archive.write_partitions(directory, "2024-02", iter(merged))
+
+    assert written == 58
+    index = archive.load_index(directory)
+    assert index["2024-01"]["file"] == january_file and index["2024-01"]["count"] == 31
+    assert index["2024-02"]["count"] == 58
+    assert list(archive.iter_archive(directory)) == _records(BASE, 31) + merged
+    assert not [name for name in os.listdir(directory) if name.endswith(".tmp")]
+
+
+def test_write_partitions_keeps_old_data_on_error(tmp_path: Any) -> None:
+    """Записи не по порядку прерывают запись, а старые разделы остаются."""
+    directory = str(tmp_path / "archive")
+    records = _records(BASE, 40)
+    archive.archive_records(records, directory)
+    bad = _records(archive.partition_start("2024-02"), 2) + _records(BASE, 1)
+
+    with FileLock(archive.index_path(directory)):
+        with pytest.raises(ValueError):
+            archive.write_partitions(directory, "2024-01", iter(bad))
+
+    assert list(archive.iter_archive(directory)) == records
+    assert not [name for name in os.listdir(directory) if name.endswith(".tmp")]
@@ -0,0 +1,31 @@
+# -*- coding: utf-8 -*-
+# Тесты определения итога партии в окне игры
+
+# Импортируем необходимые модули
+from types import SimpleNamespace  # Состояние окна без Tk
+from typing import Any  # Для указания типов данных
+
+from main import TicTacToeApp  # Проверяемые методы
+
+
+def _window(cells: str) -> Any:
+    """Состояние окна: логическое поле задано, кнопки еще не отрисовали последний ход."""
+    board = ["" if cell == "." else cell for cell in cells]
+    buttons = [[{"text": ""} for _col in range(3)] for _row in range(3)]
+    return SimpleNamespace(board=board, buttons=buttons, win_line=[])
+
+
+def test_winner_is_judged_on_logical_board() -> None:
+    """Ход ИИ засчитывается, даже если анимация еще не вывела символ на кнопку."""
+    window = _window("XX.OOO.X.")
+    assert TicTacToeApp.check_winner_with_line(window) == "O"
+    assert window.win_line == [(1, 0), (1, 1), (1, 2)]
+
+
+def test_no_winner_and_draw() -> None:
+    """Без выигрышной линии победителя нет; заполненное поле — ничья."""
+    window = _window("XOXXOOOXX")
+    assert TicTacToeApp.check_winner_with_line(window) is None
+    assert window.win_line == []
+    assert TicTacToeApp.check_draw(window)
+    assert not TicTacToeApp.check_draw(_window("XOXXOOOX."))
@@ -0,0 +1,25 @@
+# -*- coding: utf-8 -*-
+# Тесты хранилища истории
+
+# Импортируем необходимые модули
+from typing import Any  # Для указания типов данных
+import time  # Для свежих дат
+
+from history_store import append_history, iter_history, parse_timestamp  # Проверяемые функции
+from storage import atomic_write_json  # Запись старого файла истории
+
+
+def test_append_converts_legacy_string_dates(tmp_path: Any) -> None:
+    """После добавления записи старые строковые даты хранятся секундами эпохи."""
+    path = str(tmp_path / "history.json")
+    legacy = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(time.time() - 3600))
+    atomic_write_json(path, [{"date": legacy, "result": "Ничья"}])
+    new = {"id": "g1", "date": time.strftime("%Y-%m-%d %H:%M:%S"), "result": "Победа X"}
+
+    append_history([new], path, 90, 100)
+
+    dates = [record["date"] for record in iter_history(path)]
+    assert all(isinstance(date, int) for date in dates)
+    assert dates[0] == parse_timestamp(legacy)
+    # Запись вызывающего не меняется
+    assert isinstance(new["date"], str)
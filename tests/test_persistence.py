@@ -0,0 +1,134 @@
+# -*- coding: utf-8 -*-
+# Тесты фонового писателя файлов данных
+
+# Импортируем необходимые модули
+from typing import Any, Dict, Optional  # Для указания типов данных
+import json  # Для чтения записанных файлов
+
+import os  # Права файлов
+
+import storage  # Атомарная запись (подменяется для имитации сбоя)
+from persistence import PersistenceWriter  # Проверяемый писатель
+from profiles import ProfileStore  # Профили, чьи записи проверяются
+
+
+def _failing_write(path: str, data: Dict[str, Any], base: Optional[Dict[str, Any]]) -> None:
+    """Запись, которая всегда падает с ожидаемой ошибкой."""
+    raise ValueError("сбой записи")
+
+
+def _crashing_write(path: str, data: Dict[str, Any], base: Optional[Dict[str, Any]]) -> None:
+    """Запись, которая падает с неожиданной ошибкой."""
+    raise RuntimeError("неожиданный сбой")
+
+
+def _json_write(path: str, data: Dict[str, Any], base: Optional[Dict[str, Any]]) -> bool:
+    """Обычная запись снимка."""
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f)
+    return True
+
+
+def test_writer_survives_write_errors(tmp_path: Any) -> None:
+    """Ошибка записи сообщается, а поток продолжает писать следующие задания."""
+    writer = PersistenceWriter()
+    try:
+        for write in (_failing_write, _crashing_write):
+            writer.jobs.put(("snapshot", str(tmp_path / "bad.json"), (write, {}, None)))
+            assert writer.flush(timeout=2)
+            assert writer.thread.is_alive()
+
+        good = tmp_path / "good.json"
+        writer.jobs.put(("snapshot", str(good), (_json_write, {"ok": 1}, None)))
+        assert writer.flush(timeout=2)
+        assert json.loads(good.read_text(encoding="utf-8")) == {"ok": 1}
+    finally:
+        writer.close()
+
+
+def test_history_error_does_not_block_flush(tmp_path: Any) -> None:
+    """Ошибка записи истории (каталог вместо файла) не вешает flush."""
+    writer = PersistenceWriter()
+    try:
+        writer.add_history({"date": 1, "result": "Ничья", "id": "a"}, str(tmp_path), 90, 100)
+        assert writer.flush(timeout=2)
+        assert writer.thread.is_alive()
+    finally:
+        writer.close()
+    # После остановки flush не ждет
+    assert writer.flush(timeout=0.1)
+
+
+def test_score_writes_merge_with_other_windows(tmp_path: Any) -> None:
+    """Счет пишется потоком писателя; к счету на диске прибавляются только свои победы."""
+    path = str(tmp_path / "score.json")
+    names = {"X": "Аня", "O": "Боря"}
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"wins": {"X": 5, "O": 1}, "names": names, "last_played": 1}, f)
+    writer = PersistenceWriter()
+    try:
+        # Окно знало счет 3:1 и с тех пор выиграло X еще дважды
+        writer.save_score({"wins": {"X": 5, "O": 1}, "names": names, "last_played": 2}, {"X": 3, "O": 1}, path)
+        writer.save_session({"moves": [4]}, str(tmp_path / "session.json"))
+        assert writer.flush(timeout=2)
+    finally:
+        writer.close()
+    with open(path, encoding="utf-8") as f:
+        assert json.load(f)["wins"] == {"X": 7, "O": 1}
+    with open(tmp_path / "session.json", encoding="utf-8") as f:
+        assert json.load(f)["moves"] == [4]
+
+
+def test_failed_snapshot_is_retried_from_old_base(tmp_path: Any, monkeypatch: Any) -> None:
+    """После неудачной записи изменения не теряются: повтор идет от прежней базы."""
+    path = str(tmp_path / "profiles.json")
+    store = ProfileStore()
+    anna = store.get_or_create("Аня")
+    store.import_legacy_wins(anna.id, 1)
+    store.save(path)
+
+    def _broken(*args: Any, **kwargs: Any) -> None:
+        raise OSError("диск недоступен")
+
+    def _disk_wins() -> int:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)["profiles"][0]["wins"]
+
+    writer = PersistenceWriter()
+    try:
+        with monkeypatch.context() as patch:
+            patch.setattr(storage, "atomic_write_json", _broken)
+            # Синхронное сохранение не удалось — база не сдвигается
+            store.import_legacy_wins(anna.id, 1)
+            store.save(path)
+            assert store.saved is not None and store.saved["profiles"][0]["wins"] == 1
+            # Фоновое сохранение не удалось — снимок ждет повтора
+            store.import_legacy_wins(anna.id, 1)
+            writer.save_profiles(store, path)
+            assert writer.flush(timeout=2)
+            assert path in writer.retry
+
+        # Тем временем другое окно записало еще одну победу Ани
+        other = ProfileStore.load(path)
+        other.import_legacy_wins(anna.id, 1)
+        other.save(path)
+        assert _disk_wins() == 2
+
+        # Следующая запись повторяет неудавшуюся: все победы складываются
+        store.import_legacy_wins(anna.id, 1)
+        writer.save_profiles(store, path)
+        assert writer.flush(timeout=2)
+        assert not writer.retry
+    finally:
+        writer.close()
+    assert _disk_wins() == 5
+
+
+def test_atomic_write_keeps_file_mode(tmp_path: Any) -> None:
+    """Атомарная запись сохраняет права существующего файла и не делает новые файлы 0600."""
+    path = str(tmp_path / "data.json")
+    storage.atomic_write_json(path, {"a": 1})
+    assert os.stat(path).st_mode & 0o777 == 0o666 & ~storage._UMASK
+    os.chmod(path, 0o640)
+    storage.atomic_write_json(path, {"a": 2})
+    assert os.stat(path).st_mode & 0o777 == 0o640
@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+# Тесты профилей игроков и их слияния
+
+# Импортируем необходимые модули
+from typing import Any, Dict  # Для указания типов данных
+
+from profiles import ProfileStore, merge_snapshots  # Проверяемые хранилище и слияние
+
+
+def _item(profile_id: str, **fields: Any) -> Dict[str, Any]:
+    """Словарь профиля с нулевыми счетчиками по умолчанию."""
+    item: Dict[str, Any] = {"id": profile_id, "name": "Аня", "kind": "human", "wins": 0, "losses": 0,
+                            "draws": 0, "total_moves": 0, "streak": 0, "best_streak": 0,
+                            "vs_opponent": {}, "by_difficulty": {}}
+    item.update(fields)
+    return item
+
+
+def test_merge_adds_own_changes_to_disk() -> None:
+    """К профилю на диске прибавляются только свои изменения с base."""
+    base = {"profiles": [_item("a", wins=2, total_moves=10, vs_opponent={"b": [2, 0, 0]})]}
+    disk = {"profiles": [_item("a", wins=3, draws=1, total_moves=19, streak=0, best_streak=4,
+                               vs_opponent={"b": [3, 0, 1]}), _item("c", name="Вика")],
+            "applied": ["m1"]}
+    mine = {"profiles": [_item("a", wins=4, losses=1, total_moves=25, streak=0, best_streak=2,
+                               vs_opponent={"b": [4, 1, 0]}), _item("d", name="Гоша", wins=1)],
+            "applied": ["m2"]}
+
+    merged = merge_snapshots(disk, mine, base)
+    profiles = {item["id"]: item for item in merged["profiles"]}
+    anna = profiles["a"]
+    assert (anna["wins"], anna["losses"], anna["draws"], anna["total_moves"]) == (5, 1, 1, 34)
+    assert anna["vs_opponent"] == {"b": [5, 1, 1]}
+    assert anna["best_streak"] == 4
+    # Профили, известные только одной стороне, сохраняются
+    assert set(profiles) == {"a", "c", "d"}
+    assert merged["applied"] == ["m1", "m2"]
+
+
+def test_streak_taken_only_after_own_games() -> None:
+    """Серия берется своя, только если с прошлой записи были свои партии."""
+    base = {"profiles": [_item("a", wins=2, streak=2)]}
+    disk = {"profiles": [_item("a", wins=4, streak=4)]}
+    idle = merge_snapshots(disk, {"profiles": [_item("a", wins=2, streak=2)]}, base)
+    assert idle["profiles"][0]["streak"] == 4
+    played = merge_snapshots(disk, {"profiles": [_item("a", wins=2, losses=1, streak=0)]}, base)
+    assert played["profiles"][0]["streak"] == 0
+
+
+def test_two_stores_save_without_losing_games(tmp_path: Any) -> None:
+    """Два окна с одним файлом профилей: партии обоих сохраняются."""
+    path = str(tmp_path / "profiles.json")
+    first = ProfileStore.load(path)
+    anna = first.get_or_create("Аня")
+    ai_id = first.get_or_create_ai("hard").id
+    first.save(path)
+
+    second = ProfileStore.load(path)
+    first.record_game(anna.id, ai_id, "X", "hard", 5)
+    second.record_game(anna.id, ai_id, None, "hard", 9)
+    second.record_game(anna.id, ai_id, "O", "hard", 6)
+    first.save(path)
+    second.save(path)
+
+    merged = ProfileStore.load(path)
+    profile = merged.find_by_name("аня")
+    assert profile is not None and profile.id == anna.id
+    assert (profile.wins, profile.draws, profile.losses) == (1, 1, 1)
+    assert profile.total_moves == 20
+    assert profile.by_difficulty["hard"] == [1, 1, 1]
+    assert merged.get(ai_id).wins == 1
@@ -0,0 +1,32 @@
+# -*- coding: utf-8 -*-
+# Тесты пересчета рейтингов
+
+# Импортируем необходимые модули
+from typing import Any  # Для указания типов данных
+
+import archive  # Архив истории
+import ratings  # Проверяемый модуль
+from history_store import append_history, iter_history  # Быстрое хранилище
+
+# Январь 2024 года по UTC
+BASE: int = 1704067200
+
+
+def test_recompute_includes_archived_games(tmp_path: Any, monkeypatch: Any) -> None:
+    """Пересчет из командной строки учитывает и вытесненные в архив партии."""
+    history = str(tmp_path / "history.json")
+    archive_dir = str(tmp_path / "archive")
+    output = str(tmp_path / "ratings.json")
+    for name, value in (("CONFIG", str(tmp_path / "settings.json")), ("HISTORY_FILE", history),
+                        ("ARCHIVE_DIR", archive_dir), ("RATINGS_FILE", output)):
+        monkeypatch.setenv("TTT_" + name, value)
+
+    records = [{"id": f"g{i}", "date": BASE + i, "result": "Победа X", "winner": "X",
+                "players": {"X": "p1", "O": "ai:Легкий"}} for i in range(30)]
+    append_history(records, history, 100000, 10, lambda old: archive.archive_records(old, archive_dir))
+    assert len(list(iter_history(history))) == 10
+
+    ratings.main([])
+    store = ratings.RatingStore.load(output)
+    assert int(store.ratings["p1"][3]) == 30
+    assert int(store.ratings["ai:Легкий"][3]) == 30
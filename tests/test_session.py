@@ -0,0 +1,74 @@
+# -*- coding: utf-8 -*-
+# Тесты снимка сессии
+
+# Импортируем необходимые модули
+from typing import Any, Dict  # Для указания типов данных
+import json  # Для порчи снимка
+import random  # Генератор партии
+
+import pytest  # Параметризация
+
+import session  # Проверяемый модуль
+
+
+def _state(rng: random.Random) -> Dict[str, Any]:
+    """Состояние сессии, как его собирает главное окно."""
+    return {
+        "moves": [4, 0, 8],
+        "move_ms": [120, 80, 95],
+        "game_id": "g1",
+        "game_over": False,
+        "vs_ai": True,
+        "difficulty": "strong",
+        "theme": "dark",
+        "seed": 42,
+        "rng": session.rng_state(rng),
+        "player_names": {"X": "Аня", "O": "ИИ"},
+        "win_count": {"X": 3, "O": 1},
+        "score_base": {"X": 2, "O": 1},
+    }
+
+
+def test_restore_continues_game_and_generator(tmp_path: Any) -> None:
+    """Восстановленный снимок дает те же ходы и тот же генератор партии."""
+    path = str(tmp_path / "session.json")
+    rng = random.Random(42)
+    rng.random()  # Генератор уже использовался в партии
+    assert session.save_session(_state(rng), path)
+
+    restored = session.load_session(path)
+    assert restored is not None
+    assert restored["moves"] == [4, 0, 8]
+    assert restored["win_count"] == {"X": 3, "O": 1}
+    assert restored["version"] == session.SESSION_VERSION
+    # Ходы ИИ после восстановления остаются воспроизводимыми
+    replayed = session.restore_rng(restored["rng"])
+    assert [replayed.random() for _ in range(3)] == [rng.random() for _ in range(3)]
+
+
+@pytest.mark.parametrize("change", [
+    {"moves": [4, 4]},  # Повтор клетки
+    {"moves": [9]},  # Клетка вне поля
+    {"moves": list(range(9)) + [0]},  # Больше девяти ходов
+    {"rng": [3, "x", None]},  # Поврежденный генератор
+    {"seed": "abc"},
+    {"version": session.SESSION_VERSION + 1},  # Снимок другой версии
+])
+def test_invalid_snapshot_is_ignored(tmp_path: Any, change: Dict[str, Any]) -> None:
+    """Поврежденный снимок не восстанавливается (начинается новая партия)."""
+    path = str(tmp_path / "session.json")
+    session.save_session(_state(random.Random(1)), path)
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    data.update(change)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f)
+    assert session.load_session(path) is None
+
+
+def test_missing_or_broken_file(tmp_path: Any) -> None:
+    """Без файла или с испорченным JSON снимка нет."""
+    path = tmp_path / "session.json"
+    assert session.load_session(str(path)) is None
+    path.write_text("{не json", encoding="utf-8")
+    assert session.load_session(str(path)) is None
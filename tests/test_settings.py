@@ -0,0 +1,49 @@
+# -*- coding: utf-8 -*-
+# Тесты слоя настроек
+
+# Импортируем необходимые модули
+from typing import Any  # Для указания типов данных
+import json  # Для файла настроек
+import os  # Для времени изменения файла
+
+import settings  # Проверяемый модуль
+
+
+def _write(path: Any, data: Any) -> None:
+    """Записывает файл настроек и сдвигает время изменения (разрешение ФС может быть грубым)."""
+    path.write_text(json.dumps(data), encoding="utf-8")
+    stat = os.stat(path)
+    os.utime(path, (stat.st_atime, stat.st_mtime + 10))
+
+
+def test_sources_priority_and_validation(data_dir: Any) -> None:
+    """Окружение важнее файла, командная строка важнее окружения; неверные значения пропускаются."""
+    _write(data_dir / settings.SETTINGS_FILE, {"theme": "dark", "max_games": 50, "difficulty": "nonsense"})
+    config = settings.load(["--max-games", "7"], {"TTT_THEME": "cosmos", "TTT_MODE": "robot"})
+    assert config.theme == "cosmos"
+    assert config.max_games == 7
+    assert config.difficulty == settings.Settings().difficulty
+    assert config.mode == "pvp"
+
+
+def test_unknown_theme_is_rejected(data_dir: Any) -> None:
+    """Тема проверяется по списку известных тем, а не только на непустоту."""
+    _write(data_dir / settings.SETTINGS_FILE, {"theme": "purple"})
+    assert settings.load([], {}).theme == "light"
+
+
+def test_hot_reload_and_atomic_save(data_dir: Any) -> None:
+    """Изменение файла подхватывается, своя запись — нет; файл пишется целиком."""
+    path = data_dir / settings.SETTINGS_FILE
+    settings.load([], {})
+    assert settings.reload_if_changed() is None
+
+    _write(path, {"theme": "neon_day"})
+    reloaded = settings.reload_if_changed()
+    assert reloaded is not None and reloaded.theme == "neon_day"
+
+    saved = settings.save(difficulty="hard", theme="dark")
+    assert saved.difficulty == "hard" and saved.theme == "dark"
+    assert json.loads(path.read_text(encoding="utf-8")) == {"theme": "dark", "difficulty": "hard"}
+    assert settings.reload_if_changed() is None
+    assert not [name for name in os.listdir(data_dir) if name.endswith(".tmp")]
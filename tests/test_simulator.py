@@ -0,0 +1,31 @@
+# -*- coding: utf-8 -*-
+# Тесты симулятора и воспроизводимости партий
+
+# Импортируем необходимые модули
+from typing import Any  # Для указания типов данных
+
+import pytest  # Проверка кода выхода
+
+import archive  # Архив истории
+import settings  # Пути к файлам данных
+import simulator  # Проверяемый модуль
+from storage import atomic_write_json  # Запись истории
+
+
+def test_series_is_reproducible() -> None:
+    """Серия с одним главным зерном дает тот же счет при любом числе заданий."""
+    assert simulator.run_series("easy", "normal", 40, 123) == simulator.run_series("easy", "normal", 40, 123)
+
+
+def test_reproduce_finds_archived_game(data_dir: Any, capsys: Any) -> None:
+    """--reproduce находит партию, уже перенесенную в архив."""
+    config = settings.get()
+    record = simulator.play_game("easy", "strong", simulator.derive_seed(42, 0))
+    record["id"] = "archived-game"
+    archive.archive_records([record], config.archive_dir)
+    atomic_write_json(config.history_file, [])
+
+    with pytest.raises(SystemExit) as exit_info:
+        simulator.main(["--reproduce", "archived-game"])
+    assert exit_info.value.code == 0
+    assert "не найдена" not in capsys.readouterr().out
@@ -0,0 +1,62 @@
+# -*- coding: utf-8 -*-
+# Тесты индекса угроз и уровней ИИ на его основе
+
+# Импортируем необходимые модули
+from typing import List  # Для указания типов данных
+import random  # Для случайных партий
+
+import ai_registry  # Уровни ИИ
+import engine  # Представление поля
+from threats import ThreatIndex  # Проверяемый индекс
+
+# X в противоположных углах, O в центре: у X две вилки (клетки 2 и 6)
+FORK_BOARD: str = "X...O...X"
+
+
+def _choose(level: str, board: str, player: str, seed: int = 0) -> int:
+    """Ход уровня level с индексом угроз, построенным по полю."""
+    strategy = ai_registry.get_strategy(level)
+    return strategy.choose_move(board, player, random.Random(seed), ThreatIndex.from_board(board))
+
+
+def test_incremental_updates_match_rebuild() -> None:
+    """После любых ходов и отмен индекс совпадает с построенным заново."""
+    rng = random.Random(7)
+    for _ in range(200):
+        index = ThreatIndex()
+        played: List[int] = []
+        for turn in range(rng.randint(1, 9)):
+            cell = rng.choice([c for c in range(9) if not index.board[c]])
+            index.play(cell, "XO"[turn % 2])
+            played.append(cell)
+        while played and rng.random() < 0.5:
+            index.undo(played.pop())
+        rebuilt = ThreatIndex.from_board(engine.board_from_cells(index.board))
+        assert index.counts == rebuilt.counts
+        assert index.open1 == rebuilt.open1 and index.open2 == rebuilt.open2
+        assert index.cell_open1 == rebuilt.cell_open1
+
+
+def test_threat_queries() -> None:
+    """Выигрышные клетки, вилки и вынуждающие ходы на известных позициях."""
+    index = ThreatIndex.from_board("XX.OO....")
+    assert index.winning_cells("X") == {2}
+    assert index.winning_cells("O") == {5}
+
+    index = ThreatIndex.from_board(FORK_BOARD)
+    assert index.winning_cells("X") == set()
+    assert index.fork_cells("X") == {2, 6}
+    assert index.fork_cells("O") == set()
+    assert index.forcing_moves("O") == {3: 5, 5: 3, 1: 7, 7: 1, 2: 6, 6: 2}
+
+
+def test_levels_grade_by_threats() -> None:
+    """Normal выигрывает и блокирует, Tricky создает вилку, Strong не дает создать вилку."""
+    assert _choose("normal", "XX.OO....", "X") == 2
+    assert _choose("normal", "XX.O.....", "O") == 2
+    assert _choose("tricky", FORK_BOARD, "X") == 2
+    # Занять одну из вилок нельзя — Strong отвлекает угрозой, защита от которой не в вилке
+    assert _choose("strong", FORK_BOARD, "O") == 1
+    # Единственную вилку соперника Strong просто занимает
+    assert ThreatIndex.from_board("X...O..X.").fork_cells("X") == {6}
+    assert _choose("strong", "X...O..X.", "O") == 6
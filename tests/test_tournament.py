@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+# Тесты турниров стратегий ИИ
+
+# Импортируем необходимые модули
+from typing import Any  # Для указания типов данных
+import time  # Для свежих дат партий людей
+
+import archive  # Архив истории
+import settings  # Пути к файлам данных
+import tournament  # Проверяемый модуль
+from history_store import iter_history  # Быстрое хранилище
+from profiles import ProfileStore  # Профили игроков
+from ratings import RatingStore  # Рейтинги
+from storage import atomic_write_json  # Запись истории
+
+
+def test_tournament_archives_evicted_human_games(data_dir: Any) -> None:
+    """Партии турнира вытесняют партии людей в архив, а не удаляют их."""
+    config = settings.get()
+    now = int(time.time()) - 3600
+    humans = [{"id": f"h{i}", "date": now + i, "result": "Ничья", "winner": "",
+               "players": {"X": "p1", "O": "p2"}} for i in range(50)]
+    atomic_write_json(config.history_file, humans)
+
+    tournament.main(["--name", "t1", "--players", "easy", "normal", "--games", "200", "--seed", "1"])
+
+    hot = list(iter_history(config.history_file))
+    assert len(hot) == config.max_games
+    everything = list(archive.iter_all_history(config.history_file, config.archive_dir))
+    assert [r["id"] for r in everything if r["id"].startswith("h")] == [r["id"] for r in humans]
+
+
+def test_resume_after_crash_does_not_count_twice(data_dir: Any, monkeypatch: Any) -> None:
+    """Сбой между записью хранилищ и контрольной точки не удваивает профили и рейтинги."""
+    config = settings.get()
+    cup = tournament.Tournament("cup", ["easy", "normal"], games=10, seed=7)
+    cup.save()
+    saved_checkpoint = open(tournament.checkpoint_path("cup"), encoding="utf-8").read()
+
+    def _crash(self: Any) -> None:
+        raise KeyboardInterrupt  # Процесс прерван до записи контрольной точки
+
+    with monkeypatch.context() as patch:
+        patch.setattr(tournament.Tournament, "save", _crash)
+        try:
+            cup.run()
+        except KeyboardInterrupt:
+            pass
+    # Контрольная точка осталась до матча, хранилища — уже с матчем
+    assert open(tournament.checkpoint_path("cup"), encoding="utf-8").read() == saved_checkpoint
+
+    resumed = tournament.Tournament.load("cup")
+    resumed.run()
+    profiles = ProfileStore.load(config.profiles_file)
+    games = [profiles.get_or_create_ai(level).games for level in ("easy", "normal")]
+    assert games == [10, 10]
+    ratings = RatingStore.load(config.ratings_file)
+    assert [int(ratings.ratings[ProfileStore.ai_id(level)][3]) for level in ("easy", "normal")] == [10, 10]
+    assert resumed.games_played == 10
+
+
+def test_checkpoint_and_history_follow_settings(data_dir: Any, monkeypatch: Any) -> None:
+    """Контрольная точка лежит рядом с файлами данных, история ограничена max_games из настроек."""
+    data = data_dir / "data"
+    data.mkdir()
+    monkeypatch.setenv("TTT_HISTORY_FILE", str(data / "history.json"))
+    monkeypatch.setenv("TTT_MAX_GAMES", "5")
+    settings.load([])
+
+    result = tournament.run_match((0, "easy", "normal", 12, 3, settings.get().max_games))
+    assert len(result["records"]) == 5
+    assert tournament.checkpoint_path("cup") == str(data / "tournament_cup.json")
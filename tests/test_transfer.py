@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+# Тесты импорта и экспорта истории
+
+# Импортируем необходимые модули
+from types import SimpleNamespace  # Настройки без файла settings
+from typing import Any, Dict, List  # Для указания типов данных
+
+import pytest  # Параметризация по форматам
+
+import archive  # Архив истории
+from analytics import HistoryAnalytics  # Кэш сводок статистики
+import transfer  # Проверяемый модуль
+from history_store import iter_history  # Быстрое хранилище
+from profiles import ProfileStore  # Профили игроков
+from storage import atomic_write_json  # Запись истории
+
+# Январь 2024 года по UTC
+BASE: int = 1704067200
+
+
+def _legacy_records(count: int) -> List[Dict[str, Any]]:
+    """Старые записи без идентификатора: дата строкой, у части нет победителя."""
+    records = []
+    for i in range(count):
+        record: Dict[str, Any] = {
+            "date": f"2024-01-{1 + i // 24:02d} {i % 24:02d}:00:00",
+            "result": "Ничья" if i % 3 == 0 else "Победа X",
+            "difficulty": "Средний",
+        }
+        if i % 3:
+            record["winner"] = "X"
+        records.append(record)
+    return records
+
+
+def _config(tmp_path: Any) -> SimpleNamespace:
+    """Настройки с файлами во временном каталоге."""
+    return SimpleNamespace(history_file=str(tmp_path / "history.json"),
+                           archive_dir=str(tmp_path / "archive"),
+                           rollups_file=str(tmp_path / "rollups.json"),
+                           max_days=100000, max_games=20)
+
+
+def _import(path: str, fmt: str, config: SimpleNamespace, tmp_path: Any) -> Any:
+    """Импортирует файл, как это делает командная строка."""
+    profiles = ProfileStore.load(str(tmp_path / "profiles.json"))
+    mapper = transfer.ProfileMapper(profiles, {})
+    return transfer.import_history(path, fmt, config, profiles, mapper)
+
+
+@pytest.mark.parametrize("fmt", transfer.FORMATS)
+def test_export_import_same_machine_adds_nothing(tmp_path: Any, fmt: str) -> None:
+    """Экспорт и повторный импорт на той же машине не удваивает историю."""
+    config = _config(tmp_path)
+    atomic_write_json(config.history_file, _legacy_records(64))
+    path = str(tmp_path / f"export.{fmt}")
+    transfer.write_records(archive.iter_all_history(config.history_file, config.archive_dir), path, fmt)
+
+    assert _import(path, fmt, config, tmp_path) == (0, 64)
+    assert len(list(archive.iter_all_history(config.history_file, config.archive_dir))) == 64
+
+
+def test_import_splits_archive_and_hot_store(tmp_path: Any) -> None:
+    """Новые партии вливаются по порядку дат: старые в архив, хвост — в быстрое хранилище."""
+    config = _config(tmp_path)
+    source = tmp_path / "source.jsonl"
+    records = [{"id": f"g{i}", "date": BASE + i * 3600, "result": "Ничья", "winner": ""} for i in range(50)]
+    transfer.write_records(records, str(source), "jsonl")
+
+    assert _import(str(source), "jsonl", config, tmp_path) == (50, 0)
+    assert [r["id"] for r in iter_history(config.history_file)] == [f"g{i}" for i in range(30, 50)]
+    merged = list(archive.iter_all_history(config.history_file, config.archive_dir))
+    assert [r["id"] for r in merged] == [f"g{i}" for i in range(50)]
+    # Повторный импорт того же файла ничего не добавляет
+    assert _import(str(source), "jsonl", config, tmp_path) == (0, 50)
+
+
+def test_import_of_older_games_rebuilds_rollups(tmp_path: Any) -> None:
+    """Партии старше водяного знака сводок попадают в статистику после импорта."""
+    config = _config(tmp_path)
+    recent = [{"id": f"r{i}", "date": BASE + 86400 * 30 + i, "result": "Ничья", "winner": ""} for i in range(5)]
+    atomic_write_json(config.history_file, recent)
+    analytics = HistoryAnalytics()
+    analytics.refresh(iter_history(config.history_file))
+    analytics.save(config.rollups_file)
+
+    source = tmp_path / "old.jsonl"
+    older = [{"id": f"o{i}", "date": BASE + i, "result": "Победа X", "winner": "X"} for i in range(3)]
+    transfer.write_records(older, str(source), "jsonl")
+    assert _import(str(source), "jsonl", config, tmp_path) == (3, 0)
+
+    rebuilt = HistoryAnalytics.load(config.rollups_file)
+    assert sum(rollup.games for rollup in rebuilt.days.values()) == 8
+    assert rebuilt.watermark == recent[-1]["date"]
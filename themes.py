@@ -0,0 +1,56 @@
+# -*- coding: utf-8 -*-
+# Цветовые темы интерфейса игры "Крестики-нолики"
+# Отдельный модуль, чтобы настройки могли проверять ключ темы без импорта интерфейса
+
+# Импортируем необходимые модули
+from typing import Dict  # Для указания типов данных
+
+# Цветовые темы интерфейса
+THEMES: Dict[str, Dict[str, str]] = {
+    "light": {
+        "bg": "#f0f0f0",  # Цвет фона окна
+        "btn_bg": "#ffffff",  # Цвет фона кнопок
+        "btn_fg": "#000000",  # Цвет текста кнопок
+        "highlight": "#90ee90",  # Цвет победной линии
+        "text_highlight": "#006400",  # Цвет текста на победной линии
+        "title": "Светлая",  # Название темы для меню
+    },
+    "dark": {
+        "bg": "#2e2e2e",  # Темный фон
+        "btn_bg": "#444444",  # Темные кнопки
+        "btn_fg": "#ffffff",  # Белый текст
+        "highlight": "#32cd32",  # Зеленая подсветка
+        "text_highlight": "#98fb98",  # Светло-зеленый текст
+        "title": "Тёмная",  # Название темы
+    },
+    "neon_night": {
+        "bg": "#000000",  # Черный фон
+        "btn_bg": "#111111",  # Очень темные кнопки
+        "btn_fg": "#00ff88",  # Неоново-зеленый текст
+        "highlight": "#00ffcc",  # Бирюзовая подсветка
+        "text_highlight": "#00ffff",  # Голубой текст
+        "border": "#00ff88",  # Цвет границ кнопок
+        "glow": "#00ff88",  # Цвет свечения уведомлений
+        "title": "Ночной неон",  # Название темы
+    },
+    "neon_day": {
+        "bg": "#e0ffe0",  # Светло-зеленый фон
+        "btn_bg": "#ffffff",  # Белые кнопки
+        "btn_fg": "#ff0066",  # Розовый текст
+        "highlight": "#ff66cc",  # Розовая подсветка
+        "text_highlight": "#ff00aa",  # Ярко-розовый текст
+        "border": "#ff0066",  # Розовые границы
+        "glow": "#ff0066",  # Розовое свечение
+        "title": "Дневной неон",  # Название темы
+    },
+    "cosmos": {
+        "bg": "#0a0020",  # Темно-синий фон (космос)
+        "btn_bg": "#1a0a3a",  # Фиолетовые кнопки
+        "btn_fg": "#00aaff",  # Голубой текст
+        "highlight": "#00ffff",  # Бирюзовая подсветка
+        "text_highlight": "#ff9900",  # Оранжевый текст
+        "border": "#5500ff",  # Фиолетовые границы
+        "glow": "#0077ff",  # Синее свечение
+        "title": "Космос",  # Название темы
+    },
+}
@@ -0,0 +1,113 @@
+# -*- coding: utf-8 -*-
+# Индекс угроз для игры "Крестики-нолики"
+# Для каждой линии хранится, сколько знаков в ней у каждого игрока.
+# Индекс обновляется за O(1) на каждый ход, поэтому выигрышные ходы,
+# блокировки и вилки находятся без перебора клеток и полных проверок поля.
+
+# Импортируем необходимые модули
+from typing import Dict, List, Set, Tuple  # Для указания типов данных
+
+import engine  # Выигрышные линии и представление поля
+
+# Линии, проходящие через каждую клетку: клетка -> индексы линий
+LINES_OF_CELL: Tuple[Tuple[int, ...], ...] = tuple(
+    tuple(n for n, line in enumerate(engine.WIN_LINES) if cell in line) for cell in range(9)
+)
+
+
+class ThreatIndex:
+    """Инкрементальный индекс линий: счетчики знаков и открытые линии игроков.
+
+    Открытая линия игрока — линия без знаков соперника. Линия с двумя
+    знаками игрока — немедленная угроза, с одним — заготовка для вилки.
+    """
+
+    __slots__ = ("board", "counts", "open1", "open2", "cell_open1")
+
+    def __init__(self) -> None:
+        """Создает индекс пустого поля."""
+        # Текущее поле ("" — пустая клетка)
+        self.board: List[str] = [""] * 9
+        # Количество знаков в каждой линии: игрок -> [счетчик по линиям]
+        self.counts: Dict[str, List[int]] = {"X": [0] * 8, "O": [0] * 8}
+        # Открытые линии с одним знаком игрока
+        self.open1: Dict[str, Set[int]] = {"X": set(), "O": set()}
+        # Открытые линии с двумя знаками игрока (угроза победы)
+        self.open2: Dict[str, Set[int]] = {"X": set(), "O": set()}
+        # Сколько открытых линий с одним знаком игрока проходит через клетку
+        self.cell_open1: Dict[str, List[int]] = {"X": [0] * 9, "O": [0] * 9}
+
+    @classmethod
+    def from_board(cls, board: str) -> "ThreatIndex":
+        """Строит индекс по строке поля движка."""
+        index = cls()
+        for cell, symbol in enumerate(board):
+            if symbol in ("X", "O"):
+                index.play(cell, symbol)
+        return index
+
+    def _update_line(self, line: int, player: str, sign: int) -> None:
+        """Убирает (sign=-1) или добавляет (sign=+1) линию в наборы игрока."""
+        if self.counts[engine.other(player)][line]:
+            return  # Линия закрыта соперником
+        own = self.counts[player][line]
+        if own == 1:
+            if sign > 0:
+                self.open1[player].add(line)
+            else:
+                self.open1[player].discard(line)
+            for cell in engine.WIN_LINES[line]:
+                self.cell_open1[player][cell] += sign
+        elif own == 2:
+            if sign > 0:
+                self.open2[player].add(line)
+            else:
+                self.open2[player].discard(line)
+
+    def _apply(self, cell: int, player: str, delta: int) -> None:
+        """Меняет счетчики линий клетки (не более 4 линий)."""
+        for line in LINES_OF_CELL[cell]:
+            # Снимаем старое состояние линии для обоих игроков
+            self._update_line(line, "X", -1)
+            self._update_line(line, "O", -1)
+            self.counts[player][line] += delta
+            # Учитываем новое состояние
+            self._update_line(line, "X", +1)
+            self._update_line(line, "O", +1)
+
+    def play(self, cell: int, player: str) -> None:
+        """Учитывает ход игрока."""
+        self.board[cell] = player
+        self._apply(cell, player, +1)
+
+    def undo(self, cell: int) -> None:
+        """Отменяет ход в клетке."""
+        player = self.board[cell]
+        if not player:
+            return
+        self._apply(cell, player, -1)
+        self.board[cell] = ""
+
+    def empty_in_line(self, line: int) -> List[int]:
+        """Пустые клетки линии."""
+        return [cell for cell in engine.WIN_LINES[line] if not self.board[cell]]
+
+    def winning_cells(self, player: str) -> Set[int]:
+        """Клетки, ход в которые сразу выигрывает партию."""
+        return {self.empty_in_line(line)[0] for line in self.open2[player]}
+
+    def fork_cells(self, player: str) -> Set[int]:
+        """Пустые клетки, ход в которые создает две угрозы одновременно."""
+        counters = self.cell_open1[player]
+        return {cell for cell in range(9) if counters[cell] >= 2 and not self.board[cell]}
+
+    def forcing_moves(self, player: str) -> Dict[int, int]:
+        """Ходы, создающие одну угрозу: клетка хода -> клетка вынужденной защиты."""
+        moves: Dict[int, int] = {}
+        for line in self.open1[player]:
+            empty = self.empty_in_line(line)
+            if len(empty) == 2:
+                first, second = empty
+                moves.setdefault(first, second)
+                moves.setdefault(second, first)
+        return moves
@@ -0,0 +1,178 @@
+# -*- coding: utf-8 -*-
+# Время ходов игры "Крестики-нолики"
+# Гистограммы в духе HdrHistogram: значения (микросекунды) раскладываются по
+# логарифмическим корзинам с постоянной относительной точностью (~1.6%),
+# поэтому память не зависит от числа ходов, а перцентили p50/p95/p99
+# считаются за один проход по корзинам.
+#
+# Приложение ведет гистограммы в памяти (обдумывание хода человеком, расчет
+# хода ИИ по уровням, задержка анимации), а время каждого хода записывается
+# в историю (поле "move_ms"). Отчет по всей истории:
+#     python timing.py
+
+# Импортируем необходимые модули
+from typing import Any, Dict, Iterable, List, Optional, Tuple  # Для указания типов данных
+import argparse  # Для разбора аргументов командной строки
+
+from archive import iter_all_history  # Потоковое чтение архива и истории
+from profiles import AI_PREFIX  # Префикс профилей ИИ
+
+# Битов точности корзины: значения от 2**SUB_BITS различаются не более чем на 1/2**(SUB_BITS-1)
+SUB_BITS: int = 7
+
+# Перцентили отчета
+PERCENTILES: Tuple[float, ...] = (50.0, 95.0, 99.0)
+
+# Ключи гистограмм
+HUMAN_KEY: str = "human"  # Обдумывание хода человеком
+ANIMATION_KEY: str = "ui:animation"  # Опоздание последнего кадра анимации хода
+
+
+def ai_key(difficulty: str) -> str:
+    """Ключ гистограммы расчета хода ИИ уровня difficulty."""
+    return AI_PREFIX + difficulty
+
+
+class LogHistogram:
+    """Гистограмма с логарифмическими корзинами (значения в микросекундах)."""
+
+    __slots__ = ("buckets", "count", "total", "min", "max")
+
+    def __init__(self) -> None:
+        """Создает пустую гистограмму."""
+        self.buckets: Dict[int, int] = {}  # Номер корзины -> количество значений
+        self.count: int = 0
+        self.total: int = 0  # Сумма значений (для среднего)
+        self.min: int = 0
+        self.max: int = 0
+
+    @staticmethod
+    def bucket_of(value: int) -> int:
+        """Номер корзины значения.
+
+        Значения меньше 2**SUB_BITS хранятся точно, большие — по старшим
+        SUB_BITS битам (экспонента и мантисса, как в HdrHistogram).
+        """
+        if value < 1 << SUB_BITS:
+            return value
+        shift = value.bit_length() - SUB_BITS
+        half = 1 << (SUB_BITS - 1)
+        return (1 << SUB_BITS) + (shift - 1) * half + (value >> shift) - half
+
+    @staticmethod
+    def bucket_value(index: int) -> int:
+        """Наибольшее значение, попадающее в корзину index."""
+        if index < 1 << SUB_BITS:
+            return index
+        half = 1 << (SUB_BITS - 1)
+        shift, offset = divmod(index - (1 << SUB_BITS), half)
+        shift += 1
+        return ((offset + half + 1) << shift) - 1
+
+    def record(self, value_us: int) -> None:
+        """Добавляет значение (микросекунды, отрицательные считаются нулем)."""
+        value = max(0, int(value_us))
+        index = self.bucket_of(value)
+        self.buckets[index] = self.buckets.get(index, 0) + 1
+        if not self.count or value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+        self.count += 1
+        self.total += value
+
+    def record_ms(self, value_ms: float) -> None:
+        """Добавляет значение в миллисекундах."""
+        self.record(round(value_ms * 1000))
+
+    def percentiles(self, points: Iterable[float] = PERCENTILES) -> List[int]:
+        """Значения перцентилей (микросекунды) за один проход по корзинам.
+
+        Args:
+            points: Перцентили по возрастанию (0-100)
+
+        Returns:
+            Значения в порядке points (0 для пустой гистограммы)
+        """
+        result = []
+        targets = [max(1, -(-self.count * p // 100)) for p in points]  # Ранг: ceil(count * p / 100)
+        seen = 0
+        buckets = iter(sorted(self.buckets.items()))
+        index = 0
+        for target in targets:
+            if not self.count:
+                result.append(0)
+                continue
+            while seen < target:
+                index, count = next(buckets)
+                seen += count
+            # Верхняя граница корзины, но не больше настоящего максимума
+            result.append(min(self.bucket_value(index), self.max))
+        return result
+
+    @property
+    def mean(self) -> float:
+        """Среднее значение (микросекунды)."""
+        return self.total / self.count if self.count else 0.0
+
+
+class MoveTimings:
+    """Набор гистограмм по ключам (человек, уровни ИИ, анимация)."""
+
+    def __init__(self) -> None:
+        """Создает пустой набор."""
+        self.histograms: Dict[str, LogHistogram] = {}
+
+    def record_ms(self, key: str, value_ms: float) -> None:
+        """Добавляет время в гистограмму key."""
+        histogram = self.histograms.get(key)
+        if histogram is None:
+            histogram = self.histograms[key] = LogHistogram()
+        histogram.record_ms(value_ms)
+
+    def add_game(self, record: Dict[str, Any]) -> None:
+        """Добавляет времена ходов записи истории (если они записаны)."""
+        times = record.get("move_ms")
+        players = record.get("players")
+        if not isinstance(times, list) or not isinstance(players, dict):
+            return
+        difficulty = str(record.get("difficulty", ""))
+        # Обдумывание в других вариантах игры считается отдельно
+        human = f"{HUMAN_KEY}:{record['variant']}" if record.get("variant") else HUMAN_KEY
+        for ply, value in enumerate(times):
+            player_id = str(players.get("X" if ply % 2 == 0 else "O", ""))
+            key = ai_key(difficulty) if player_id.startswith(AI_PREFIX) else human
+            self.record_ms(key, float(value))
+
+    def report_lines(self) -> List[str]:
+        """Строки отчета: количество, p50/p95/p99, максимум (мс)."""
+        lines = [f"{'Ключ':<16}{'Ходы':>7}{'p50':>9}{'p95':>9}{'p99':>9}{'макс':>9}"]
+        for key in sorted(self.histograms):
+            histogram = self.histograms[key]
+            p50, p95, p99 = (value / 1000 for value in histogram.percentiles())
+            lines.append(
+                f"{key:<16}{histogram.count:>7}{p50:>9.1f}{p95:>9.1f}{p99:>9.1f}{histogram.max / 1000:>9.1f}"
+            )
+        return lines
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Выводит перцентили времени ходов по всей истории."""
+    import settings  # Импорт здесь: настройки нужны только командной строке
+
+    parser = argparse.ArgumentParser(description="Время ходов по истории игр (мс)")
+    parser.add_argument("--history", default=None, help="Файл истории (по умолчанию из настроек)")
+    args = parser.parse_args(argv)
+
+    config = settings.load([])
+    timings = MoveTimings()
+    for record in iter_all_history(args.history or config.history_file, config.archive_dir):
+        timings.add_game(record)
+    if not timings.histograms:
+        print("В истории нет партий со временем ходов.")
+        return
+    print("\n".join(timings.report_lines()))
+
+
+if __name__ == "__main__":
+    main()
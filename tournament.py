@@ -0,0 +1,399 @@
+# -*- coding: utf-8 -*-
+# Турниры стратегий ИИ для игры "Крестики-нолики" (без графического интерфейса)
+# Круговая система или швейцарская система, матчи выполняются в пуле процессов,
+# прогресс сохраняется в контрольную точку, поэтому прерванный турнир можно продолжить.
+# Результаты попадают в те же хранилища истории, профилей и рейтингов, что и у игры.
+#
+# Примеры:
+#     python tournament.py --name cup --players easy normal tricky strong hard --games 1000 --workers 4
+#     python tournament.py --name swiss --format swiss --rounds 4 --players easy normal tricky strong hard
+#     python tournament.py --name cup --resume
+
+# Импортируем необходимые модули
+from typing import Any, Dict, List, Optional, Tuple  # Для указания типов данных
+import argparse  # Для разбора аргументов командной строки
+import json  # Для контрольной точки
+import math  # Для количества туров швейцарской системы
+import multiprocessing  # Для пула процессов
+import os  # Для атомарной записи контрольной точки
+import time  # Для замера производительности
+
+from archive import store_history  # Хранилище истории с архивом вытесненных записей
+from profiles import AI_PREFIX, ProfileStore  # Профили игроков и префикс профилей ИИ
+from ratings import RatingStore  # Рейтинги
+import settings  # Пути к файлам и ограничения хранения
+from simulator import derive_seed, new_seed, play_game  # Партии с детерминированными зернами
+
+# Ключ "сложности" для партий турнира в профилях и истории
+TOURNAMENT_KEY: str = "tournament"
+
+# Сколько завершенных матчей сохранять за одну запись контрольной точки
+CHECKPOINT_EVERY: int = 8
+
+
+def checkpoint_path(name: str) -> str:
+    """Путь к файлу контрольной точки турнира (рядом с файлами данных из настроек)."""
+    directory = os.path.dirname(settings.get().history_file)
+    return os.path.join(directory, f"tournament_{name}.json")
+
+
+def round_robin(players: List[str]) -> List[List[Tuple[str, str]]]:
+    """Расписание круговой системы (метод вращения).
+
+    Args:
+        players: Участники
+
+    Returns:
+        Список туров, каждый тур — список пар (участник, участник)
+    """
+    slots: List[Optional[str]] = list(players)
+    if len(slots) % 2:
+        slots.append(None)  # Свободный от игры участник в туре
+    rounds = []
+    for _ in range(len(slots) - 1):
+        half = len(slots) // 2
+        pairs = [
+            (slots[i], slots[-1 - i]) for i in range(half)
+            if slots[i] is not None and slots[-1 - i] is not None
+        ]
+        rounds.append(pairs)
+        # Первый участник неподвижен, остальные сдвигаются по кругу
+        slots = [slots[0], slots[-1]] + slots[1:-1]
+    return rounds
+
+
+def swiss_pairs(standings: Dict[str, List[float]], played: Dict[str, List[str]],
+                byes: List[str]) -> Tuple[List[Tuple[str, str]], Optional[str]]:
+    """Пары очередного тура швейцарской системы.
+
+    Участники с близким количеством очков играют друг с другом,
+    повторные встречи по возможности исключаются. При нечетном числе
+    участников свободен самый слабый из тех, кто еще не пропускал тур.
+
+    Args:
+        standings: Участник -> [очки, победы, поражения, ничьи]
+        played: Участник -> список уже сыгранных соперников
+        byes: Участники, уже пропускавшие тур
+
+    Returns:
+        Кортеж (пары тура, свободный участник или None)
+    """
+    order = sorted(standings, key=lambda p: (-standings[p][0], p))
+    bye = None
+    if len(order) % 2:
+        bye = next((p for p in reversed(order) if p not in byes), order[-1])
+        order.remove(bye)
+    pairs = []
+    while len(order) > 1:
+        first = order.pop(0)
+        # Ближайший по очкам соперник, с которым еще не играли
+        opponent = next((p for p in order if p not in played[first]), order[0])
+        order.remove(opponent)
+        pairs.append((first, opponent))
+    return pairs, bye
+
+
+def run_match(task: Tuple[int, str, str, int, int, int]) -> Dict[str, Any]:
+    """Играет матч в рабочем процессе.
+
+    Цвета чередуются: в четных партиях первый участник играет за X.
+
+    Args:
+        task: (номер матча, участник A, участник B, партий, зерно матча,
+            максимум партий в истории)
+
+    Returns:
+        Итоги матча и компактный поток результатов партий
+    """
+    match_no, first, second, games, match_seed, max_games = task
+    # Результаты партий: символ победителя ("A", "B" или "-") и длина партии
+    outcomes: List[str] = []
+    lengths: List[int] = []
+    records: List[Dict[str, Any]] = []
+    for game_no in range(games):
+        x_level, o_level = (first, second) if game_no % 2 == 0 else (second, first)
+        record = play_game(x_level, o_level, derive_seed(match_seed, game_no))
+        winner = record["winner"]
+        if winner:
+            outcomes.append("A" if (winner == "X") == (x_level == first) else "B")
+        else:
+            outcomes.append("-")
+        lengths.append(len(record["moves"]))
+        # Полные записи нужны только для последних партий (история ограничена)
+        if games - game_no <= max_games:
+            record["id"] = f"t{match_seed:x}-{game_no}"
+            records.append(record)
+    return {
+        "match": match_no, "a": first, "b": second,
+        "outcomes": "".join(outcomes), "lengths": lengths, "records": records,
+    }
+
+
+class Tournament:
+    """Состояние турнира: расписание, таблица, личные встречи и контрольная точка."""
+
+    def __init__(self, name: str, players: List[str], fmt: str = "roundrobin",
+                 games: int = 100, rounds: int = 0, seed: Optional[int] = None) -> None:
+        """Создает новый турнир.
+
+        Args:
+            name: Имя турнира (используется в имени файла контрольной точки)
+            players: Ключи стратегий ИИ из ai_registry
+            fmt: "roundrobin" или "swiss"
+            games: Партий в каждом матче
+            rounds: Количество туров швейцарской системы (0 — автоматически)
+            seed: Главное зерно турнира
+        """
+        if len(set(players)) < 2:
+            raise ValueError("Нужно минимум два разных участника")
+        if fmt not in ("roundrobin", "swiss"):
+            raise ValueError(f"Неизвестная система турнира: {fmt}")
+        self.name: str = name
+        self.players: List[str] = list(dict.fromkeys(players))
+        self.format: str = fmt
+        self.games: int = games
+        self.rounds: int = rounds or math.ceil(math.log2(len(self.players)))
+        self.seed: int = new_seed() if seed is None else seed
+        # Таблица: участник -> [очки, победы, поражения, ничьи]
+        self.standings: Dict[str, List[float]] = {p: [0.0, 0, 0, 0] for p in self.players}
+        # Личные встречи: участник -> соперник -> [победы, поражения, ничьи]
+        self.head_to_head: Dict[str, Dict[str, List[int]]] = {p: {} for p in self.players}
+        # Завершенные матчи и номер текущего тура
+        self.done: List[int] = []
+        self.round_no: int = 0
+        # Пары и свободный участник текущего тура (для швейцарской системы)
+        self.current_pairs: List[Tuple[str, str]] = []
+        self.current_bye: Optional[str] = None
+        # Участники, уже пропускавшие тур (свободный участник получает очко)
+        self.byes: List[str] = []
+        # Статистика производительности
+        self.games_played: int = 0
+        self.elapsed: float = 0.0
+        # Записи истории, еще не сохраненные на диск
+        self.pending_history: List[Dict[str, Any]] = []
+
+    def round_pairs(self) -> List[Tuple[str, str]]:
+        """Пары текущего тура (или пустой список, если турнир окончен)."""
+        if self.format == "roundrobin":
+            schedule = round_robin(self.players)
+            return schedule[self.round_no] if self.round_no < len(schedule) else []
+        if self.round_no >= self.rounds:
+            return []
+        if not self.current_pairs:
+            played = {p: list(self.head_to_head[p]) for p in self.players}
+            self.current_pairs, self.current_bye = swiss_pairs(self.standings, played, self.byes)
+        return self.current_pairs
+
+    def match_key(self, match_no: int) -> str:
+        """Ключ матча в профилях и рейтингах (зерно отличает турниры с одним именем)."""
+        return f"tournament:{self.name}:{self.seed:x}:{match_no}"
+
+    def apply_result(self, result: Dict[str, Any], profiles: ProfileStore, ratings: RatingStore) -> None:
+        """Учитывает итоги матча в таблице, профилях, рейтингах и истории.
+
+        Профили и рейтинги запоминают ключ матча, поэтому матч, записанный
+        в них до сбоя, но не попавший в контрольную точку, при продолжении
+        турнира учитывается только в таблице.
+        """
+        first, second = result["a"], result["b"]
+        key = self.match_key(result["match"])
+        to_profiles, to_ratings = key not in profiles.applied, key not in ratings.applied
+        ai_profiles = {p: profiles.get_or_create_ai(p) for p in (first, second)}
+        ids = {p: profile.id for p, profile in ai_profiles.items()}
+        h2h = self.head_to_head[first].setdefault(second, [0, 0, 0])
+        h2h_back = self.head_to_head[second].setdefault(first, [0, 0, 0])
+
+        for game_no, (outcome, length) in enumerate(zip(result["outcomes"], result["lengths"])):
+            x_level, o_level = (first, second) if game_no % 2 == 0 else (second, first)
+            if outcome == "-":
+                winner = None
+                self.standings[first][0] += 0.5
+                self.standings[second][0] += 0.5
+                self.standings[first][3] += 1
+                self.standings[second][3] += 1
+                h2h[2] += 1
+                h2h_back[2] += 1
+            else:
+                won, lost = (first, second) if outcome == "A" else (second, first)
+                winner = "X" if won == x_level else "O"
+                self.standings[won][0] += 1
+                self.standings[won][1] += 1
+                self.standings[lost][2] += 1
+                (h2h if won == first else h2h_back)[0] += 1
+                (h2h_back if won == first else h2h)[1] += 1
+            # Профили и рейтинги обновляются за O(1) на партию
+            if to_profiles:
+                profiles.record_game(ids[x_level], ids[o_level], winner, TOURNAMENT_KEY, length)
+            if to_ratings:
+                ratings.record_game(ids[x_level], ids[o_level], winner)
+        profiles.applied.add(key)
+        ratings.applied.add(key)
+
+        # Последние партии матча в формате истории игры (пишутся вместе с контрольной точкой)
+        now = int(time.time())
+        self.pending_history.extend([
+            {
+                "date": now,
+                "result": f"Победа: {ai_profiles[r['players'][r['winner']][len(AI_PREFIX):]].name}" if r["winner"] else "Ничья",
+                "id": r["id"],
+                "players": r["players"],
+                "winner": r["winner"],
+                "difficulty": TOURNAMENT_KEY,
+                "length": len(r["moves"]),
+                "moves": r["moves"],
+                "seed": r["seed"],
+            }
+            for r in result["records"]
+        ])
+        self.games_played += len(result["outcomes"])
+        self.done.append(result["match"])
+
+    def run(self, workers: int = 1) -> None:
+        """Играет все оставшиеся туры, сохраняя контрольные точки."""
+        config = settings.get()
+        profiles = ProfileStore.load(config.profiles_file)
+        ratings = RatingStore.load(config.ratings_file)
+        pool = multiprocessing.Pool(workers) if workers > 1 else None
+        try:
+            while True:
+                pairs = self.round_pairs()
+                if not pairs:
+                    break
+                # Матчи тура нумеруются по порядку, чтобы пропускать уже сыгранные
+                base = self.round_no * len(self.players)
+                tasks = [
+                    (base + i, a, b, self.games, derive_seed(self.seed, base + i), config.max_games)
+                    for i, (a, b) in enumerate(pairs) if base + i not in self.done
+                ]
+                started = time.perf_counter()
+                results = pool.imap_unordered(run_match, tasks) if pool else map(run_match, tasks)
+                for count, result in enumerate(results, 1):
+                    self.apply_result(result, profiles, ratings)
+                    if count % CHECKPOINT_EVERY == 0:
+                        self.elapsed += time.perf_counter() - started
+                        started = time.perf_counter()
+                        self.save_stores(profiles, ratings)
+                self.elapsed += time.perf_counter() - started
+                # Тур завершен
+                if self.current_bye is not None:
+                    self.standings[self.current_bye][0] += 1
+                    self.byes.append(self.current_bye)
+                self.round_no += 1
+                self.current_pairs = []
+                self.current_bye = None
+                self.save_stores(profiles, ratings)
+        finally:
+            if pool is not None:
+                pool.close()
+                pool.join()
+
+    def save_stores(self, profiles: ProfileStore, ratings: RatingStore) -> None:
+        """Сохраняет профили, рейтинги, историю и контрольную точку турнира.
+
+        Контрольная точка пишется последней; матчи, уже записанные в профили
+        и рейтинги до прерывания, повторно в них не учитываются (см. apply_result),
+        а записи истории с теми же идентификаторами не добавляются дважды.
+        """
+        config = settings.get()
+        if self.pending_history:
+            # Вытесненные записи (в том числе партии людей) переносятся в архив, а не удаляются
+            store_history(self.pending_history, config.history_file, config.archive_dir,
+                          config.max_days, config.max_games)
+            self.pending_history = []
+        profiles.save(config.profiles_file)
+        ratings.save(config.ratings_file)
+        self.save()
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Состояние турнира для контрольной точки."""
+        return {
+            "name": self.name, "players": self.players, "format": self.format,
+            "games": self.games, "rounds": self.rounds, "seed": self.seed,
+            "standings": self.standings, "head_to_head": self.head_to_head,
+            "done": self.done, "round_no": self.round_no, "current_pairs": self.current_pairs,
+            "current_bye": self.current_bye, "byes": self.byes,
+            "games_played": self.games_played, "elapsed": self.elapsed,
+        }
+
+    def save(self) -> None:
+        """Атомарно записывает контрольную точку (через временный файл)."""
+        path = checkpoint_path(self.name)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, name: str) -> "Tournament":
+        """Восстанавливает турнир из контрольной точки."""
+        with open(checkpoint_path(name), "r", encoding="utf-8") as f:
+            data = json.load(f)
+        tournament = cls(data["name"], data["players"], data["format"],
+                         int(data["games"]), int(data["rounds"]), int(data["seed"]))
+        tournament.standings = data["standings"]
+        tournament.head_to_head = data["head_to_head"]
+        tournament.done = [int(x) for x in data["done"]]
+        tournament.round_no = int(data["round_no"])
+        tournament.current_pairs = [tuple(pair) for pair in data.get("current_pairs", [])]
+        tournament.current_bye = data.get("current_bye")
+        tournament.byes = list(data.get("byes", []))
+        tournament.games_played = int(data.get("games_played", 0))
+        tournament.elapsed = float(data.get("elapsed", 0.0))
+        return tournament
+
+    def report(self) -> str:
+        """Итоговая таблица, личные встречи и производительность."""
+        order = sorted(self.players, key=lambda p: (-self.standings[p][0], p))
+        lines = [f"Турнир {self.name} ({self.format}), партий: {self.games_played}", ""]
+        lines.append(f"{'#':>3} {'Участник':<10}{'Очки':>9}{'В':>7}{'П':>7}{'Н':>7}")
+        for place, player in enumerate(order, 1):
+            points, wins, losses, draws = self.standings[player]
+            lines.append(f"{place:>3} {player:<10}{points:>9.1f}{int(wins):>7}{int(losses):>7}{int(draws):>7}")
+
+        lines.append("")
+        lines.append("Личные встречи (победы-поражения-ничьи по строке):")
+        lines.append(" " * 10 + "".join(f"{p:>16}" for p in order))
+        for player in order:
+            cells = []
+            for opponent in order:
+                score = self.head_to_head[player].get(opponent)
+                cells.append(f"{'-'.join(str(x) for x in score) if score else '·':>16}")
+            lines.append(f"{player:<10}" + "".join(cells))
+
+        rate = self.games_played / self.elapsed if self.elapsed else 0.0
+        lines.append("")
+        lines.append(f"Время: {self.elapsed:.2f} с, {rate:.0f} партий/с")
+        return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Запускает новый турнир или продолжает прерванный."""
+    parser = argparse.ArgumentParser(description="Турнир стратегий ИИ")
+    parser.add_argument("--name", required=True, help="Имя турнира")
+    parser.add_argument("--players", nargs="+", help="Ключи стратегий ИИ")
+    parser.add_argument("--format", choices=["roundrobin", "swiss"], default="roundrobin")
+    parser.add_argument("--games", type=int, default=100, help="Партий в матче")
+    parser.add_argument("--rounds", type=int, default=0, help="Туров (швейцарская система)")
+    parser.add_argument("--seed", type=int, default=None, help="Главное зерно")
+    parser.add_argument("--workers", type=int, default=1, help="Количество процессов")
+    parser.add_argument("--resume", action="store_true", help="Продолжить с контрольной точки")
+    args = parser.parse_args(argv)
+
+    if args.resume:
+        tournament = Tournament.load(args.name)
+    else:
+        if not args.players:
+            parser.error("Укажите участников через --players")
+        tournament = Tournament(args.name, args.players, args.format, args.games, args.rounds, args.seed)
+        tournament.save()
+
+    try:
+        tournament.run(args.workers)
+    except KeyboardInterrupt:
+        print(f"Турнир прерван; продолжить: python tournament.py --name {args.name} --resume")
+        return
+    print(tournament.report())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,467 @@
+# -*- coding: utf-8 -*-
+# Импорт и экспорт истории и статистики "Крестики-нолики"
+# Переносит партии между машинами в форматах CSV, JSON Lines и родном
+# (JSON-массив, как tic_tac_toe_history.json). Записи читаются и пишутся
+# потоково: повторы по идентификатору партии отсекаются временной таблицей
+# SQLite на диске, а сортировку по дате выполняет она же, поэтому память
+# не зависит от размера файлов.
+#
+# При импорте новые партии вливаются в архив и быстрое хранилище в порядке
+# дат, профили игроков сопоставляются по идентификатору или имени и
+# пересчитываются только по новым партиям (повторный импорт ничего не
+# удваивает), а счет слотов X/O берется из профилей.
+#
+# Пример:
+#     python transfer.py export games.csv --profiles profiles.json --score score.json
+#     python transfer.py import games.csv --profiles profiles.json --score score.json
+
+# Импортируем необходимые модули
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple  # Для указания типов данных
+from collections import deque  # Хвост истории для быстрого хранилища
+import argparse  # Для разбора аргументов командной строки
+import csv  # Формат CSV
+import hashlib  # Ключ для старых записей без идентификатора
+import heapq  # Слияние двух упорядоченных по дате потоков
+import json  # Форматы JSON Lines и родной
+import os  # Для работы с файловой системой
+import sqlite3  # Временная таблица для отсечения повторов и сортировки
+import tempfile  # Каталог временной базы
+import time  # Для границы хранения истории
+
+import archive  # Архив истории
+from analytics import HistoryAnalytics  # Кэш сводок статистики
+from history_store import SECONDS_PER_DAY, iter_history, iter_json_array, parse_timestamp  # Быстрое хранилище
+from profiles import AI_PREFIX, ProfileStore  # Профили игроков и префикс профилей ИИ
+from storage import FileLock, atomic_write_json, locked_update, read_json  # Блокировки и атомарная запись
+
+# Форматы файлов
+FORMATS: Tuple[str, ...] = ("native", "jsonl", "csv")
+
+# Столбцы CSV; остальные поля записи сохраняются в столбце "extra" как JSON
+CSV_FIELDS: List[str] = [
+    "id", "date", "result", "winner", "difficulty", "length", "moves", "seed", "x", "o", "extra",
+]
+
+# Поля CSV с целыми числами
+_INT_FIELDS: Tuple[str, ...] = ("date", "length", "seed")
+
+# Записей в одной транзакции временной базы
+BATCH_SIZE: int = 1000
+
+
+def detect_format(path: str) -> str:
+    """Формат файла по расширению (.csv, .jsonl; иначе родной)."""
+    if path.endswith(".csv"):
+        return "csv"
+    if path.endswith(".jsonl"):
+        return "jsonl"
+    return "native"
+
+
+def normalize_record(record: Dict[str, Any]) -> Dict[str, Any]:
+    """Запись в виде для сравнения: дата меткой времени, без пустых полей.
+
+    Старые записи хранят дату строкой и могут не иметь поля "winner", а после
+    импорта дата становится числом, а CSV дает пустой "winner" — одна и та же
+    партия должна давать один ключ в любом виде.
+    """
+    result = {key: value for key, value in record.items() if value not in ("", None)}
+    result["date"] = parse_timestamp(record.get("date", 0))
+    return result
+
+
+def record_key(record: Dict[str, Any]) -> str:
+    """Ключ для отсечения повторов: идентификатор партии или хеш старой записи без него."""
+    if record.get("id"):
+        return str(record["id"])
+    data = json.dumps(normalize_record(record), ensure_ascii=False, sort_keys=True)
+    return "sha1:" + hashlib.sha1(data.encode("utf-8")).hexdigest()
+
+
+def _to_csv_row(record: Dict[str, Any]) -> Dict[str, Any]:
+    """Строка CSV для записи истории."""
+    row = {field: record.get(field, "") for field in CSV_FIELDS[:8]}
+    players = record.get("players") or {}
+    row["x"], row["o"] = players.get("X", ""), players.get("O", "")
+    extra = {key: value for key, value in record.items() if key not in CSV_FIELDS and key != "players"}
+    row["extra"] = json.dumps(extra, ensure_ascii=False) if extra else ""
+    return row
+
+
+def _from_csv_row(row: Dict[str, str]) -> Dict[str, Any]:
+    """Запись истории из строки CSV (пустые столбцы пропускаются)."""
+    record: Dict[str, Any] = {}
+    for field in CSV_FIELDS[:8]:
+        value = row.get(field) or ""
+        if value == "" and field != "winner":
+            continue
+        record[field] = int(value) if field in _INT_FIELDS and value.lstrip("-").isdigit() else value
+    if row.get("x") or row.get("o"):
+        record["players"] = {"X": row.get("x", ""), "O": row.get("o", "")}
+    if row.get("extra"):
+        record.update(json.loads(row["extra"]))
+    return record
+
+
+def read_records(path: str, fmt: str) -> Iterator[Dict[str, Any]]:
+    """Потоково читает записи истории из файла.
+
+    Args:
+        path: Файл
+        fmt: Формат ("native", "jsonl" или "csv")
+
+    Yields:
+        Записи истории (не словари пропускаются)
+    """
+    if fmt == "native":
+        for item in iter_json_array(path):
+            if isinstance(item, dict):
+                yield item
+        return
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        if fmt == "csv":
+            for row in csv.DictReader(f):
+                yield _from_csv_row(row)
+            return
+        for line in f:
+            if line.strip():
+                item = json.loads(line)
+                if isinstance(item, dict):
+                    yield item
+
+
+def write_records(records: Iterable[Dict[str, Any]], path: str, fmt: str) -> int:
+    """Потоково записывает записи истории в файл.
+
+    Args:
+        records: Записи
+        path: Файл
+        fmt: Формат ("native", "jsonl" или "csv")
+
+    Returns:
+        Количество записанных записей
+    """
+    count = 0
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        if fmt == "csv":
+            writer = csv.DictWriter(f, fieldnames=CSV_FIELDS)
+            writer.writeheader()
+            for record in records:
+                writer.writerow(_to_csv_row(record))
+                count += 1
+            return count
+        if fmt == "native":
+            f.write("[")
+        for record in records:
+            line = json.dumps(record, ensure_ascii=False)
+            if fmt == "native":
+                line = ("," if count else "") + "\n    " + line
+            else:
+                line += "\n"
+            f.write(line)
+            count += 1
+        if fmt == "native":
+            f.write("\n]\n")
+    return count
+
+
+class ProfileMapper:
+    """Сопоставляет профили другой машины с местными (по id, затем по имени)."""
+
+    def __init__(self, profiles: ProfileStore, remote: Dict[str, Any]) -> None:
+        """Создает сопоставление.
+
+        Args:
+            profiles: Местные профили
+            remote: Данные файла профилей другой машины ({"profiles": [...]})
+        """
+        self.profiles: ProfileStore = profiles
+        self.names: Dict[str, str] = {}  # Идентификатор на другой машине -> имя
+        for item in remote.get("profiles", []) if isinstance(remote, dict) else []:
+            if isinstance(item, dict) and item.get("id"):
+                self.names[str(item["id"])] = str(item.get("name") or item["id"])
+        self.mapping: Dict[str, str] = {}
+
+    def local_id(self, remote_id: str) -> str:
+        """Местный идентификатор игрока (профиль создается при необходимости)."""
+        local = self.mapping.get(remote_id)
+        if local is not None:
+            return local
+        if remote_id.startswith(AI_PREFIX):
+            local = self.profiles.get_or_create_ai(remote_id[len(AI_PREFIX):]).id
+        elif self.profiles.get(remote_id) is not None:
+            local = remote_id
+        else:
+            name = self.names.get(remote_id)
+            profile = self.profiles.find_by_name(name) if name else None
+            if profile is None:
+                # Новый игрок получает местный профиль с тем же именем
+                profile = self.profiles.get_or_create(name or f"Игрок {remote_id[:6]}")
+            local = profile.id
+        self.mapping[remote_id] = local
+        return local
+
+    def map_record(self, record: Dict[str, Any]) -> Dict[str, Any]:
+        """Запись с местными идентификаторами игроков."""
+        players = record.get("players")
+        if isinstance(players, dict):
+            record = dict(record)
+            record["players"] = {key: self.local_id(str(value)) for key, value in players.items()}
+        return record
+
+
+def _outcome_winner(record: Dict[str, Any]) -> Optional[str]:
+    """Символ победителя записи или None для ничьей."""
+    winner = record.get("winner")
+    return winner if winner in ("X", "O") else None
+
+
+class HistoryImport:
+    """Импорт истории: временная база на диске с новыми партиями."""
+
+    def __init__(self, directory: str) -> None:
+        """Создает временную базу в каталоге directory."""
+        self.db = sqlite3.connect(os.path.join(directory, "import.sqlite"))
+        self.db.execute("CREATE TABLE known (key TEXT PRIMARY KEY)")
+        self.db.execute("CREATE TABLE incoming (key TEXT PRIMARY KEY, date INTEGER, data TEXT)")
+        self.db.execute("CREATE INDEX incoming_date ON incoming (date)")
+        self.added: int = 0
+        self.duplicates: int = 0
+
+    def add_known(self, records: Iterable[Dict[str, Any]]) -> None:
+        """Запоминает ключи уже сохраненных партий."""
+        rows = ((record_key(record),) for record in records)
+        with self.db:
+            self.db.executemany("INSERT OR IGNORE INTO known VALUES (?)", rows)
+
+    def add_incoming(self, records: Iterable[Dict[str, Any]], mapper: ProfileMapper) -> None:
+        """Добавляет новые партии, пропуская уже известные и повторы внутри файла."""
+        batch: List[Tuple[str, int, str]] = []
+        for record in records:
+            # Известные партии отсекаются до сопоставления профилей (оно может создать профиль)
+            if record.get("id") and self._is_known(str(record["id"])):
+                self.duplicates += 1
+                continue
+            record = mapper.map_record(record)
+            record["date"] = parse_timestamp(record.get("date", 0))
+            # Ключ записи без идентификатора считается в местном виде, как у сохраненных
+            # (record_key приводит дату и пустые поля к одному виду)
+            key = record_key(record)
+            if not record.get("id") and self._is_known(key):
+                self.duplicates += 1
+                continue
+            batch.append((key, record["date"], json.dumps(record, ensure_ascii=False)))
+            if len(batch) >= BATCH_SIZE:
+                self._insert(batch)
+        self._insert(batch)
+
+    def _is_known(self, key: str) -> bool:
+        """Сохранена ли партия с ключом key."""
+        return self.db.execute("SELECT 1 FROM known WHERE key = ?", (key,)).fetchone() is not None
+
+    def _insert(self, batch: List[Tuple[str, int, str]]) -> None:
+        """Записывает пачку новых партий (повторы внутри файла отсекает ключ таблицы)."""
+        with self.db:
+            for row in batch:
+                if self.db.execute("INSERT OR IGNORE INTO incoming VALUES (?, ?, ?)", row).rowcount:
+                    self.added += 1
+                else:
+                    self.duplicates += 1
+        batch.clear()
+
+    def first_date(self) -> Optional[int]:
+        """Дата самой ранней новой партии."""
+        return self.db.execute("SELECT MIN(date) FROM incoming").fetchone()[0]
+
+    def iter_sorted(self) -> Iterator[Dict[str, Any]]:
+        """Новые партии в порядке дат (сортирует SQLite, а не память)."""
+        for (data,) in self.db.execute("SELECT data FROM incoming ORDER BY date, key"):
+            yield json.loads(data)
+
+    def close(self) -> None:
+        """Закрывает временную базу."""
+        self.db.close()
+
+
+def _date(record: Dict[str, Any]) -> int:
+    """Метка времени записи."""
+    return parse_timestamp(record.get("date", 0))
+
+
+def merge_history(job: HistoryImport, history_path: str, archive_dir: str,
+                  max_days: int, max_games: int) -> Tuple[int, int]:
+    """Вливает новые партии в архив и быстрое хранилище в порядке дат.
+
+    Переписываются только разделы архива начиная с месяца самой ранней новой
+    партии (или самой старой записи быстрого хранилища); в памяти находится
+    лишь хвост из max_games записей для быстрого хранилища.
+
+    Returns:
+        Кортеж (записей в быстром хранилище, записей в переписанных разделах архива)
+    """
+    first = job.first_date()
+    hot = list(iter_history(history_path))  # Не больше max_games записей
+    if hot:
+        first = min(first, _date(hot[0]))
+    from_key = archive.partition_key(first)
+    cutoff = int(time.time()) - max_days * SECONDS_PER_DAY
+    tail: "deque[Dict[str, Any]]" = deque()
+
+    def _existing() -> Iterator[Dict[str, Any]]:
+        """Сохраненные записи начиная с from_key: архив, затем быстрое хранилище."""
+        if archive_dir:
+            # Разделы раньше from_key заканчиваются до его начала и не открываются
+            yield from archive.iter_archive(archive_dir, archive.partition_start(from_key))
+        yield from hot
+
+    def _spill() -> Iterator[Dict[str, Any]]:
+        """Все записи по порядку дат; в архив уходит все, кроме хвоста быстрого хранилища."""
+        for record in heapq.merge(_existing(), job.iter_sorted(), key=_date):
+            tail.append(record)
+            if len(tail) > max_games:
+                yield tail.popleft()
+        while tail and _date(tail[0]) < cutoff:
+            yield tail.popleft()
+
+    archived = 0
+    if archive_dir:
+        archived = archive.write_partitions(archive_dir, from_key, _spill())
+    else:
+        # Без архива вытесненные записи отбрасываются, как при обычной записи истории
+        for _record in _spill():
+            pass
+    atomic_write_json(history_path, list(tail))
+    return len(tail), archived
+
+
+def rebuild_rollups(config: Any, first: int) -> bool:
+    """Пересчитывает кэш сводок, если импорт добавил партии не новее водяного знака.
+
+    Сводки дополняются только записями новее водяного знака, поэтому более
+    ранние импортированные партии иначе никогда не попали бы в статистику.
+
+    Args:
+        config: Настройки (пути истории, архива и сводок)
+        first: Дата самой ранней новой партии
+
+    Returns:
+        True, если кэш пересчитан
+    """
+    if not os.path.exists(config.rollups_file) or first > HistoryAnalytics.load(config.rollups_file).watermark:
+        return False
+    analytics = HistoryAnalytics()
+    analytics.refresh(archive.iter_all_history(config.history_file, config.archive_dir))
+    analytics.save(config.rollups_file)
+    return True
+
+
+def import_history(path: str, fmt: str, config: Any, profiles: ProfileStore,
+                   mapper: ProfileMapper) -> Tuple[int, int]:
+    """Импортирует историю из файла.
+
+    Args:
+        path: Файл с партиями
+        fmt: Формат файла
+        config: Настройки (пути истории, архива и сводок, max_days, max_games)
+        profiles: Местные профили (новые партии учитываются в них)
+        mapper: Сопоставление профилей другой машины
+
+    Returns:
+        Кортеж (новых партий, повторов)
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        job = HistoryImport(directory)
+        try:
+            job.add_known(archive.iter_all_history(config.history_file, config.archive_dir))
+            job.add_incoming(read_records(path, fmt), mapper)
+            if not job.added:
+                return 0, job.duplicates
+            # Порядок блокировок как у записи истории: история, затем архив
+            with FileLock(config.history_file):
+                if config.archive_dir:
+                    os.makedirs(config.archive_dir, exist_ok=True)
+                    with FileLock(archive.index_path(config.archive_dir)):
+                        merge_history(job, config.history_file, config.archive_dir,
+                                      config.max_days, config.max_games)
+                else:
+                    merge_history(job, config.history_file, "", config.max_days, config.max_games)
+            rebuild_rollups(config, job.first_date())
+            # Профили — только по новым партиям, поэтому повторный импорт ничего не удваивает
+            for record in job.iter_sorted():
+                players = record.get("players")
+                if isinstance(players, dict) and "X" in players and "O" in players:
+                    profiles.record_game(players["X"], players["O"], _outcome_winner(record),
+                                         str(record.get("difficulty", "")), int(record.get("length", 0)))
+            return job.added, job.duplicates
+        finally:
+            job.close()
+
+
+def merge_score(path: str, remote: Any, profiles: ProfileStore) -> None:
+    """Обновляет файл счета слотов X/O по профилям.
+
+    Счет слота — победы профиля игрока с этим именем, поэтому слияние
+    с другой машиной идемпотентно. Если местного файла нет, берутся имена
+    из файла другой машины.
+    """
+    remote = remote if isinstance(remote, dict) else {}
+
+    def _merge(disk: Any) -> Dict[str, Any]:
+        data = disk if isinstance(disk, dict) and disk.get("names") else dict(remote)
+        names = {key: str(data.get("names", {}).get(key, f"Игрок {key}")) for key in ("X", "O")}
+        wins = {}
+        for key in ("X", "O"):
+            profile = profiles.find_by_name(names[key])
+            wins[key] = profile.wins if profile else int(data.get("wins", {}).get(key, 0))
+        last_played = max(int(data.get("last_played", 0)), int(remote.get("last_played", 0)))
+        return {"wins": wins, "names": names, "last_played": last_played}
+
+    locked_update(path, _merge, {})
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Экспортирует или импортирует историю, профили и счет."""
+    import settings  # Импорт здесь: настройки нужны только командной строке
+
+    parser = argparse.ArgumentParser(description="Импорт и экспорт истории и статистики")
+    parser.add_argument("command", choices=["export", "import"], help="Действие")
+    parser.add_argument("path", help="Файл партий")
+    parser.add_argument("--format", choices=FORMATS, default=None, help="Формат (по умолчанию по расширению)")
+    parser.add_argument("--profiles", default=None, help="Файл профилей для переноса")
+    parser.add_argument("--score", default=None, help="Файл счета для переноса")
+    parser.add_argument("--from", dest="start", type=archive.parse_day, default=None,
+                        help="Экспорт: начало периода (ГГГГ-ММ-ДД)")
+    parser.add_argument("--to", dest="end", type=archive.parse_day, default=None,
+                        help="Экспорт: конец периода (не включительно)")
+    args = parser.parse_args(argv)
+
+    config = settings.load([])
+    fmt = args.format or detect_format(args.path)
+    started = time.perf_counter()
+
+    if args.command == "export":
+        records = archive.iter_all_history(config.history_file, config.archive_dir, args.start or 0, args.end)
+        count = write_records(records, args.path, fmt)
+        if args.profiles:
+            atomic_write_json(args.profiles, read_json(config.profiles_file, {"profiles": []}))
+        if args.score:
+            atomic_write_json(args.score, read_json(config.score_file, {}))
+        print(f"Экспортировано партий: {count} ({fmt}, {time.perf_counter() - started:.2f} с)")
+        return
+
+    profiles = ProfileStore.load(config.profiles_file)
+    mapper = ProfileMapper(profiles, read_json(args.profiles, {}) if args.profiles else {})
+    try:
+        added, duplicates = import_history(args.path, fmt, config, profiles, mapper)
+    except (OSError, ValueError, KeyError, TypeError, sqlite3.Error) as exc:
+        parser.error(f"ошибка импорта {args.path}: {exc}")
+    profiles.save(config.profiles_file)
+    if args.score:
+        merge_score(config.score_file, read_json(args.score, {}), profiles)
+    print(f"Новых партий: {added}, повторов: {duplicates} ({time.perf_counter() - started:.2f} с)")
+    if added:
+        print("Рейтинги и достижения: python ratings.py; python achievements.py --backfill")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,282 @@
+# -*- coding: utf-8 -*-
+# Движок "Ультимативных крестиков-ноликов" без графического интерфейса
+# Поле 3x3 из малых полей 3x3. Клетка, в которую сделан ход, выбирает малое поле
+# для следующего хода соперника; если оно уже закрыто (выиграно или заполнено),
+# соперник ходит в любое открытое поле. Партию выигрывает тот, кто выиграл
+# три малых поля в ряд (правило то же, что в обычной игре).
+#
+# Каждое малое поле — две 9-битные маски (X и O), выигрыш проверяется по
+# заранее посчитанной таблице на 512 масок. Ход кодируется числом 0-80:
+# номер малого поля * 9 + номер клетки в нем (оба построчно от 0 до 8).
+
+# Импортируем необходимые модули
+from typing import Dict, List, Optional, Tuple  # Для указания типов данных
+import random  # Для выбора среди равных ходов
+import time  # Для ограничения времени поиска
+
+import engine  # Выигрышные линии поля 3x3
+
+# Маска заполненного малого поля
+FULL: int = 0x1FF
+
+# Маски выигрышных линий (бит i — клетка i)
+LINE_MASKS: Tuple[int, ...] = tuple(sum(1 << cell for cell in line) for line in engine.WIN_LINES)
+
+# Таблица выигрыша: маска клеток -> есть ли в ней линия
+WIN_TABLE: Tuple[bool, ...] = tuple(
+    any(mask & line == line for line in LINE_MASKS) for mask in range(FULL + 1)
+)
+
+# Количество установленных битов для масок малого поля
+POPCOUNT: Tuple[int, ...] = tuple(bin(mask).count("1") for mask in range(FULL + 1))
+
+# Оценки поиска
+WIN_SCORE: int = 100000
+# Вес линии по количеству своих знаков (линии с чужим знаком не считаются)
+LINE_WEIGHTS: Tuple[int, ...] = (0, 1, 4, 0)
+# Во сколько раз большое поле важнее малого
+MACRO_WEIGHT: int = 25
+# Бонус за выигранное малое поле
+BOARD_WON: int = 20
+
+# Кэш оценок малого поля: (маска X << 9) | маска O -> оценка для X
+_SUB_SCORES: Dict[int, int] = {}
+
+
+def sub_score(own: int, opp: int) -> int:
+    """Оценка малого поля для владельца own: открытые линии с одним и двумя знаками."""
+    key = (own << 9) | opp
+    cached = _SUB_SCORES.get(key)
+    if cached is not None:
+        return cached
+    score = 0
+    for line in LINE_MASKS:
+        if not opp & line:
+            score += LINE_WEIGHTS[POPCOUNT[own & line]]
+        elif not own & line:
+            score -= LINE_WEIGHTS[POPCOUNT[opp & line]]
+    _SUB_SCORES[key] = score
+    return score
+
+
+def winning_line_of(mask: int) -> Optional[Tuple[int, int, int]]:
+    """Выигрышная линия маски (индексы клеток) или None."""
+    for line, line_mask in zip(engine.WIN_LINES, LINE_MASKS):
+        if mask & line_mask == line_mask:
+            return line
+    return None
+
+
+class UltimateBoard:
+    """Позиция ультимативной игры с ходом и отменой хода за O(1)."""
+
+    __slots__ = ("x", "o", "won_x", "won_o", "closed", "active", "player", "moves", "_undo")
+
+    def __init__(self) -> None:
+        """Создает начальную позицию (X ходит в любое поле)."""
+        # Маски малых полей
+        self.x: List[int] = [0] * 9
+        self.o: List[int] = [0] * 9
+        # Маски большого поля: выигранные X, выигранные O, закрытые поля
+        self.won_x: int = 0
+        self.won_o: int = 0
+        self.closed: int = 0
+        # Поле для следующего хода (-1 — любое открытое)
+        self.active: int = -1
+        self.player: str = "X"
+        self.moves: List[int] = []
+        # Стек отмены: (активное поле до хода, закрытые поля до хода, выигранные до хода)
+        self._undo: List[Tuple[int, int, int]] = []
+
+    @classmethod
+    def from_moves(cls, moves: List[int]) -> "UltimateBoard":
+        """Восстанавливает позицию по списку ходов (ValueError при недопустимом ходе)."""
+        board = cls()
+        for move in moves:
+            if move not in board.legal_moves():
+                raise ValueError(f"Недопустимый ход {move}")
+            board.play(move)
+        return board
+
+    def cell(self, move: int) -> str:
+        """Символ в клетке ("X", "O" или "")."""
+        sub, cell = divmod(move, 9)
+        if self.x[sub] >> cell & 1:
+            return "X"
+        if self.o[sub] >> cell & 1:
+            return "O"
+        return ""
+
+    def winner(self) -> Optional[str]:
+        """Победитель партии или None."""
+        if WIN_TABLE[self.won_x]:
+            return "X"
+        if WIN_TABLE[self.won_o]:
+            return "O"
+        return None
+
+    def is_over(self) -> bool:
+        """Закончена ли партия (победа или все поля закрыты)."""
+        return WIN_TABLE[self.won_x] or WIN_TABLE[self.won_o] or self.closed == FULL
+
+    def open_boards(self) -> List[int]:
+        """Малые поля, в которые можно ходить сейчас."""
+        if self.active >= 0:
+            return [self.active]
+        return [sub for sub in range(9) if not self.closed >> sub & 1]
+
+    def legal_moves(self) -> List[int]:
+        """Допустимые ходы (пусто, если партия закончена)."""
+        if self.is_over():
+            return []
+        moves = []
+        for sub in self.open_boards():
+            free = ~(self.x[sub] | self.o[sub]) & FULL
+            base = sub * 9
+            while free:
+                low = free & -free
+                moves.append(base + low.bit_length() - 1)
+                free ^= low
+        return moves
+
+    def play(self, move: int) -> None:
+        """Делает ход текущего игрока (допустимость не проверяется)."""
+        sub, cell = divmod(move, 9)
+        won = self.won_x if self.player == "X" else self.won_o
+        self._undo.append((self.active, self.closed, won))
+        if self.player == "X":
+            mask = self.x[sub] = self.x[sub] | 1 << cell
+            if WIN_TABLE[mask]:
+                self.won_x |= 1 << sub
+                self.closed |= 1 << sub
+        else:
+            mask = self.o[sub] = self.o[sub] | 1 << cell
+            if WIN_TABLE[mask]:
+                self.won_o |= 1 << sub
+                self.closed |= 1 << sub
+        if (self.x[sub] | self.o[sub]) == FULL:
+            self.closed |= 1 << sub
+        # Клетка хода выбирает поле соперника, если оно еще открыто
+        self.active = -1 if self.closed >> cell & 1 else cell
+        self.moves.append(move)
+        self.player = "O" if self.player == "X" else "X"
+
+    def undo(self) -> None:
+        """Отменяет последний ход."""
+        move = self.moves.pop()
+        sub, cell = divmod(move, 9)
+        self.active, self.closed, won = self._undo.pop()
+        self.player = "O" if self.player == "X" else "X"
+        if self.player == "X":
+            self.x[sub] &= ~(1 << cell)
+            self.won_x = won
+        else:
+            self.o[sub] &= ~(1 << cell)
+            self.won_o = won
+
+    def evaluate(self) -> int:
+        """Эвристическая оценка позиции для игрока, который ходит."""
+        score = MACRO_WEIGHT * sub_score(self.won_x, self.won_o)
+        score += BOARD_WON * (POPCOUNT[self.won_x] - POPCOUNT[self.won_o])
+        for sub in range(9):
+            if not self.closed >> sub & 1:
+                score += sub_score(self.x[sub], self.o[sub])
+        return score if self.player == "X" else -score
+
+
+class SearchTimeout(Exception):
+    """Время на ход истекло."""
+
+
+class UltimateAI:
+    """ИИ с поиском альфа-бета и итеративным углублением в пределах времени.
+
+    Полный перебор партии невозможен, поэтому поиск углубляется, пока есть время,
+    и возвращает лучший ход последней полностью просчитанной глубины.
+    """
+
+    # Как часто проверять время (узлов)
+    CHECK_EVERY: int = 512
+
+    def __init__(self, budget_ms: int = 300, max_depth: int = 20) -> None:
+        """Создает ИИ.
+
+        Args:
+            budget_ms: Время на ход (мс), как ai_time_budget_ms в настройках
+            max_depth: Предельная глубина углубления
+        """
+        self.budget_ms: int = budget_ms
+        self.max_depth: int = max_depth
+        # Статистика последнего хода
+        self.nodes: int = 0
+        self.depth: int = 0
+        self.deadline: float = 0.0
+
+    def choose_move(self, board: UltimateBoard, rng: random.Random) -> Optional[int]:
+        """Выбирает ход для игрока, который ходит.
+
+        Args:
+            board: Позиция (после поиска возвращается в исходное состояние)
+            rng: Генератор партии (порядок равных ходов)
+
+        Returns:
+            Ход 0-80 или None, если ходов нет
+        """
+        moves = board.legal_moves()
+        if not moves:
+            return None
+        rng.shuffle(moves)
+        self.nodes = 0
+        self.depth = 0
+        self.deadline = time.perf_counter() + self.budget_ms / 1000
+        best = moves[0]
+        for depth in range(1, self.max_depth + 1):
+            try:
+                score, move = self._root(board, moves, depth)
+            except SearchTimeout:
+                break
+            best, self.depth = move, depth
+            # Лучший ход первым на следующей глубине
+            moves.remove(move)
+            moves.insert(0, move)
+            if abs(score) >= WIN_SCORE - 100:
+                break  # Исход уже известен
+        return best
+
+    def _root(self, board: UltimateBoard, moves: List[int], depth: int) -> Tuple[int, int]:
+        """Поиск на заданную глубину из корня: (оценка, лучший ход)."""
+        alpha, best = -WIN_SCORE - 1, moves[0]
+        for move in moves:
+            board.play(move)
+            try:
+                score = -self._search(board, depth - 1, -WIN_SCORE - 1, -alpha, 1)
+            finally:
+                board.undo()
+            if score > alpha:
+                alpha, best = score, move
+        return alpha, best
+
+    def _search(self, board: UltimateBoard, depth: int, alpha: int, beta: int, ply: int) -> int:
+        """Негамакс с отсечениями альфа-бета."""
+        self.nodes += 1
+        if self.nodes % self.CHECK_EVERY == 0 and time.perf_counter() > self.deadline:
+            raise SearchTimeout()
+        if board.winner() is not None:
+            # Предыдущий ход выиграл: быстрее проигрыш — хуже
+            return -WIN_SCORE + ply
+        moves = board.legal_moves()
+        if not moves:
+            return 0
+        if depth <= 0:
+            return board.evaluate()
+        for move in moves:
+            board.play(move)
+            try:
+                score = -self._search(board, depth - 1, -beta, -alpha, ply + 1)
+            finally:
+                board.undo()
+            if score > alpha:
+                alpha = score
+                if alpha >= beta:
+                    break
+        return alpha
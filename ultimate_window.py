@@ -0,0 +1,256 @@
+# -*- coding: utf-8 -*-
+# Окно "Ультимативных крестиков-ноликов"
+# Девять малых полей в одном окне: поля, куда можно ходить, подсвечены,
+# выигранные линии малых полей и большого поля выделяются цветами темы.
+# Ход ИИ (ultimate.UltimateAI) считается в фоновом потоке в пределах времени
+# ai_time_budget_ms из настроек; партии записываются в общую историю,
+# профили и рейтинги приложения.
+
+# Импортируем необходимые модули
+from typing import Any, Dict, List, Optional, Tuple  # Для указания типов данных
+import queue  # Для передачи хода ИИ в поток интерфейса
+import random  # Для генератора партии
+import threading  # Для поиска ИИ в фоне
+import time  # Для меток времени записей
+import uuid  # Для идентификаторов партий
+
+import tkinter as tk  # Основная библиотека для создания графического интерфейса
+
+import events  # Шина событий (ходы и концы партий)
+import timing  # Время ходов
+from profiles import PVP_KEY  # Ключ партий двух игроков
+from simulator import new_seed  # Зерна партий
+from ultimate import UltimateAI, UltimateBoard, winning_line_of  # Движок и ИИ
+
+# Ключ сложности (и профиля ИИ) ультимативных партий
+ULTIMATE_KEY: str = "ultimate"
+
+# Метка варианта в записях истории
+VARIANT: str = "ultimate"
+
+# Ключи гистограмм времени ходов ультимативных партий
+HUMAN_TIMING_KEY: str = f"{timing.HUMAN_KEY}:{VARIANT}"
+AI_TIMING_KEY: str = timing.ai_key(ULTIMATE_KEY)
+
+# Интервал проверки готового хода ИИ (мс)
+AI_POLL_MS: int = 30
+
+
+class UltimateWindow:
+    """Окно ультимативной партии против ИИ или второго игрока."""
+
+    def __init__(self, app: Any, theme: Dict[str, str]) -> None:
+        """Создает окно и начинает партию.
+
+        Args:
+            app: Главное приложение (профили, рейтинги, настройки и писатель)
+            theme: Текущая цветовая тема
+        """
+        self.app: Any = app
+        self.theme: Dict[str, str] = theme
+        # Режим берется из главного окна на момент открытия
+        self.vs_ai: bool = app.vs_ai
+        self.ai = UltimateAI(app.settings.ai_time_budget_ms)
+        # Ответы ИИ: (номер партии, ход, время расчета в мс)
+        self.results: "queue.Queue[Tuple[int, Optional[int], float]]" = queue.Queue()
+        self.poll_job: Optional[str] = None
+
+        self.window = tk.Toplevel(app.window)
+        mode = "против ИИ" if self.vs_ai else "2 игрока"
+        self.window.title(f"Ультимативные крестики-нолики | {mode}")
+        self.window.config(bg=theme["bg"])
+        self.window.protocol("WM_DELETE_WINDOW", self.close)
+
+        top = tk.Frame(self.window, bg=theme["bg"])
+        top.pack(fill="x", padx=5, pady=5)
+        tk.Button(top, text="🔄 Новая игра", font=("Arial", 10), command=self.new_game).pack(side="left")
+        self.status = tk.Label(top, text="", font=("Arial", 10), bg=theme["bg"], fg=theme["btn_fg"])
+        self.status.pack(side="left", padx=10)
+
+        # Большое поле: 9 рамок малых полей по 9 кнопок
+        grid = tk.Frame(self.window, bg=theme["bg"])
+        grid.pack(padx=5, pady=5)
+        self.frames: List[tk.Frame] = []
+        self.buttons: List[tk.Button] = []
+        for sub in range(9):
+            frame = tk.Frame(grid, bg=theme["bg"], bd=3)
+            frame.grid(row=sub // 3, column=sub % 3, padx=3, pady=3)
+            self.frames.append(frame)
+        for move in range(81):
+            sub, cell = divmod(move, 9)
+            btn = tk.Button(
+                self.frames[sub],
+                text="",
+                font=("Arial", 12, "bold"),
+                width=2,
+                height=1,
+                bg=theme["btn_bg"],
+                fg=theme["btn_fg"],
+                command=lambda m=move: self.on_click(m),
+            )
+            btn.grid(row=cell // 3, column=cell % 3, padx=1, pady=1)
+            self.buttons.append(btn)
+        # Номер партии: ответы ИИ для прошлых партий игнорируются
+        self.token: int = 0
+        self.new_game()
+
+    def new_game(self) -> None:
+        """Начинает новую партию со своим идентификатором и зерном."""
+        self.token += 1
+        self.game_id: str = uuid.uuid4().hex
+        self.seed: int = new_seed()
+        self.rng: random.Random = random.Random(self.seed)
+        self.started: float = time.monotonic()
+        self.board: UltimateBoard = UltimateBoard()
+        # Время каждого хода (мс) и начало обдумывания текущего хода
+        self.move_ms: List[float] = []
+        self.turn_started: float = time.monotonic()
+        self.game_over: bool = False
+        self.thinking: bool = False
+        for btn in self.buttons:
+            btn.config(text="", bg=self.theme["btn_bg"], fg=self.theme["btn_fg"])
+        self.refresh()
+
+    def refresh(self) -> None:
+        """Подсвечивает поля для хода и обновляет строку состояния."""
+        open_boards = set() if self.game_over else set(self.board.open_boards())
+        for sub, frame in enumerate(self.frames):
+            frame.config(bg=self.theme["highlight"] if sub in open_boards else self.theme["bg"])
+        if not self.game_over:
+            suffix = " (ИИ думает…)" if self.thinking else ""
+            self.status.config(text=f"Ход {self.board.player}{suffix}")
+
+    def on_click(self, move: int) -> None:
+        """Обработчик нажатия на клетку."""
+        if self.game_over or self.thinking or move not in self.board.legal_moves():
+            return
+        self.time_move(HUMAN_TIMING_KEY, (time.monotonic() - self.turn_started) * 1000)
+        self.play(move)
+        if not self.game_over and self.vs_ai:
+            self.start_ai()
+
+    def start_ai(self) -> None:
+        """Запускает поиск хода ИИ в фоновом потоке."""
+        self.thinking = True
+        self.refresh()
+        token = self.token
+        # ИИ ищет на копии, поэтому интерфейс может читать свое поле
+        board = UltimateBoard.from_moves(self.board.moves)
+
+        def _think() -> None:
+            """Поиск хода в отдельном потоке."""
+            started = time.monotonic()
+            move = self.ai.choose_move(board, self.rng)
+            self.results.put((token, move, (time.monotonic() - started) * 1000))
+
+        threading.Thread(target=_think, daemon=True).start()
+        self.poll_job = self.window.after(AI_POLL_MS, self.poll_ai)
+
+    def poll_ai(self) -> None:
+        """Забирает готовый ход ИИ из очереди."""
+        self.poll_job = None
+        try:
+            token, move, elapsed_ms = self.results.get_nowait()
+        except queue.Empty:
+            # Поиск еще идет — проверим позже
+            self.poll_job = self.window.after(AI_POLL_MS, self.poll_ai)
+            return
+        # Ответ для уже перезапущенной партии не нужен
+        if token != self.token:
+            return
+        self.thinking = False
+        if move is not None and not self.game_over:
+            self.time_move(AI_TIMING_KEY, elapsed_ms)
+            self.play(move)
+
+    def time_move(self, key: str, elapsed_ms: float) -> None:
+        """Запоминает время хода в партии и в гистограмме сессии приложения."""
+        self.move_ms.append(round(elapsed_ms, 1))
+        self.app.timings.record_ms(key, elapsed_ms)
+
+    def play(self, move: int) -> None:
+        """Делает ход текущего игрока и проверяет конец партии."""
+        symbol = self.board.player
+        sub = move // 9
+        self.board.play(move)
+        self.buttons[move].config(text=symbol)
+        source = "ai" if self.vs_ai and symbol == "O" else "human"
+        events.publish(events.MovePlayed(self.game_id, symbol, move, len(self.board.moves), source, VARIANT))
+
+        # Малое поле выиграно — выделяем его линию цветами темы
+        own = self.board.x[sub] if symbol == "X" else self.board.o[sub]
+        line = winning_line_of(own)
+        if line is not None:
+            self.highlight(sub * 9 + cell for cell in line)
+
+        winner = self.board.winner()
+        if winner is not None:
+            # Победная линия большого поля: все клетки трех малых полей
+            won = self.board.won_x if winner == "X" else self.board.won_o
+            macro = winning_line_of(won) or ()
+            self.highlight(sub_no * 9 + cell for sub_no in macro for cell in range(9))
+            self.finish(winner)
+        elif self.board.is_over():
+            self.finish(None)
+        else:
+            self.refresh()
+        self.turn_started = time.monotonic()
+
+    def highlight(self, moves: Any) -> None:
+        """Выделяет клетки цветами победной линии темы."""
+        for move in moves:
+            self.buttons[move].config(bg=self.theme.get("highlight", "#90ee90"),
+                                      fg=self.theme.get("text_highlight", "green"))
+
+    def finish(self, winner: Optional[str]) -> None:
+        """Завершает партию и записывает результат."""
+        self.game_over = True
+        self.refresh()
+        self.status.config(text=f"Победа: {winner}" if winner else "Ничья")
+        self.record_game(winner)
+
+    def record_game(self, winner: Optional[str]) -> None:
+        """Учитывает партию в профилях, рейтингах и истории.
+
+        Args:
+            winner: Символ победителя или None для ничьей
+        """
+        app = self.app
+        x_id = app.player_ids["X"]
+        if self.vs_ai:
+            # Ультимативный ИИ — отдельный профиль со своим рейтингом
+            o_id, difficulty = app.profiles.get_or_create_ai(ULTIMATE_KEY).id, ULTIMATE_KEY
+        else:
+            o_id, difficulty = app.player_ids["O"], PVP_KEY
+        moves = self.board.moves
+        app.profiles.record_game(x_id, o_id, winner, difficulty, len(moves))
+        app.ratings.record_game(x_id, o_id, winner)
+        app.record_achievements(x_id, o_id, winner, difficulty, len(moves))
+        app.schedule_flush()
+
+        names = {"X": app.profiles.get(x_id).name, "O": app.profiles.get(o_id).name}
+        config = app.settings
+        app.writer.add_history({
+            "date": int(time.time()),
+            "result": f"Победа: {names[winner]}" if winner else "Ничья",
+            "id": self.game_id,
+            "players": {"X": x_id, "O": o_id},
+            "winner": winner or "",
+            "difficulty": difficulty,
+            "length": len(moves),
+            "moves": ",".join(str(move) for move in moves),  # Ходы 0-80 через запятую
+            "seed": self.seed,
+            "move_ms": list(self.move_ms),  # Время каждого хода (мс)
+            "variant": VARIANT,  # Партия ультимативной игры (не повторяется в окне 3x3)
+        }, config.history_file, config.max_days, config.max_games, config.archive_dir)
+        events.publish(events.GameEnded(
+            self.game_id, winner or "", difficulty, len(moves), time.monotonic() - self.started, VARIANT,
+        ))
+
+    def close(self) -> None:
+        """Закрывает окно; поиск ИИ, если идет, завершится сам."""
+        self.token += 1
+        if self.poll_job is not None:
+            self.window.after_cancel(self.poll_job)
+            self.poll_job = None
+        self.window.destroy()